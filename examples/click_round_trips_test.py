@@ -0,0 +1,54 @@
+"""
+This benchmark counts the WebDriver round trips made per click.
+The "before" numbers replay the steps that click() used to make:
+(wait for visible, scroll to element, get current_url, click, wait)
+The "after" numbers come from the current click() method.
+Run with: pytest click_round_trips_test.py -s
+"""
+
+from seleniumbase import BaseCase
+from seleniumbase.fixtures import js_utils
+from seleniumbase.fixtures import page_actions
+
+PAGE = ("data:text/html,<div style='height:2000px'>Top</div>"
+        "<button id='b' onclick='this.innerHTML++'>0</button>")
+
+
+class ClickRoundTripsTests(BaseCase):
+
+    def count_commands(self, action, *args):
+        commands = []
+        original_execute = self.driver.execute
+
+        def counting_execute(driver_command, params=None):
+            commands.append(driver_command)
+            return original_execute(driver_command, params)
+
+        self.driver.execute = counting_execute
+        try:
+            action(*args)
+        finally:
+            self.driver.execute = original_execute
+        return commands
+
+    def legacy_click(self, selector):
+        element = page_actions.wait_for_element_visible(
+            self.driver, selector, "css selector")
+        js_utils.scroll_to_element(self.driver, element)
+        self.driver.current_url
+        element.click()
+        self.wait_for_ready_state_complete()
+
+    def test_click_round_trips(self):
+        self.open(PAGE)
+        before = self.count_commands(self.legacy_click, "#b")
+        self.open(PAGE)
+        after = self.count_commands(self.click, "#b")
+        print("\nRound trips per click (element out of view):")
+        print("  Before: %s %s" % (len(before), before))
+        print("  After:  %s %s" % (len(after), after))
+        in_view = self.count_commands(self.click, "#b")
+        print("Round trips per click (element already in view):")
+        print("  After:  %s %s" % (len(in_view), in_view))
+        self.assert_text("2", "#b")
+        self.assertTrue(len(after) < len(before))
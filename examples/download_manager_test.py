@@ -0,0 +1,128 @@
+"""
+This test runs the file download manager against a local HTTP server that
+supports range requests, and checks streaming, resuming, checksums, and
+background downloads.
+Run with: pytest download_manager_test.py -s
+"""
+
+import hashlib
+import os
+import re
+import threading
+from seleniumbase import BaseCase
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+try:
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from SocketServer import ThreadingMixIn
+
+FILE_DATA = b"SeleniumBase download manager test data.\n" * 50000
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    etag = '"v1"'  # Changing it means that the file has changed
+    fail_after = None  # Drops the connection after this many bytes
+    requests = []  # (Range start, status code) of each request
+
+    def do_GET(self):
+        if not self.path.endswith(".txt"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        start = 0
+        data = re.match(r"bytes=(\d+)-", self.headers.get("Range") or "")
+        if_range = self.headers.get("If-Range")
+        if data and (not if_range or if_range == FileHandler.etag):
+            start = int(data.group(1))
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes %s-%s/%s" % (
+                start, len(FILE_DATA) - 1, len(FILE_DATA)))
+            FileHandler.requests.append((start, 206))
+        else:
+            self.send_response(200)
+            FileHandler.requests.append((0, 200))
+        self.send_header("ETag", FileHandler.etag)
+        self.send_header("Content-Length", str(len(FILE_DATA) - start))
+        self.end_headers()
+        if FileHandler.fail_after:
+            self.wfile.write(FILE_DATA[start:start + FileHandler.fail_after])
+            return
+        self.wfile.write(FILE_DATA[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class DownloadManagerTests(BaseCase):
+
+    def setUp(self):
+        super(DownloadManagerTests, self).setUp()
+        self.server = ThreadingServer(("127.0.0.1", 0), FileHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.base_url = "http://127.0.0.1:%s" % self.server.server_port
+        self.checksum = "sha256:%s" % hashlib.sha256(FILE_DATA).hexdigest()
+        FileHandler.etag = '"v1"'
+        FileHandler.fail_after = None
+        FileHandler.requests = []
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super(DownloadManagerTests, self).tearDown()
+
+    def test_download_with_checksum(self):
+        file_path = self.download_file(
+            self.base_url + "/data.txt", checksum=self.checksum)
+        self.assert_downloaded_file("data.txt")
+        self.assert_equal(os.path.getsize(file_path), len(FILE_DATA))
+        with self.assertRaises(Exception):
+            self.save_file_as(
+                self.base_url + "/data.txt", "bad.txt", checksum="md5:0")
+        self.assert_false(self.is_downloaded_file_present("bad.txt"))
+
+    def test_resume_download(self):
+        url = self.base_url + "/data.txt"
+        FileHandler.fail_after = 200000  # An interrupted download
+        with self.assertRaises(Exception):
+            self.save_file_as(url, "resumed.txt", checksum=self.checksum)
+        part_file = "resumed.txt.sbpart"  # (Kept for resuming)
+        self.assert_true(self.is_downloaded_file_present(part_file))
+        FileHandler.fail_after = None
+        part_size = os.path.getsize(
+            self.get_path_of_downloaded_file(part_file))
+        self.save_file_as(url, "resumed.txt", checksum=self.checksum)
+        self.assert_equal(FileHandler.requests[-1], (part_size, 206))
+        self.assert_false(self.is_downloaded_file_present(part_file))
+
+    def test_resume_changed_download(self):
+        url = self.base_url + "/data.txt"
+        FileHandler.fail_after = 200000
+        with self.assertRaises(Exception):
+            self.save_file_as(url, "changed.txt", checksum=self.checksum)
+        FileHandler.fail_after = None
+        FileHandler.etag = '"v2"'  # The server sends the whole file again
+        self.save_file_as(url, "changed.txt", checksum=self.checksum)
+        self.assert_equal(FileHandler.requests[-1], (0, 200))
+        self.assert_false(
+            self.is_downloaded_file_present("changed.txt.sbpart"))
+
+    def test_background_downloads(self):
+        futures = []
+        for i in range(8):
+            futures.append(self.start_download(
+                self.base_url + "/data.txt", "data_%s.txt" % (i % 2),
+                checksum=self.checksum))  # (Same file names at once too)
+        for future in futures:
+            self.assert_true(os.path.exists(future.result(timeout=30)))
+        with self.assertRaises(Exception):
+            self.start_download(self.base_url + "/missing").result()
@@ -0,0 +1,86 @@
+"""
+This test simulates browser downloads in the downloads folder, and checks
+that the download watcher waits for them to complete:
+Chrome writes to a ".crdownload" file, which gets renamed when done.
+Firefox creates an empty placeholder file, and then writes to a ".part"
+file. (An empty file only counts as downloaded once it stays empty.)
+Run with: pytest download_watcher_test.py -s
+"""
+
+import os
+import threading
+import time
+from seleniumbase import BaseCase
+
+FILE_DATA = b"SeleniumBase download watcher test data.\n" * 1000
+
+
+class DownloadWatcherTests(BaseCase):
+
+    def start_download(self, target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def chrome_download(self, file_path, delay):
+        part_file_path = file_path + ".crdownload"
+        with open(part_file_path, "wb") as f:
+            for i in range(5):
+                f.write(FILE_DATA)
+                f.flush()
+                time.sleep(delay / 5.0)
+        os.rename(part_file_path, file_path)
+
+    def firefox_download(self, file_path, delay, start_delay=0):
+        part_file_path = file_path + ".part"
+        time.sleep(start_delay)
+        open(file_path, "wb").close()  # The placeholder file
+        time.sleep(0.05)  # The ".part" file gets created a moment later
+        with open(part_file_path, "wb") as f:
+            for i in range(5):
+                f.write(FILE_DATA)
+                f.flush()
+                time.sleep(delay / 5.0)
+        os.remove(file_path)
+        os.rename(part_file_path, file_path)
+
+    def test_chrome_download(self):
+        file_path = self.get_path_of_downloaded_file("chrome_file.txt")
+        thread = self.start_download(self.chrome_download, file_path, 1.5)
+        start_time = time.time()
+        self.assert_equal(
+            self.wait_for_downloaded_file("chrome_file.txt"), file_path)
+        self.assert_true(time.time() - start_time < 5)
+        self.assert_equal(os.path.getsize(file_path), len(FILE_DATA) * 5)
+        thread.join()
+
+    def test_firefox_download(self):
+        file_path = self.get_path_of_downloaded_file("firefox_file.txt")
+        thread = self.start_download(self.firefox_download, file_path, 1.5)
+        self.assert_downloaded_file("firefox_file.txt", timeout=5)
+        self.assert_equal(os.path.getsize(file_path), len(FILE_DATA) * 5)
+        thread.join()
+
+    def test_firefox_download_after_wait_starts(self):
+        file_path = self.get_path_of_downloaded_file("late_file.txt")
+        # (The placeholder and the ".part" file appear during the wait)
+        thread = self.start_download(
+            self.firefox_download, file_path, 1.5, 0.5)
+        self.assert_downloaded_file("late_file.txt", timeout=5)
+        self.assert_equal(os.path.getsize(file_path), len(FILE_DATA) * 5)
+        thread.join()
+
+    def test_empty_download(self):
+        file_path = self.get_path_of_downloaded_file("empty_file.txt")
+        open(file_path, "wb").close()
+        self.assert_downloaded_file("empty_file.txt", timeout=5)
+
+    def test_unfinished_download(self):
+        file_path = self.get_path_of_downloaded_file("slow_file.txt")
+        thread = self.start_download(self.chrome_download, file_path, 3)
+        with self.assertRaises(AssertionError):
+            self.assert_downloaded_file("slow_file.txt", timeout=1)
+        with self.assertRaises(AssertionError):
+            self.assert_downloaded_file("missing_file.txt", timeout=1)
+        thread.join()
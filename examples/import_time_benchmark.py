@@ -0,0 +1,70 @@
+"""
+This benchmark measures the import time of SeleniumBase with
+"python -X importtime" (Python 3.7+), which is the startup cost that every
+pytest process (and every pytest-xdist worker) pays to load the plugin.
+"Plugin only" is what pytest loads for every run, browser tests or not.
+"Plugin + BaseCase" is the cost of everything being imported eagerly.
+Run with: python import_time_benchmark.py [RUNS]
+"""
+
+import subprocess
+import sys
+
+TARGETS = [
+    ("Plugin only", "import seleniumbase.plugins.pytest_plugin"),
+    ("Plugin + BaseCase",
+     "import seleniumbase.plugins.pytest_plugin; "
+     "from seleniumbase import BaseCase"),
+]
+
+
+def get_import_times(code):
+    """ Returns [(name, self_us, cumulative_us, is_top_level)] of the
+        imports made by one fresh Python process. """
+    process = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    stdout, stderr = process.communicate()
+    if process.returncode != 0:
+        raise Exception("Import failed:\n%s" % stderr)
+    import_times = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].split(":")[1].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # (The header line)
+        name = parts[2].strip()
+        is_top_level = not parts[2].startswith("  ")  # (Nested get indents)
+        import_times.append((name, self_us, cumulative_us, is_top_level))
+    return import_times
+
+
+def main():
+    if sys.version_info < (3, 7):
+        raise Exception("This benchmark requires Python 3.7 or newer!")
+    runs = 5
+    if len(sys.argv) > 1:
+        runs = int(sys.argv[1])
+    print("Import times (ms), best of %s runs:" % runs)
+    for label, code in TARGETS:
+        totals = []
+        seleniumbase_totals = []
+        for run in range(runs):
+            import_times = get_import_times(code)
+            totals.append(sum([
+                cumulative_us for (name, self_us, cumulative_us, top_level)
+                in import_times if top_level]))
+            seleniumbase_totals.append(sum([
+                self_us for (name, self_us, cumulative_us, top_level)
+                in import_times if name.startswith("seleniumbase")]))
+        print("  %-18s total: %8.1f   seleniumbase.* only: %6.1f" % (
+            label, min(totals) / 1000.0, min(seleniumbase_totals) / 1000.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+This benchmark measures the rewrite engine of "seleniumbase objectify"
+over a synthetic test corpus (100,000 lines by default), for each of the
+three modes: extract-objects, inject-objects, and revert-objects.
+Nothing gets written to disk. (The "page_objects.py" dictionaries are built
+in memory from the selectors that get extracted from the corpus.)
+Run with: python objectify_benchmark.py [NUM_LINES] [RUNS]
+"""
+
+import random
+import sys
+import time
+from seleniumbase.utilities.selenium_ide import objectify
+
+LINE_TEMPLATES = [
+    'self.open("https://example.com/page/%(n)s")',
+    'self.click(%(s)s)',
+    'self.js_click(%(s)s)',
+    'self.assert_element(%(s)s)',
+    'self.assert_element_present(%(s)s)',
+    'self.wait_for_element_visible(%(s)s)',
+    'self.update_text(%(s)s, "text %(n)s")',
+    'self.type(%(s)s, "text %(n)s\\n")',
+    'self.assert_text("Item %(n)s", %(s)s)',
+    'self.assert_exact_text("Item %(n)s", %(s)s)',
+    'if self.is_element_visible(%(s)s):',
+    'elif self.is_text_visible("Item %(n)s", %(s)s):',
+    'href = self.get_attribute(%(s)s, "href")',
+    'text = self.get_text(%(s)s)',
+    'if "Item" in self.get_text(%(s)s):',
+    'self.select_option_by_text(%(s)s, "Option %(n)s")',
+    'self.assert_true(len(text) > %(n)s)',
+    'self.sleep(0.%(n)s)',
+    'self.highlight(%(s)s)',
+    '# Step %(n)s',
+    '',
+]
+
+
+def get_corpus(num_lines, num_selectors=500):
+    random.seed(num_lines)
+    selectors = []
+    for i in range(num_selectors):
+        selectors.append(random.choice([
+            '"#item-%s"' % i,
+            '"div.list > li:nth-of-type(%s) a"' % i,
+            '\'button[data-id="%s"]\'' % i,
+            '"//div[@id=\'row-%s\']/span"' % i,
+        ]))
+    code_lines = []
+    while len(code_lines) < num_lines:
+        code_lines.append("")
+        code_lines.append("    def test_%s(self):" % len(code_lines))
+        for i in range(20):
+            data = {"s": random.choice(selectors), "n": i}
+            line = "        " + random.choice(LINE_TEMPLATES) % data
+            code_lines.append(line.rstrip())
+    return code_lines[:num_lines]
+
+
+def get_object_dicts(page_selectors):
+    """ Returns the (selector_dict, object_dict) of page objects that
+        "seleniumbase objectify" would create for the selectors. """
+    selector_dict = {}
+    object_dict = {}
+    for selector in page_selectors:
+        selector = objectify.optimize_selector(selector)
+        if selector not in selector_dict:
+            object_name = "Page.css_%s" % (len(selector_dict) + 1)
+            selector_dict[selector] = object_name
+            object_dict[object_name] = selector
+    return selector_dict, object_dict
+
+
+def get_best_time(runs, method, *args, **kwargs):
+    times = []
+    for run in range(runs):
+        start_time = time.time()
+        method(*args, **kwargs)
+        times.append(time.time() - start_time)
+    return min(times)
+
+
+def main():
+    num_lines = 100000
+    runs = 3
+    if len(sys.argv) > 1:
+        num_lines = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        runs = int(sys.argv[2])
+    code_lines = get_corpus(num_lines)
+    seleniumbase_lines, page_selectors, changed = (
+        objectify.process_test_file(code_lines))
+    selector_dict, object_dict = get_object_dicts(page_selectors)
+    objectified_lines, page_selectors, changed = (
+        objectify.process_test_file(code_lines, selector_dict=selector_dict))
+    print("Objectify rewrite engine: %s lines, %s selectors, best of %s runs"
+          % (num_lines, len(selector_dict), runs))
+    results = [
+        ("extract-objects", get_best_time(
+            runs, objectify.process_test_file, code_lines)),
+        ("inject-objects", get_best_time(
+            runs, objectify.process_test_file, code_lines,
+            selector_dict=selector_dict)),
+        ("revert-objects", get_best_time(
+            runs, objectify.process_test_file, objectified_lines,
+            object_dict=object_dict)),
+    ]
+    for label, duration in results:
+        print("  %-16s %6.3fs  (%s lines/s)" % (
+            label, duration, int(num_lines / max(duration, 0.000001))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+This test runs the traffic engine against a local HTTP server, and checks
+the report for the number of referrals and the rate limit.
+Run with: pytest traffic_engine_test.py -s
+"""
+
+import threading
+from seleniumbase import BaseCase
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+try:
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from SocketServer import ThreadingMixIn
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        PageHandler.hits.append(
+            (self.path, self.headers.get("Referer")))
+        body = b"<html><body><h1>Traffic Page</h1></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class TrafficEngineTests(BaseCase):
+
+    def setUp(self):
+        super(TrafficEngineTests, self).setUp()
+        PageHandler.hits = []
+        self.server = ThreadingServer(("127.0.0.1", 0), PageHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.base_url = "http://127.0.0.1:%s" % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super(TrafficEngineTests, self).tearDown()
+
+    def test_concurrent_traffic(self):
+        report = self.generate_traffic(
+            self.base_url + "/start", self.base_url + "/destination",
+            loops=12, workers=3)
+        self.assert_equal(report["requests"], 12)
+        self.assert_equal(report["failures"], 0)
+        referrals = [hit for hit in PageHandler.hits
+                     if hit[0] == "/destination"]
+        self.assert_equal(len(referrals), 12)
+        self.assert_true(referrals[0][1].endswith("/start"))
+
+    def test_rate_limited_traffic_chain(self):
+        pages = [self.base_url + "/a", self.base_url + "/b",
+                 self.base_url + "/c"]
+        report = self.generate_traffic_chain(
+            pages, loops=5, workers=2, max_per_second=4)
+        self.assert_equal(report["requests"], 10)
+        self.assert_true(report["rps"] <= 4.5)
+        self.assert_true(
+            report["latency"]["p50"] <= report["latency"]["p99"])
@@ -1,3 +1,31 @@
-from seleniumbase.fixtures.base_case import BaseCase  # noqa
-from seleniumbase.masterqa.master_qa import MasterQA  # noqa
-from seleniumbase.common import decorators  # noqa
+import sys
+
+if sys.version_info >= (3, 7):
+    # BaseCase, MasterQA, and decorators get imported on first use (PEP 562),
+    # so that loading the pytest plugin (which happens in every pytest run,
+    # and in every xdist worker) doesn't import selenium and friends.
+    import importlib
+
+    _lazy_imports = {
+        "BaseCase": ("seleniumbase.fixtures.base_case", "BaseCase"),
+        "MasterQA": ("seleniumbase.masterqa.master_qa", "MasterQA"),
+        "decorators": ("seleniumbase.common.decorators", None),
+    }
+
+    def __getattr__(name):
+        if name not in _lazy_imports:
+            raise AttributeError(
+                "module 'seleniumbase' has no attribute '%s'" % name)
+        module_name, attribute = _lazy_imports[name]
+        value = importlib.import_module(module_name)
+        if attribute:
+            value = getattr(value, attribute)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(list(globals().keys()) + list(_lazy_imports.keys()))
+else:
+    from seleniumbase.fixtures.base_case import BaseCase  # noqa
+    from seleniumbase.masterqa.master_qa import MasterQA  # noqa
+    from seleniumbase.common import decorators  # noqa
@@ -5,6 +5,7 @@ import threading
 import time
 import warnings
 from functools import wraps
+from seleniumbase.core import timing_helper
 
 
 def retry_on_exception(tries=6, delay=1, backoff=2, max_delay=32):
@@ -60,11 +61,11 @@ def rate_limited(max_per_second):
         def rate_limited_function(*args, **kargs):
             try:
                 rate_lock.acquire(True)
-                elapsed = time.clock() - last_time_called[0]
+                elapsed = timing_helper.clock() - last_time_called[0]
                 wait_time_remaining = min_interval - elapsed
                 if wait_time_remaining > 0:
                     time.sleep(wait_time_remaining)
-                last_time_called[0] = time.clock()
+                last_time_called[0] = timing_helper.clock()
             finally:
                 rate_lock.release()
             return func(*args, **kargs)
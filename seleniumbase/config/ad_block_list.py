@@ -11,7 +11,10 @@ Usage:
 If using the command line version, the ad_block functionality gets
 activated after "self.wait_for_ready_state_complete()" is called,
 which is always run after page loads, unless changed in "settings.py".
-Using ad_block will slow down test runs a little. (Use only if necessary.)
+The selectors get combined into one, which removes matching elements
+from the page, and keeps removing them if they get added again later.
+With "--ad_block" on Chrome, requests to the AD_BLOCK_HOSTS are also
+blocked, so that those ads never get downloaded in the first place.
 
 Format: A CSS Selector that's ready for JavaScript's querySelectorAll()
 """
@@ -73,3 +76,25 @@ AD_BLOCK_LIST = [
     'script[src*="/pagead/"]',
     'section.dianomi-ad',
 ]
+
+"""
+Format: A host name. Subdomains of these hosts are also blocked.
+(Used by Chrome's --host-resolver-rules when using "--ad_block")
+"""
+
+AD_BLOCK_HOSTS = [
+    'doubleclick.net',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'googletagservices.com',
+    'adservice.google.com',
+    'amazon-adsystem.com',
+    'adnxs.com',
+    'advertising.com',
+    'carbonads.net',
+    'dianomi.com',
+    'outbrain.com',
+    'taboola.com',
+    'moatads.com',
+    'smartadserver.com',
+]
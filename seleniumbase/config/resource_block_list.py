@@ -0,0 +1,76 @@
+"""
+For use with SeleniumBase's network-level resource blocking.
+
+Usage:
+    On the command line:
+    "pytest SOME_TEST.py --block=images,fonts,media,3p"
+
+Blocked resources never get downloaded, which speeds up page loads and
+saves bandwidth on heavy pages, without any changes to test code.
+(Only use this if your tests don't need the resources being blocked.)
+
+* images - Chrome & Firefox disable images with browser preferences.
+* fonts - Chrome blocks FONT_URL_PATTERNS. Firefox uses system fonts.
+* media - Chrome blocks MEDIA_URL_PATTERNS. Firefox blocks media autoplay.
+* 3p - Chrome blocks requests to THIRD_PARTY_HOSTS (and their subdomains).
+       Firefox turns on its built-in Tracking Protection.
+
+Format of URL patterns: A URL where "*" can match any number of characters.
+"""
+
+BLOCKABLE_RESOURCES = ["images", "fonts", "media", "3p"]
+
+FONT_URL_PATTERNS = [
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.eot",
+    "*.woff?*",
+    "*.woff2?*",
+    "*.ttf?*",
+    "*.otf?*",
+    "*.eot?*",
+    "*fonts.googleapis.com/*",
+    "*fonts.gstatic.com/*",
+    "*use.typekit.net/*",
+]
+
+MEDIA_URL_PATTERNS = [
+    "*.mp4",
+    "*.webm",
+    "*.ogg",
+    "*.ogv",
+    "*.mp3",
+    "*.wav",
+    "*.m3u8",
+    "*.mp4?*",
+    "*.webm?*",
+    "*.m3u8?*",
+]
+
+# Third-party analytics, tag managers, and trackers
+THIRD_PARTY_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "fullstory.com",
+    "newrelic.com",
+    "nr-data.net",
+    "optimizely.com",
+    "quantserve.com",
+    "scorecardresearch.com",
+    "chartbeat.com",
+    "crazyegg.com",
+    "mouseflow.com",
+    "bat.bing.com",
+    "ads-twitter.com",
+    "analytics.twitter.com",
+    "snap.licdn.com",
+]
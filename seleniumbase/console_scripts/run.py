@@ -91,12 +91,17 @@ def show_convert_usage():
     print("")
     print("  Usage:")
     print("           seleniumbase convert [PYTHON_WEBDRIVER_UNITTEST_FILE]")
+    print("    OR:    seleniumbase convert [FILES/DIRECTORIES/\"GLOBS\"]")
+    print("                                [--processes=N]")
     print("  Output:")
     print("           Converts a Selenium IDE exported WebDriver unittest")
     print("           file into a SeleniumBase file. Adds _SB to the new")
     print("           file name while keeping the original file intact.")
     print("           Works with Katalon Recorder scripts.")
     print("           See: http://www.katalon.com/automation-recorder")
+    print("           Multiple files get converted in parallel, and a")
+    print("           report of unconverted lines is saved to the")
+    print("           \"convert_report.txt\" file.")
     print("")
 
 
@@ -132,6 +137,7 @@ def show_objectify_usage():
     print("")
     print("  Usage:")
     print("           seleniumbase objectify [SELENIUMBASE_PYTHON_FILE]")
+    print("           (Multiple files, directories & globs are accepted.)")
     print("  Options:")
     print("           -c, --comments  (Add object selectors to the comments.)")
     print("                           (Default: No added comments.)")
@@ -247,7 +253,7 @@ def main():
             show_basic_usage()
             show_install_usage()
     elif command == "convert":
-        if len(command_args) == 1:
+        if len(command_args) >= 1:
             convert_ide.main()
         else:
             show_basic_usage()
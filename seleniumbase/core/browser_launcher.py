@@ -9,9 +9,12 @@ import warnings
 from selenium import webdriver
 from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+from seleniumbase.config import ad_block_list
 from seleniumbase.config import proxy_list
+from seleniumbase.config import resource_block_list
 from seleniumbase.config import settings
 from seleniumbase.core import download_helper
+from seleniumbase.core import profile_helper
 from seleniumbase.core import proxy_helper
 from seleniumbase.core import capabilities_parser
 from seleniumbase.fixtures import constants
@@ -95,10 +98,69 @@ def _add_chrome_disable_csp_extension(chrome_options):
     return chrome_options
 
 
+def _get_host_resolver_rules(hosts):
+    """ Blocks requests to the hosts (and their subdomains) on Chrome,
+        so that nothing from them gets downloaded. (Works when headless.) """
+    rules = []
+    for host in hosts:
+        rules.append("MAP %s ~NOTFOUND" % host)
+        rules.append("MAP *.%s ~NOTFOUND" % host)
+    return ", ".join(rules)
+
+
+def _get_block_list(block):
+    """ Converts the "--block" string into a list of resource types.
+        Eg: "images,fonts,media,3p" => ["images", "fonts", "media", "3p"] """
+    if not block:
+        return []
+    block_list = [item.strip().lower() for item in block.split(',')]
+    block_list = [item for item in block_list if item]
+    valid_resources = resource_block_list.BLOCKABLE_RESOURCES
+    for item in block_list:
+        if item not in valid_resources:
+            raise Exception(
+                "Resource type {%s} is not a valid --block option. "
+                "Valid options = {%s}" % (item, valid_resources))
+    return block_list
+
+
+def _get_chrome_blocked_url_patterns(block_list):
+    patterns = []
+    if "fonts" in block_list:
+        patterns += resource_block_list.FONT_URL_PATTERNS
+    if "media" in block_list:
+        patterns += resource_block_list.MEDIA_URL_PATTERNS
+    return patterns
+
+
+def _block_chrome_urls(driver, block_list):
+    """ Fonts and media can't be blocked with Chrome preferences, so the
+        URL patterns get blocked with the Chrome DevTools Protocol instead.
+        (Selenium 3 doesn't have execute_cdp_cmd(), so it's added here.) """
+    patterns = _get_chrome_blocked_url_patterns(block_list)
+    if not patterns:
+        return
+    try:
+        driver.command_executor._commands["executeCdpCommand"] = (
+            "POST", "/session/$sessionId/goog/cdp/execute")
+        driver.execute("executeCdpCommand", {
+            "cmd": "Network.enable", "params": {}})
+        driver.execute("executeCdpCommand", {
+            "cmd": "Network.setBlockedURLs", "params": {"urls": patterns}})
+    except Exception:
+        # Older versions of chromedriver don't support this command
+        warnings.simplefilter('always', Warning)  # See Warnings
+        warnings.warn(
+            "Unable to block fonts/media on this version of chromedriver!",
+            category=Warning, stacklevel=2)
+        warnings.simplefilter('default', Warning)  # Set Default
+
+
 def _set_chrome_options(
         downloads_path, headless, proxy_string, proxy_auth,
         proxy_user, proxy_pass, user_agent, disable_csp, enable_sync,
-        user_data_dir, extension_zip, extension_dir):
+        user_data_dir, extension_zip, extension_dir, ad_block_on,
+        block_list):
     chrome_options = webdriver.ChromeOptions()
     prefs = {
         "download.default_directory": downloads_path,
@@ -108,6 +170,8 @@ def _set_chrome_options(
             "password_manager_enabled": False
         }
     }
+    if "images" in block_list:
+        prefs["profile"]["managed_default_content_settings"] = {"images": 2}
     chrome_options.add_experimental_option("prefs", prefs)
     chrome_options.add_experimental_option("w3c", True)
     chrome_options.add_experimental_option(
@@ -144,6 +208,20 @@ def _set_chrome_options(
     chrome_options.add_argument("--disable-single-click-autofill")
     chrome_options.add_argument("--disable-translate")
     chrome_options.add_argument("--disable-web-security")
+    blocked_hosts = []
+    if ad_block_on:
+        blocked_hosts += ad_block_list.AD_BLOCK_HOSTS
+    if "3p" in block_list:
+        blocked_hosts += resource_block_list.THIRD_PARTY_HOSTS
+    if blocked_hosts:
+        chrome_options.add_argument(
+            "--host-resolver-rules=%s" % _get_host_resolver_rules(
+                blocked_hosts))
+    if "images" in block_list:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    if "media" in block_list:
+        chrome_options.add_argument(
+            "--autoplay-policy=user-gesture-required")
     if (settings.DISABLE_CSP_ON_CHROME or disable_csp) and not headless:
         # Headless Chrome doesn't support extensions, which are required
         # for disabling the Content Security Policy on Chrome
@@ -170,7 +248,7 @@ def _set_chrome_options(
 
 
 def _create_firefox_profile(
-        downloads_path, proxy_string, user_agent, disable_csp):
+        downloads_path, proxy_string, user_agent, disable_csp, block_list):
     profile = webdriver.FirefoxProfile()
     profile.accept_untrusted_certs = True
     profile.set_preference("reader.parse-on-load.enabled", False)
@@ -208,6 +286,15 @@ def _create_firefox_profile(
         "security.mixed_content.block_active_content", False)
     if settings.DISABLE_CSP_ON_FIREFOX or disable_csp:
         profile.set_preference("security.csp.enable", False)
+    if "images" in block_list:
+        profile.set_preference("permissions.default.image", 2)
+    if "fonts" in block_list:
+        profile.set_preference("browser.display.use_document_fonts", 0)
+    if "media" in block_list:
+        profile.set_preference("media.autoplay.default", 5)
+        profile.set_preference("media.autoplay.enabled", False)
+    if "3p" in block_list:
+        profile.set_preference("privacy.trackingprotection.enabled", True)
     profile.set_preference(
         "browser.download.manager.showAlertOnComplete", False)
     profile.set_preference("browser.shell.checkDefaultBrowser", False)
@@ -275,7 +362,8 @@ def get_driver(browser_name, headless=False, use_grid=False,
                servername='localhost', port=4444, proxy_string=None,
                user_agent=None, cap_file=None, disable_csp=None,
                enable_sync=None, user_data_dir=None,
-               extension_zip=None, extension_dir=None):
+               extension_zip=None, extension_dir=None, ad_block_on=False,
+               block=None, profile=False, cap_name=None):
     proxy_auth = False
     proxy_user = None
     proxy_pass = None
@@ -301,38 +389,47 @@ def get_driver(browser_name, headless=False, use_grid=False,
         proxy_string = validate_proxy_string(proxy_string)
         if proxy_string and proxy_user and proxy_pass:
             proxy_auth = True
+    block_list = _get_block_list(block)
     if browser_name == "chrome" and user_data_dir and len(user_data_dir) < 3:
         raise Exception(
             "Name length of Chrome's User Data Directory must be >= 3.")
     if use_grid:
-        return get_remote_driver(
+        driver = get_remote_driver(
             browser_name, headless, servername, port,
             proxy_string, proxy_auth, proxy_user, proxy_pass, user_agent,
-            cap_file, disable_csp, enable_sync, user_data_dir,
-            extension_zip, extension_dir)
+            cap_file, cap_name, disable_csp, enable_sync, user_data_dir,
+            extension_zip, extension_dir, ad_block_on, block_list)
     else:
-        return get_local_driver(
+        driver = get_local_driver(
             browser_name, headless,
             proxy_string, proxy_auth, proxy_user, proxy_pass, user_agent,
             disable_csp, enable_sync, user_data_dir,
-            extension_zip, extension_dir)
+            extension_zip, extension_dir, ad_block_on, block_list)
+    if browser_name == constants.Browser.GOOGLE_CHROME:
+        _block_chrome_urls(driver, block_list)
+    if profile:
+        profile_helper.instrument_driver(driver)
+    return driver
 
 
 def get_remote_driver(
         browser_name, headless, servername, port, proxy_string, proxy_auth,
-        proxy_user, proxy_pass, user_agent, cap_file, disable_csp,
-        enable_sync, user_data_dir, extension_zip, extension_dir):
+        proxy_user, proxy_pass, user_agent, cap_file, cap_name, disable_csp,
+        enable_sync, user_data_dir, extension_zip, extension_dir,
+        ad_block_on, block_list):
     downloads_path = download_helper.get_downloads_folder()
     download_helper.reset_downloads_folder()
     address = "http://%s:%s/wd/hub" % (servername, port)
     desired_caps = {}
     if cap_file:
-        desired_caps = capabilities_parser.get_desired_capabilities(cap_file)
+        desired_caps = capabilities_parser.get_desired_capabilities(
+            cap_file, cap_name)
     if browser_name == constants.Browser.GOOGLE_CHROME:
         chrome_options = _set_chrome_options(
             downloads_path, headless, proxy_string, proxy_auth,
             proxy_user, proxy_pass, user_agent, disable_csp, enable_sync,
-            user_data_dir, extension_zip, extension_dir)
+            user_data_dir, extension_zip, extension_dir, ad_block_on,
+            block_list)
         capabilities = chrome_options.to_capabilities()
         for key in desired_caps.keys():
             capabilities[key] = desired_caps[key]
@@ -343,7 +440,8 @@ def get_remote_driver(
         try:
             # Use Geckodriver for Firefox if it's on the PATH
             profile = _create_firefox_profile(
-                downloads_path, proxy_string, user_agent, disable_csp)
+                downloads_path, proxy_string, user_agent, disable_csp,
+                block_list)
             firefox_capabilities = DesiredCapabilities.FIREFOX.copy()
             firefox_capabilities['marionette'] = True
             if headless:
@@ -360,7 +458,8 @@ def get_remote_driver(
         except WebDriverException:
             # Don't use Geckodriver: Only works for old versions of Firefox
             profile = _create_firefox_profile(
-                downloads_path, proxy_string, user_agent, disable_csp)
+                downloads_path, proxy_string, user_agent, disable_csp,
+                block_list)
             firefox_capabilities = DesiredCapabilities.FIREFOX.copy()
             firefox_capabilities['marionette'] = False
             if headless:
@@ -442,7 +541,7 @@ def get_local_driver(
         browser_name, headless,
         proxy_string, proxy_auth, proxy_user, proxy_pass, user_agent,
         disable_csp, enable_sync, user_data_dir,
-        extension_zip, extension_dir):
+        extension_zip, extension_dir, ad_block_on, block_list):
     '''
     Spins up a new web browser and returns the driver.
     Can also be used to spin up additional browsers for the same test.
@@ -455,7 +554,8 @@ def get_local_driver(
             try:
                 # Use Geckodriver for Firefox if it's on the PATH
                 profile = _create_firefox_profile(
-                    downloads_path, proxy_string, user_agent, disable_csp)
+                    downloads_path, proxy_string, user_agent, disable_csp,
+                    block_list)
                 firefox_capabilities = DesiredCapabilities.FIREFOX.copy()
                 firefox_capabilities['marionette'] = True
                 options = webdriver.FirefoxOptions()
@@ -476,7 +576,8 @@ def get_local_driver(
             except WebDriverException:
                 # Don't use Geckodriver: Only works for old versions of Firefox
                 profile = _create_firefox_profile(
-                    downloads_path, proxy_string, user_agent, disable_csp)
+                    downloads_path, proxy_string, user_agent, disable_csp,
+                    block_list)
                 firefox_capabilities = DesiredCapabilities.FIREFOX.copy()
                 firefox_capabilities['marionette'] = False
                 firefox_driver = webdriver.Firefox(
@@ -537,7 +638,7 @@ def get_local_driver(
                 downloads_path, headless,
                 proxy_string, proxy_auth, proxy_user, proxy_pass, user_agent,
                 disable_csp, enable_sync, user_data_dir,
-                extension_zip, extension_dir)
+                extension_zip, extension_dir, ad_block_on, block_list)
             if LOCAL_CHROMEDRIVER and os.path.exists(LOCAL_CHROMEDRIVER):
                 make_driver_executable_if_not(LOCAL_CHROMEDRIVER)
                 return webdriver.Chrome(
@@ -0,0 +1,176 @@
+"""
+This module bundles the JavaScript and CSS libraries that are stored in the
+"seleniumbase/resources" folder into single inline scripts.
+A bundle is built once per process, then injected into the page with a single
+execute_script() call, so no network access to a CDN is required.
+These helper methods SHOULD NOT be called directly from tests.
+"""
+import codecs
+import json
+import os
+import threading
+
+RESOURCES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "resources")
+
+# Each bundle lists the bundles that it requires, the resource files to inline
+# (paths are relative to RESOURCES_DIR), and a JS expression that is true once
+# the library is active. Libraries that are already active get skipped.
+BUNDLES = {
+    "jquery": {
+        "requires": [],
+        "css": [],
+        "js": ["jquery/jquery.min.js"],
+        "verify": "typeof jQuery !== 'undefined'",
+    },
+    "messenger": {
+        "requires": ["jquery"],
+        "css": [
+            "messenger/messenger.min.css",
+            "messenger/messenger-theme-future.css",
+            "messenger/messenger-theme-block.css",
+            "messenger/messenger-theme-air.css",
+            "messenger/messenger-theme-ice.css",
+            "messenger/messenger-spinner.css",
+        ],
+        "js": [
+            "shepherd/underscore-min.js",
+            "shepherd/backbone-min.js",
+            "messenger/messenger.min.js",
+            "messenger/messenger-theme-flat.js",
+            "messenger/messenger-theme-future.js",
+        ],
+        "verify": "typeof Messenger !== 'undefined'",
+    },
+    "jquery_confirm": {
+        "requires": ["jquery"],
+        "css": ["jquery_confirm/jquery-confirm.min.css"],
+        "js": ["jquery_confirm/jquery-confirm.min.js"],
+        "verify": "typeof jconfirm !== 'undefined'",
+    },
+    "bootstrap_tour": {
+        "requires": ["jquery"],
+        "css": ["bootstrap_tour/bootstrap-tour-standalone.min.css"],
+        "js": ["bootstrap_tour/bootstrap-tour-standalone.min.js"],
+        "verify": "typeof Tour !== 'undefined'",
+    },
+    "hopscotch": {
+        "requires": ["bootstrap_tour"],
+        "css": ["hopscotch/hopscotch.min.css"],
+        "js": ["hopscotch/hopscotch.min.js"],
+        "verify": "typeof hopscotch !== 'undefined'",
+    },
+    "introjs": {
+        "requires": ["bootstrap_tour"],
+        "css": ["introjs/introjs.min.css"],
+        "js": ["introjs/intro.min.js"],
+        "verify": "typeof introJs !== 'undefined'",
+    },
+    "shepherd": {
+        "requires": ["bootstrap_tour"],
+        "css": [
+            "messenger/messenger-spinner.css",
+            "shepherd/shepherd-theme-arrows.css",
+            "shepherd/shepherd-theme-arrows-fix.css",
+            "shepherd/shepherd-theme-default.css",
+            "shepherd/shepherd-theme-dark.css",
+            "shepherd/shepherd-theme-square.css",
+            "shepherd/shepherd-theme-square-dark.css",
+        ],
+        "js": [
+            "shepherd/tether.min.js",
+            "shepherd/shepherd.min.js",
+        ],
+        "verify": "typeof Shepherd !== 'undefined'",
+    },
+}
+
+INJECT_FUNCTION = (
+    """var sbHead = document.getElementsByTagName('head')[0] ||
+                  document.documentElement;
+       var sbInject = function(css, js) {
+           if (css) {
+               var style = document.createElement('style');
+               style.type = 'text/css';
+               style.appendChild(document.createTextNode(css));
+               sbHead.appendChild(style);
+           }
+           if (js) {
+               var script = document.createElement('script');
+               script.type = 'text/javascript';
+               script.text = js;
+               sbHead.appendChild(script);
+           }
+       };
+    """)
+
+_bundle_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _read_resource(path):
+    file_path = os.path.join(RESOURCES_DIR, path)
+    with codecs.open(file_path, "r", "utf-8") as f:
+        return f.read()
+
+
+def _to_js_string(text):
+    """ Returns text as a JavaScript string literal.
+        (json.dumps() escapes quotes, newlines, and all non-ASCII chars.) """
+    return json.dumps(text)
+
+
+def _get_bundle_order(name, order=None):
+    """ Returns the list of bundle names to inject, dependencies first. """
+    if name not in BUNDLES:
+        raise Exception("Bundle {%s} does not exist! Choose from: %s" % (
+            name, sorted(BUNDLES.keys())))
+    if order is None:
+        order = []
+    for required in BUNDLES[name]["requires"]:
+        _get_bundle_order(required, order)
+    if name not in order:
+        order.append(name)
+    return order
+
+
+def _build_bundle(name):
+    script = INJECT_FUNCTION
+    for bundle_name in _get_bundle_order(name):
+        bundle = BUNDLES[bundle_name]
+        css = "\n".join([_read_resource(path) for path in bundle["css"]])
+        js = ";\n".join([_read_resource(path) for path in bundle["js"]])
+        script += "if (!(%s)) { sbInject(%s, %s); }\n" % (
+            bundle["verify"], _to_js_string(css), _to_js_string(js))
+    script += "return (%s);" % BUNDLES[name]["verify"]
+    return script
+
+
+def get_bundle(name):
+    """ Returns the inline script for the bundle (and its dependencies).
+        Resource files are only read the first time a bundle is requested,
+        after which the script comes from an in-memory cache. """
+    with _cache_lock:
+        if name not in _bundle_cache:
+            _bundle_cache[name] = _build_bundle(name)
+        return _bundle_cache[name]
+
+
+def is_bundle_active(driver, name):
+    try:
+        return bool(driver.execute_script(
+            "return (%s);" % BUNDLES[name]["verify"]))
+    except Exception:
+        return False
+
+
+def inject_bundle(driver, name):
+    """ Injects the bundle into the current page with one execute_script().
+        Returns True if the library is active afterwards. Returns False if the
+        page blocked the inline script (such as from a strict CSP), in which
+        case callers may fall back to loading the library by URL. """
+    script = get_bundle(name)
+    try:
+        return bool(driver.execute_script(script))
+    except Exception:
+        return False
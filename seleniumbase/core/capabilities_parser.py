@@ -1,179 +1,240 @@
-import re
-
-
-def get_desired_capabilities(cap_file):
-    if not cap_file.endswith('.py'):
-        raise Exception("\n\n`%s` is not a Python file!\n\n" % cap_file)
-
-    f = open(cap_file, 'r')
-    all_code = f.read()
-    f.close()
-
-    desired_capabilities = {}
-    num_capabilities = 0
-
-    code_lines = all_code.split('\n')
-    for line in code_lines:
-        if "desired_cap = {" in line:
-            line = line.split("desired_cap = {")[1]
-
-        # 'KEY' : 'VALUE'
-        data = re.match(r"^\s*'([\S\s]+)'\s*:\s*'([\S\s]+)'\s*[,}]?\s*$", line)
-        if data:
-            key = data.group(1)
-            value = data.group(2)
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # "KEY" : "VALUE"
-        data = re.match(r'^\s*"([\S\s]+)"\s*:\s*"([\S\s]+)"\s*[,}]?\s*$', line)
-        if data:
-            key = data.group(1)
-            value = data.group(2)
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # 'KEY' : "VALUE"
-        data = re.match(
-            r'''^\s*'([\S\s]+)'\s*:\s*"([\S\s]+)"\s*[,}]?\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = data.group(2)
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # "KEY" : 'VALUE'
-        data = re.match(
-            r'''^\s*"([\S\s]+)"\s*:\s*'([\S\s]+)'\s*[,}]?\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = data.group(2)
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # "KEY" : True
-        data = re.match(
-            r'''^\s*"([\S\s]+)"\s*:\s*True\s*[,}]?\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = True
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # 'KEY' : True
-        data = re.match(
-            r'''^\s*'([\S\s]+)'\s*:\s*True\s*[,}]?\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = True
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # "KEY" : False
-        data = re.match(
-            r'''^\s*"([\S\s]+)"\s*:\s*False\s*[,}]?\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = False
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # 'KEY' : False
-        data = re.match(
-            r'''^\s*'([\S\s]+)'\s*:\s*False\s*[,}]?\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = False
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # caps['KEY'] = 'VALUE'
-        data = re.match(r"^\s*caps\['([\S\s]+)'\]\s*=\s*'([\S\s]+)'\s*$", line)
-        if data:
-            key = data.group(1)
-            value = data.group(2)
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # caps["KEY"] = "VALUE"
-        data = re.match(r'^\s*caps\["([\S\s]+)"\]\s*=\s*"([\S\s]+)"\s*$', line)
-        if data:
-            key = data.group(1)
-            value = data.group(2)
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # caps['KEY'] = "VALUE"
-        data = re.match(
-            r'''^\s*caps\['([\S\s]+)'\]\s*=\s*"([\S\s]+)"\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = data.group(2)
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # caps["KEY"] = 'VALUE'
-        data = re.match(
-            r'''^\s*caps\["([\S\s]+)"\]\s*=\s*'([\S\s]+)'\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = data.group(2)
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # caps["KEY"] = True
-        data = re.match(
-            r'''^\s*caps\["([\S\s]+)"\]\s*=\s*True\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = True
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # caps['KEY'] = True
-        data = re.match(
-            r'''^\s*caps\['([\S\s]+)'\]\s*=\s*True\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = True
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # caps["KEY"] = False
-        data = re.match(
-            r'''^\s*caps\["([\S\s]+)"\]\s*=\s*False\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = False
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-        # caps['KEY'] = False
-        data = re.match(
-            r'''^\s*caps\['([\S\s]+)'\]\s*=\s*False\s*$''', line)
-        if data:
-            key = data.group(1)
-            value = False
-            desired_capabilities[key] = value
-            num_capabilities += 1
-            continue
-
-    if num_capabilities == 0:
+"""
+This module loads the desired capabilities file (--cap_file) for browsers.
+The file can be a Python file (such as the ones that BrowserStack and
+Sauce Labs generate), a JSON file, or a YAML file.
+A file can also have named capability sets (for a browser/OS matrix), which
+get selected with --cap_name=NAME. (Or with get_new_driver(cap_name=NAME).)
+Each named set is combined with the top-level capabilities of the file:
+    Python:  desired_cap = {...}  &  capability_sets = {"NAME": {...}, ...}
+    JSON:    {..., "capability_sets": {"NAME": {...}, ...}}
+    YAML:    capability_sets:  NAME:  KEY: VALUE
+Files are parsed and validated once per process, and then cached by path
+and modification time.
+These helper methods SHOULD NOT be called directly from tests.
+"""
+import ast
+import copy
+import json
+import os
+
+CAPABILITY_SETS_KEY = "capability_sets"
+PYTHON_EXTENSIONS = [".py"]
+JSON_EXTENSIONS = [".json"]
+YAML_EXTENSIONS = [".yaml", ".yml"]
+
+# The types of the W3C WebDriver capabilities.
+# (Other keys, such as "browserstack.local", can have any JSON value.)
+W3C_CAPABILITY_TYPES = {
+    "browserName": "string",
+    "browserVersion": "string",
+    "platformName": "string",
+    "acceptInsecureCerts": "bool",
+    "pageLoadStrategy": "string",
+    "proxy": "dict",
+    "setWindowRect": "bool",
+    "timeouts": "dict",
+    "strictFileInteractability": "bool",
+    "unhandledPromptBehavior": "string",
+}
+PAGE_LOAD_STRATEGIES = ["none", "eager", "normal"]
+
+try:
+    string_types = (str, unicode)  # noqa: ignore=F821 (Python 2)
+except NameError:
+    string_types = (str,)
+value_types = string_types + (bool, int, float, list, dict, type(None))
+
+_loaded_capabilities = {}  # {abs_path: CapabilitySets}
+
+
+class CapabilitySets(object):
+    """ The parsed (and validated) capabilities of a capabilities file. """
+
+    def __init__(self, cap_file, default, named, file_stat=None):
+        self.cap_file = cap_file
+        self.default = default  # {key: value}
+        self.named = named  # {cap_name: {key: value}}
+        self.file_stat = file_stat  # (mtime, size) when the file was parsed
+
+    def is_current(self, file_stat):
+        return self.file_stat == file_stat
+
+    def get_names(self):
+        return sorted(self.named.keys())
+
+    def get(self, cap_name=None):
+        """ Returns a copy of the desired capabilities of the named set
+            (combined with the top-level capabilities of the file). """
+        capabilities = copy.deepcopy(self.default)
+        if cap_name:
+            if cap_name not in self.named:
+                raise Exception(
+                    "\n\nCapability set {%s} was not found in {%s}! "
+                    "Available sets: %s\n\n" % (
+                        cap_name, self.cap_file, self.get_names()))
+            capabilities.update(copy.deepcopy(self.named[cap_name]))
+        return capabilities
+
+
+def _get_file_stat(cap_file):
+    stat = os.stat(cap_file)
+    return (stat.st_mtime, stat.st_size)
+
+
+def _get_subscript_key(target):
+    """ Returns the key of "caps['KEY'] = VALUE". """
+    key_node = target.slice
+    if hasattr(ast, "Index") and isinstance(key_node, ast.Index):
+        key_node = key_node.value  # (Before Python 3.9)
+    return ast.literal_eval(key_node)
+
+
+def _parse_python_data(cap_file, all_code):
+    """ Returns the top-level dictionaries of a Python capabilities file as
+        one dictionary. Supports "desired_cap = {'KEY': 'VALUE', ...}" and
+        "caps = {}" followed by "caps['KEY'] = 'VALUE'" lines. """
+    try:
+        tree = ast.parse(all_code, cap_file)
+    except SyntaxError as e:
+        raise Exception(
+            "\n\nUnable to parse the capabilities file {%s}!\n%s\n\n" % (
+                cap_file, e))
+    dict_names = set()
+    data = {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign):
+            continue
+        for target in node.targets:
+            try:
+                if isinstance(target, ast.Name) and (
+                        isinstance(node.value, ast.Dict)):
+                    dict_names.add(target.id)
+                    value = ast.literal_eval(node.value)
+                    if target.id == CAPABILITY_SETS_KEY:
+                        data[CAPABILITY_SETS_KEY] = value
+                    else:
+                        data.update(value)
+                elif isinstance(target, ast.Subscript) and (
+                        isinstance(target.value, ast.Name) and (
+                            target.value.id in dict_names)):
+                    key = _get_subscript_key(target)
+                    value = ast.literal_eval(node.value)
+                    if target.value.id == CAPABILITY_SETS_KEY:
+                        data.setdefault(CAPABILITY_SETS_KEY, {})[key] = value
+                    else:
+                        data[key] = value
+            except ValueError:
+                raise Exception(
+                    "\n\nCapabilities must be literal values! Unable to parse "
+                    "line %s of the capabilities file {%s}.\n\n" % (
+                        node.lineno, cap_file))
+    return data
+
+
+def _parse_yaml_data(cap_file, all_code):
+    try:
+        import yaml
+    except ImportError:
+        raise Exception(
+            "\n\nPyYAML is needed for YAML capabilities files! "
+            "Install it with:\n >>> pip install pyyaml <<<\n\n")
+    try:
+        return yaml.safe_load(all_code)
+    except yaml.YAMLError as e:
+        raise Exception(
+            "\n\nUnable to parse the capabilities file {%s}!\n%s\n\n" % (
+                cap_file, e))
+
+
+def _parse_json_data(cap_file, all_code):
+    try:
+        return json.loads(all_code)
+    except ValueError as e:
+        raise Exception(
+            "\n\nUnable to parse the capabilities file {%s}!\n%s\n\n" % (
+                cap_file, e))
+
+
+def validate_capabilities(capabilities, cap_file, cap_name=None):
+    """ Raises an exception if any capability has an invalid key or value.
+        (So that mistakes get caught before any browser gets launched.) """
+    location = "{%s}" % cap_file
+    if cap_name:
+        location = "capability set {%s} of {%s}" % (cap_name, cap_file)
+    if not isinstance(capabilities, dict):
+        raise Exception(
+            "\n\nCapabilities must be a dictionary in %s!\n\n" % location)
+    for key, value in capabilities.items():
+        if not isinstance(key, string_types) or (
+                not key.strip() or len(key.split()) > 1):
+            raise Exception(
+                "\n\nInvalid capability key {%s} in %s! Keys must be "
+                "strings without spaces.\n\n" % (key, location))
+        if not isinstance(value, value_types):
+            raise Exception(
+                "\n\nInvalid value for capability {%s} in %s! "
+                "Values must be strings, numbers, booleans, lists, or "
+                "dictionaries.\n\n" % (key, location))
+        expected_type = W3C_CAPABILITY_TYPES.get(key)
+        if (expected_type == "string" and (
+                not isinstance(value, string_types))) or (
+                expected_type == "bool" and not isinstance(value, bool)) or (
+                expected_type == "dict" and not isinstance(value, dict)):
+            raise Exception(
+                "\n\nThe capability {%s} in %s must be a {%s}!\n\n" % (
+                    key, location, expected_type))
+        if key == "pageLoadStrategy" and value not in PAGE_LOAD_STRATEGIES:
+            raise Exception(
+                "\n\nThe capability {pageLoadStrategy} in %s must be one "
+                "of %s!\n\n" % (location, PAGE_LOAD_STRATEGIES))
+
+
+def parse_capabilities(cap_file):
+    """ Parses and validates the capabilities file into a CapabilitySets
+        object. (Use load_capabilities() to get the cached version.) """
+    extension = os.path.splitext(cap_file)[1].lower()
+    if extension in PYTHON_EXTENSIONS:
+        parse_data = _parse_python_data
+    elif extension in JSON_EXTENSIONS:
+        parse_data = _parse_json_data
+    elif extension in YAML_EXTENSIONS:
+        parse_data = _parse_yaml_data
+    else:
+        raise Exception(
+            "\n\n`%s` is not a Python, JSON, or YAML file!\n\n" % cap_file)
+    file_stat = _get_file_stat(cap_file)
+    with open(cap_file, 'r') as f:
+        all_code = f.read()
+    data = parse_data(cap_file, all_code)
+    if not data or not isinstance(data, dict):
         raise Exception("Unable to parse desired capabilities file!")
 
-    return desired_capabilities
+    default = dict(data)
+    named = default.pop(CAPABILITY_SETS_KEY, None) or {}
+    validate_capabilities(default, cap_file)
+    if not isinstance(named, dict):
+        raise Exception(
+            "\n\n{%s} must be a dictionary of capability sets in {%s}!\n\n"
+            % (CAPABILITY_SETS_KEY, cap_file))
+    for cap_name, capabilities in named.items():
+        validate_capabilities(capabilities, cap_file, cap_name)
+    return CapabilitySets(cap_file, default, named, file_stat)
+
+
+def load_capabilities(cap_file):
+    """ Returns the CapabilitySets of the capabilities file.
+        The file only gets parsed again if it was modified. """
+    abs_path = os.path.abspath(cap_file)
+    capability_sets = _loaded_capabilities.get(abs_path)
+    if capability_sets and (
+            capability_sets.is_current(_get_file_stat(abs_path))):
+        return capability_sets
+    capability_sets = parse_capabilities(cap_file)
+    _loaded_capabilities[abs_path] = capability_sets
+    return capability_sets
+
+
+def get_desired_capabilities(cap_file, cap_name=None):
+    """ Returns the desired capabilities of the capabilities file.
+        If cap_name is set, uses that named capability set of the file. """
+    return load_capabilities(cap_file).get(cap_name)
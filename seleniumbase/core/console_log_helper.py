@@ -0,0 +1,155 @@
+"""
+This module contains the browser console log collector that is used by
+assert_no_js_errors() and the "--check-js" option.
+The log only gets drained from the test thread (after each page load, and
+at each assert_no_js_errors() call), since WebDriver sessions aren't safe to
+share with other threads. Chrome's browser log gets drained directly.
+For browsers without a browser log (such as Firefox), a window.onerror
+hook gets injected into each page instead.
+Entries are stored in a bounded ring buffer along with the URL, test, and
+step (page load number) that they came from, so that assertions become a
+quick check of the error count against data that was already collected.
+These helper methods SHOULD NOT be called directly from tests.
+"""
+import collections
+
+MAX_ENTRIES = 1000
+
+# Installs the error hooks (if not already installed on the page), and then
+# returns & clears the errors that were collected since the last call.
+JS_ERROR_HOOK_SCRIPT = (
+    """if (!window.sbJsErrors) {
+           window.sbJsErrors = [];
+           var sbAddJsError = function(message) {
+               if (window.sbJsErrors.length < 100) {
+                   window.sbJsErrors.push(
+                       {message: String(message), timestamp: Date.now()});
+               }
+           };
+           window.addEventListener('error', function(event) {
+               var source = event.filename || (event.target &&
+                   (event.target.src || event.target.href)) || '';
+               sbAddJsError(source + ' ' + (event.message ||
+                   'Failed to load resource'));
+           }, true);
+           window.addEventListener('unhandledrejection', function(event) {
+               sbAddJsError('Uncaught (in promise) ' + event.reason);
+           });
+           var sbConsoleError = console.error;
+           console.error = function() {
+               sbAddJsError(Array.prototype.join.call(arguments, ' '));
+               return sbConsoleError.apply(console, arguments);
+           };
+       }
+       return window.sbJsErrors.splice(0);""")
+
+
+class ConsoleLogCollector(object):
+    """ Collects the browser console log entries of one driver. """
+
+    def __init__(self, driver, max_entries=MAX_ENTRIES):
+        self.driver = driver
+        self.entries = collections.deque(maxlen=max_entries)
+        self.errors = collections.deque(maxlen=max_entries)
+        self.error_count = 0  # Total "SEVERE" entries (including dropped)
+        self.checked_error_count = 0
+        self.test_id = None
+        self.url = None
+        self.step = 0
+        self.uses_browser_log = True
+
+    def start(self):
+        """ Drains the browser log for the first time. Returns False if the
+            browser has no log, in which case the window.onerror hook gets
+            used from then on. Entries are collected from the collect() and
+            on_page_load() calls of the test thread. """
+        try:
+            new_entries = self.driver.get_log("browser")
+        except Exception:
+            self.uses_browser_log = False
+            return False
+        self.__add_entries(new_entries)
+        return True
+
+    def stop(self):
+        """ Drains the remaining entries before the browser gets closed. """
+        self.collect()
+
+    def set_test(self, test_id):
+        """ Entries get attributed to this test until the next one starts. """
+        self.test_id = test_id
+        self.step = 0
+
+    def on_page_load(self, url):
+        """ Called from the test thread after each page load.
+            (Not after every action, since that costs extra round trips.) """
+        if self.uses_browser_log:
+            self.collect()  # (Entries so far came from the previous page)
+            self.url = url
+            self.step += 1
+        else:
+            self.url = url
+            self.step += 1
+            self.collect()  # (Also installs the hook on the new page)
+
+    def collect(self):
+        """ Drains the new browser log entries into the ring buffer. """
+        try:
+            if self.uses_browser_log:
+                new_entries = self.driver.get_log("browser")
+            else:
+                new_entries = self.driver.execute_script(
+                    JS_ERROR_HOOK_SCRIPT)
+                for entry in new_entries:
+                    entry["level"] = "SEVERE"
+        except Exception:
+            return  # (Such as when the browser has been closed)
+        self.__add_entries(new_entries)
+
+    def __add_entries(self, new_entries):
+        for entry in new_entries:
+            entry["url"] = self.url
+            entry["test"] = self.test_id
+            entry["step"] = self.step
+            self.entries.append(entry)
+            if entry.get("level") == "SEVERE":
+                self.errors.append(entry)
+                self.error_count += 1
+
+    def get_new_errors(self):
+        """ Returns the errors (still in the ring buffer) that were collected
+            since the last call, which is a quick check if there are none. """
+        new_error_count = self.error_count - self.checked_error_count
+        self.checked_error_count = self.error_count
+        if new_error_count <= 0:
+            return []
+        errors = list(self.errors)
+        return errors[-min(new_error_count, len(errors)):]
+
+
+def get_collector(driver, test_id=None):
+    """ Returns the driver's collector (or None if it has none).
+        If the driver gets reused by another test, the entries so far get
+        attributed to the previous test, and the rest to the new one. """
+    collector = getattr(driver, "_sb_console_log_collector", None)
+    if collector is not None and test_id and collector.test_id != test_id:
+        collector.collect()
+        collector.set_test(test_id)
+    return collector
+
+
+def start_collector(driver, test_id=None):
+    """ Returns the driver's collector, creating & starting it if needed. """
+    collector = get_collector(driver, test_id)
+    if collector is None:
+        collector = ConsoleLogCollector(driver)
+        collector.set_test(test_id)
+        collector.start()
+        driver._sb_console_log_collector = collector
+    return collector
+
+
+def stop_collector(driver):
+    collector = get_collector(driver)
+    if collector is not None:
+        collector.stop()
@@ -0,0 +1,76 @@
+"""
+This module keeps a pool of virtual displays (Xvfb) for headless test runs.
+Instead of starting (and stopping) a new X server for every test, each
+process (such as each pytest-xdist worker) starts one virtual display of
+each screen size, and then reuses it for all of its tests.
+The displays get stopped at the end of the test session.
+If a virtual display can't be started, that gets remembered, so that the
+next tests of the process don't wait for it to fail again.
+These helper methods SHOULD NOT be called directly from tests.
+"""
+import atexit
+import threading
+
+DISPLAY_SIZE = (1440, 1880)
+MAX_START_ATTEMPTS = 3
+
+_displays = {}  # {size: Display}
+_failed_displays = {}  # {size: The error message of the last start attempt}
+_displays_lock = threading.Lock()
+_atexit_registered = []
+
+
+def get_display(size=DISPLAY_SIZE):
+    """ Returns a running virtual display of the given size, starting one
+        if this process doesn't have one yet. (Or if it has exited.)
+        Sets the DISPLAY environment variable to the virtual display.
+        If the display already failed to start in this process, raises an
+        Exception right away. """
+    size = tuple(size)
+    with _displays_lock:
+        if size in _failed_displays:
+            # (A new Exception, so that tracebacks don't pile up on one)
+            raise Exception(
+                "The virtual display failed to start earlier in this "
+                "process! %s" % _failed_displays[size])
+        display = _displays.get(size)
+        if display and display.is_alive():
+            display.redirect_display(True)
+            return display
+        if display:
+            # The X server has exited. Release its display number
+            try:
+                display.stop()
+            except Exception:
+                pass
+            del _displays[size]
+        # from pyvirtualdisplay import Display  # Skip for own lib
+        from seleniumbase.virtual_display.display import Display
+        for attempt in range(MAX_START_ATTEMPTS):
+            display = Display(visible=0, size=size)
+            try:
+                display.start()
+                break
+            except Exception as e:
+                # (Another X server may have taken the display number)
+                if attempt == MAX_START_ATTEMPTS - 1:
+                    _failed_displays[size] = str(e)
+                    raise
+        _displays[size] = display
+        if not _atexit_registered:
+            atexit.register(stop_displays)
+            _atexit_registered.append(True)
+        return display
+
+
+def stop_displays():
+    """ Stops all the virtual displays of this process. """
+    with _displays_lock:
+        displays = list(_displays.values())
+        _displays.clear()
+        _failed_displays.clear()
+    for display in displays:
+        try:
+            display.stop()
+        except Exception:
+            pass
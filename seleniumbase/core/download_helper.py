@@ -1,9 +1,20 @@
+import hashlib
+import json
 import os
+import re
+import select
 import shutil
 import sys
+import threading
 import time
+import uuid
 from seleniumbase.config import settings
+from seleniumbase.core import timing_helper
 from seleniumbase.fixtures import constants
+try:
+    from concurrent import futures  # Python 3 (or the "futures" backport)
+except ImportError:
+    futures = None
 
 # Folder for saving downloaded files.
 # If initiated by WebDriver clicks, works ONLY for Chrome and Firefox.
@@ -17,36 +28,497 @@ downloads_path = os.path.join(abs_path, DOWNLOADS_DIR)
 
 
 def get_downloads_folder():
+    """ Returns the downloads folder of this process.
+        When running tests in parallel (pytest-xdist), each worker gets its
+        own sub-folder (Eg: "downloaded_files/gw0"), so that workers never
+        share (or archive) each other's downloads. """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        return os.path.join(downloads_path, worker)
     return downloads_path
 
 
 def reset_downloads_folder():
     ''' Clears the downloads folder.
         If settings.ARCHIVE_EXISTING_DOWNLOADS is set to True, archives it. '''
-    if os.path.exists(downloads_path) and not os.listdir(downloads_path) == []:
-        archived_downloads_folder = os.path.join(downloads_path, '..',
-                                                 ARCHIVE_DIR)
-        if not "".join(sys.argv) == "-c":
-            # Only move files if the test run is not multi-threaded.
-            # (Running tests with "-n NUM" will create threads that only
-            # have "-c" in the sys.argv list. Easy to catch.)
-            reset_downloads_folder_assistant(archived_downloads_folder)
+    downloads_folder = get_downloads_folder()
+    if os.path.exists(downloads_folder) and os.listdir(downloads_folder):
+        archived_downloads_folder = os.path.join(abs_path, ARCHIVE_DIR)
+        reset_downloads_folder_assistant(archived_downloads_folder)
+    elif not os.path.exists(downloads_folder):
+        try:
+            os.makedirs(downloads_folder)
+        except Exception:
+            pass  # (Another worker may have already created the parent)
 
 
 def reset_downloads_folder_assistant(archived_downloads_folder):
+    """ Moves the downloads folder of this process into the archive folder
+        with a single rename, which is atomic on the same file system.
+        Every process only moves its own folder, so no locks are needed. """
+    downloads_folder = get_downloads_folder()
     if not os.path.exists(archived_downloads_folder):
         try:
             os.makedirs(archived_downloads_folder)
         except Exception:
-            pass  # Should only be reachable during multi-threaded test runs
-    new_archived_downloads_sub_folder = "%s/downloads_%s" % (
-        archived_downloads_folder, int(time.time()))
-    if os.path.exists(downloads_path):
-        if not os.listdir(downloads_path) == []:
-            shutil.move(downloads_path, new_archived_downloads_sub_folder)
-            os.makedirs(downloads_path)
+            pass  # (Another worker may have already created it)
+    sub_folder_name = "downloads_%s" % int(time.time())
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        sub_folder_name = "%s_%s" % (sub_folder_name, worker)
+    new_archived_downloads_sub_folder = os.path.join(
+        archived_downloads_folder, sub_folder_name)
+    count = 1
+    while os.path.exists(new_archived_downloads_sub_folder):
+        count += 1
+        new_archived_downloads_sub_folder = os.path.join(
+            archived_downloads_folder, "%s_%s" % (sub_folder_name, count))
+    if os.path.exists(downloads_folder) and os.listdir(downloads_folder):
+        try:
+            os.rename(downloads_folder, new_archived_downloads_sub_folder)
+        except OSError:
+            # (Eg: The archive folder is on a different file system)
+            shutil.move(downloads_folder, new_archived_downloads_sub_folder)
+        os.makedirs(downloads_folder)
     if not settings.ARCHIVE_EXISTING_DOWNLOADS:
         try:
             shutil.rmtree(new_archived_downloads_sub_folder)
         except OSError:
             pass
+
+
+# Downloads made with download_file() / save_file_as() get streamed to disk
+# in chunks (in constant memory) through a shared, connection-pooled session.
+# Each download writes to its own temp file, which gets renamed when done.
+# An interrupted download is kept as "<file_name>.sbpart" (with the ETag or
+# Last-Modified date of the file in "<file_name>.sbpart.resume"), so that the
+# next download of the same file can resume it with an If-Range request.
+# Downloads can also run in a background thread pool (start_download()).
+CHUNK_SIZE = 64 * 1024
+MAX_DOWNLOAD_WORKERS = 4
+DOWNLOAD_TIMEOUT = 60  # Seconds to wait for the server (not the whole file)
+PART_FILE_SUFFIX = ".sbpart"  # (Not ".part", which Firefox downloads use)
+RESUME_INFO_SUFFIX = ".resume"
+
+_session = None
+_executor = None
+_download_lock = threading.Lock()
+
+
+def get_session():
+    """ Returns the requests session that is shared by all downloads. """
+    global _session
+    with _download_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=MAX_DOWNLOAD_WORKERS,
+                pool_maxsize=MAX_DOWNLOAD_WORKERS * 2)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def _parse_checksum(checksum):
+    """ "sha256:HEX" / "md5:HEX" / "HEX" (sha256) => (algorithm, hex). """
+    if ":" in checksum:
+        algorithm, hex_digest = checksum.split(":", 1)
+    else:
+        algorithm, hex_digest = "sha256", checksum
+    return algorithm.lower(), hex_digest.strip().lower()
+
+
+def get_file_checksum(file_path, algorithm="sha256"):
+    file_hash = hashlib.new(algorithm)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def _get_validator(response):
+    """ Returns the ETag (or the Last-Modified date) of the file, which gets
+        sent back as If-Range when resuming. (Weak ETags can't be used.) """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _get_content_range_start(response):
+    """ "Content-Range: bytes START-END/SIZE" => START (or None). """
+    match = re.match(
+        r"bytes\s+(\d+)-", response.headers.get("Content-Range") or "")
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def _get_content_length(response):
+    """ Returns the number of bytes that the response body should have, or
+        None if unknown. (Compressed bodies get decoded while streaming.) """
+    content_length = response.headers.get("Content-Length")
+    content_encoding = response.headers.get("Content-Encoding") or "identity"
+    if content_length and content_length.isdigit() and (
+            content_encoding.lower() == "identity"):
+        return int(content_length)
+    return None
+
+
+def _get_response(file_url, timeout, downloaded_size=0, validator=None):
+    headers = {}
+    if downloaded_size and validator:
+        headers["Range"] = "bytes=%s-" % downloaded_size
+        headers["If-Range"] = validator
+    return get_session().get(
+        file_url, headers=headers, stream=True, timeout=timeout)
+
+
+def _claim_partial_download(part_file_path, temp_file_path, file_url):
+    """ Moves an interrupted download of the file to the temp file of this
+        download, and returns its If-Range validator. The rename is atomic,
+        so a ".sbpart" file can only get claimed by one download at a time.
+        Returns None if there's no partial download that can be resumed. """
+    try:
+        os.rename(part_file_path, temp_file_path)
+    except OSError:
+        return None  # (Nothing to resume, or another download claimed it)
+    info_file_path = part_file_path + RESUME_INFO_SUFFIX
+    resume_info = {}
+    try:
+        with open(info_file_path, "r") as f:
+            resume_info = json.load(f)
+        os.remove(info_file_path)
+    except (IOError, OSError, ValueError):
+        pass
+    if not isinstance(resume_info, dict) or (
+            resume_info.get("url") != file_url) or (
+            not resume_info.get("validator")):
+        os.remove(temp_file_path)  # (It can't be verified, so start over)
+        return None
+    return resume_info["validator"]
+
+
+def _release_partial_download(
+        temp_file_path, part_file_path, file_url, validator):
+    """ Keeps an interrupted download as the ".sbpart" file of the file, so
+        that it can be resumed. (Only if the server gave a validator.) """
+    try:
+        if validator and os.path.getsize(temp_file_path):
+            with open(part_file_path + RESUME_INFO_SUFFIX, "w") as f:
+                json.dump({"url": file_url, "validator": validator}, f)
+            if os.path.exists(part_file_path):
+                os.remove(part_file_path)  # (A different interrupted one)
+            os.rename(temp_file_path, part_file_path)
+        else:
+            os.remove(temp_file_path)
+    except OSError:
+        pass
+
+
+def download_file(file_url, destination_folder=None, new_file_name=None,
+                  checksum=None, resume=True, timeout=DOWNLOAD_TIMEOUT):
+    """ Downloads the file (streaming it to disk in chunks), and returns the
+        path of the downloaded file. If a previous download of the same file
+        was interrupted, it resumes from where it left off (if the server
+        supports HTTP range requests, and the file hasn't changed since).
+        If a checksum is given, such as "sha256:HEX" or "md5:HEX", the
+        downloaded file gets verified. """
+    if not destination_folder:
+        destination_folder = get_downloads_folder()
+    if new_file_name:
+        file_name = new_file_name
+    else:
+        file_name = file_url.split('?')[0].split('/')[-1]
+    if not os.path.exists(destination_folder):
+        try:
+            os.makedirs(destination_folder)
+        except Exception:
+            pass  # (Another thread may have already created it)
+    file_path = os.path.join(destination_folder, file_name)
+    part_file_path = file_path + PART_FILE_SUFFIX
+    # (Concurrent downloads of the same file never share a temp file)
+    temp_file_path = "%s.%s%s" % (
+        file_path, uuid.uuid4().hex[:12], PART_FILE_SUFFIX)
+    file_hash = None
+    if checksum:
+        algorithm, expected_digest = _parse_checksum(checksum)
+        file_hash = hashlib.new(algorithm)
+
+    validator = None
+    downloaded_size = 0
+    if resume:
+        validator = _claim_partial_download(
+            part_file_path, temp_file_path, file_url)
+        if validator:
+            downloaded_size = os.path.getsize(temp_file_path)
+    try:
+        response = _get_response(
+            file_url, timeout, downloaded_size, validator)
+        try:
+            if downloaded_size and (response.status_code == 416 or (
+                    response.status_code == 206 and (
+                        _get_content_range_start(response) != (
+                            downloaded_size)))):
+                # The server can't continue from the end of the ".sbpart" file
+                response.close()
+                downloaded_size = 0
+                response = _get_response(file_url, timeout)
+            if response.status_code >= 400:
+                raise Exception(
+                    "Download of {%s} failed! (Status code: %s)"
+                    % (file_url, response.status_code))
+            if response.status_code == 206 and downloaded_size:
+                mode = "ab"
+                if file_hash:
+                    with open(temp_file_path, "rb") as f:
+                        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                            file_hash.update(chunk)
+            else:
+                # The server sent the whole file. (Or it changed since)
+                mode = "wb"
+                downloaded_size = 0
+                validator = _get_validator(response)
+            expected_size = _get_content_length(response)
+            if expected_size is not None:
+                expected_size += downloaded_size
+            with open(temp_file_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if chunk:
+                        f.write(chunk)
+                        if file_hash:
+                            file_hash.update(chunk)
+        finally:
+            response.close()
+        file_size = os.path.getsize(temp_file_path)
+        if expected_size is not None and file_size != expected_size:
+            raise Exception(
+                "Download of {%s} was interrupted! (Got %s of %s bytes)"
+                % (file_url, file_size, expected_size))
+    except Exception:
+        if resume and os.path.exists(temp_file_path):
+            _release_partial_download(
+                temp_file_path, part_file_path, file_url, validator)
+        elif os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise
+
+    if file_hash and file_hash.hexdigest() != expected_digest:
+        os.remove(temp_file_path)
+        raise Exception(
+            "Checksum mismatch for {%s}! Expected {%s:%s} but got {%s:%s}"
+            % (file_url, algorithm, expected_digest,
+               algorithm, file_hash.hexdigest()))
+    if os.path.exists(file_path):
+        os.remove(file_path)  # (os.rename() can't overwrite on Windows)
+    os.rename(temp_file_path, file_path)
+    return file_path
+
+
+def _check_futures():
+    if futures is None:
+        raise Exception(
+            "Background downloads require Python 3 "
+            "(or the \"futures\" package on Python 2)!")
+
+
+def start_download(file_url, destination_folder=None, new_file_name=None,
+                   checksum=None, resume=True, timeout=DOWNLOAD_TIMEOUT):
+    """ Starts download_file() in the background thread pool.
+        Returns a future. (future.result() returns the downloaded file path,
+        or raises the Exception of the download if it failed.) """
+    global _executor
+    _check_futures()
+    with _download_lock:
+        if _executor is None:
+            _executor = futures.ThreadPoolExecutor(
+                max_workers=MAX_DOWNLOAD_WORKERS)
+        executor = _executor
+    return executor.submit(
+        download_file, file_url, destination_folder, new_file_name,
+        checksum, resume, timeout)
+
+
+def wait_for_downloads(download_futures, timeout=None):
+    """ Waits for the futures of start_download() to finish, and returns
+        the paths of the downloaded files (in the same order).
+        Raises the first Exception of a failed download. """
+    _check_futures()
+    done, not_done = futures.wait(download_futures, timeout=timeout)
+    if not_done:
+        raise Exception(
+            "%s of %s downloads did not finish within %s seconds!"
+            % (len(not_done), len(download_futures), timeout))
+    return [future.result() for future in download_futures]
+
+
+def shutdown_downloads(wait=True):
+    """ Shuts down the background thread pool and the shared session. """
+    global _executor
+    global _session
+    with _download_lock:
+        executor = _executor
+        session = _session
+        _executor = None
+        _session = None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+    if session is not None:
+        session.close()
+
+
+# Browser downloads are written to a temp file first, which gets renamed to
+# the final file name when the download is complete. (Chrome: ".crdownload")
+# Firefox also creates an empty placeholder file with the final file name,
+# just before the ".part" file. So an empty file only counts as a complete
+# download once it has stayed empty (without partial files) for a moment.
+PARTIAL_DOWNLOAD_SUFFIXES = [".crdownload", ".part", ".download"]
+POLL_INTERVAL = 0.1  # Seconds between checks when inotify isn't available
+EMPTY_FILE_SETTLE_TIME = 1.0  # Seconds until an empty file counts as done
+
+# inotify(7) constants (from <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM |
+              IN_MOVED_TO | IN_CREATE | IN_DELETE)
+
+
+def get_partial_download_files(file_name, folder=None):
+    """ Returns the temp files of the download that are still in progress. """
+    if not folder:
+        folder = get_downloads_folder()
+    return [file_name + suffix for suffix in PARTIAL_DOWNLOAD_SUFFIXES
+            if os.path.exists(os.path.join(folder, file_name + suffix))]
+
+
+def _get_file_size(file_path):
+    """ Returns the size of the file, or None if it doesn't exist. """
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return None
+
+
+def is_download_complete(file_name, folder=None):
+    """ The file is complete once it exists without any partial files.
+        (An empty file might still be a placeholder. See wait_for_...) """
+    if not folder:
+        folder = get_downloads_folder()
+    return bool(_get_file_size(os.path.join(folder, file_name))) and (
+        not get_partial_download_files(file_name, folder))
+
+
+class DownloadWatcher(object):
+    """ Watches a folder for changes, using inotify on Linux.
+        wait() returns as soon as there's a change in the folder.
+        If inotify isn't available, wait() sleeps for the POLL_INTERVAL. """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.fd = None
+        if sys.platform.startswith("linux"):
+            try:
+                self.fd = _start_inotify(folder)
+            except Exception:
+                self.fd = None  # (Polling will be used instead)
+
+    def wait(self, timeout):
+        if self.fd is None:
+            time.sleep(min(POLL_INTERVAL, timeout))
+            return
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self.fd, 4096):
+                    pass  # (Only the wakeup matters, not the events)
+            except OSError:
+                pass  # (EAGAIN: All events have been read)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def _start_inotify(folder):
+    """ Returns an inotify file descriptor that watches the folder. """
+    import ctypes
+    import ctypes.util
+    libc = ctypes.CDLL(
+        ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1() failed")
+    path = folder
+    if not isinstance(path, bytes):
+        path = path.encode(sys.getfilesystemencoding() or "utf-8")
+    if libc.inotify_add_watch(fd, path, WATCH_MASK) < 0:
+        os.close(fd)
+        raise OSError(ctypes.get_errno(), "inotify_add_watch() failed")
+    return fd
+
+
+def wait_for_downloaded_file(file_name, timeout, folder=None):
+    """ Waits for a (browser) download to complete, and returns the path of
+        the downloaded file. Returns the moment that the final file appears
+        without any partial download files, such as ".crdownload".
+        (Or once an empty file has stayed that way for a moment, since
+        Firefox creates an empty placeholder before the ".part" file.) """
+    if not folder:
+        folder = get_downloads_folder()
+    if not os.path.exists(folder):
+        try:
+            os.makedirs(folder)
+        except Exception:
+            pass  # (Another process may have already created it)
+    deadline = timing_helper.Deadline(timeout, "wait_for_downloaded_file")
+    watcher = DownloadWatcher(folder)  # (Started before the first check)
+    file_path = os.path.join(folder, file_name)
+    empty_since = None  # When the file was first seen empty
+    try:
+        while True:
+            if is_download_complete(file_name, folder):
+                deadline.record()
+                return file_path
+            wait_time = min(deadline.remaining(), 1.0)
+            if _get_file_size(file_path) == 0 and (
+                    not get_partial_download_files(file_name, folder)):
+                if empty_since is None:
+                    empty_since = timing_helper.clock()
+                settle_time = EMPTY_FILE_SETTLE_TIME - (
+                    timing_helper.clock() - empty_since)
+                if settle_time <= 0:
+                    deadline.record()
+                    return file_path  # (A download of an empty file)
+                wait_time = min(wait_time, settle_time)
+            else:
+                empty_since = None
+            if deadline.expired():
+                break
+            # (The timeout is capped in case an event gets missed)
+            watcher.wait(wait_time)
+    finally:
+        watcher.close()
+    deadline.record(timed_out=True)
+    partial_files = get_partial_download_files(file_name, folder)
+    if partial_files:
+        raise Exception(
+            "File {%s} was still downloading {%s} in {%s} after %s seconds!"
+            % (file_name, ", ".join(partial_files), folder, timeout))
+    if _get_file_size(file_path) == 0:
+        raise Exception(
+            "File {%s} in {%s} was still empty after %s seconds!"
+            % (file_name, folder, timeout))
+    raise Exception(
+        "File {%s} was not found in {%s} after %s seconds!"
+        % (file_name, folder, timeout))
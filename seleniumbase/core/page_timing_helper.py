@@ -0,0 +1,101 @@
+"""
+This module records the page timings of every open() call (--page-timings)
+and summarizes the slowest pages and largest resources across all tests.
+(See PAGE_TIMINGS_SCRIPT in js_utils.py for the format of the page timings.)
+At the end of the test session, the summary is printed and saved, along
+with a JSON file of all the recorded page timings.
+These helper methods SHOULD NOT be called directly from tests.
+"""
+import codecs
+import json
+import os
+import threading
+
+TIMINGS_FOLDER = "profile_logs"
+SUMMARY_FILE = "page_timings_summary.txt"
+TIMINGS_FILE = "page_timings.json"
+MAX_ROWS = 10
+
+_pages = []  # [{"test": test_id, ...the page timings...}]
+_pages_lock = threading.Lock()
+
+
+def record(test_id, timings):
+    if not timings:
+        return
+    timings = dict(timings)
+    timings["test"] = test_id
+    with _pages_lock:
+        _pages.append(timings)
+
+
+def get_slowest_pages(max_rows=MAX_ROWS):
+    """ Returns [(page_load_ms, url, test_id)], slowest first. """
+    with _pages_lock:
+        pages = [
+            (page["page_load"], page["url"], page["test"])
+            for page in _pages
+            if page["page_load"] is not None]  # (Load event not finished)
+    pages.sort(key=lambda item: item[0], reverse=True)
+    return pages[:max_rows]
+
+
+def get_largest_resources(max_rows=MAX_ROWS):
+    """ Returns [(size_in_bytes, duration_ms, resource_url, page_url)],
+        largest first. Each resource is only listed once. """
+    largest = {}
+    with _pages_lock:
+        for page in _pages:
+            for name, r_type, size, duration in page["resources"]["largest"]:
+                if name not in largest or size > largest[name][0]:
+                    largest[name] = (size, duration, name, page["url"])
+    resources = list(largest.values())
+    resources.sort(key=lambda item: item[0], reverse=True)
+    return resources[:max_rows]
+
+
+def get_summary(max_rows=MAX_ROWS):
+    lines = []
+    with _pages_lock:
+        page_count = len(_pages)
+    lines.append("Page Timings: %s page loads recorded" % page_count)
+    lines.append("")
+    lines.append("* Slowest Pages (ms):")
+    for page_load, url, test_id in get_slowest_pages(max_rows):
+        lines.append("%8s  %s  (%s)" % (page_load, url, test_id))
+    lines.append("")
+    lines.append("* Largest Resources (KB, ms):")
+    for size, duration, name, page_url in get_largest_resources(max_rows):
+        lines.append("%8.1f %7s  %s" % (size / 1024.0, duration, name))
+    return "\n".join(lines)
+
+
+def save_report():
+    """ Prints the summary, and saves it with the page timings JSON file.
+        When running tests in parallel, each worker saves its own files. """
+    with _pages_lock:
+        if not _pages:
+            return
+        pages = list(_pages)
+    summary = get_summary()
+    suffix = ""
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        suffix = "_%s" % worker
+    abs_path = os.path.abspath('.')
+    timings_folder = os.path.join(abs_path, TIMINGS_FOLDER)
+    if not os.path.exists(timings_folder):
+        try:
+            os.makedirs(timings_folder)
+        except Exception:
+            pass  # (Another worker may have already created it)
+    summary_file = os.path.join(
+        timings_folder, SUMMARY_FILE.replace(".txt", "%s.txt" % suffix))
+    timings_file = os.path.join(
+        timings_folder, TIMINGS_FILE.replace(".json", "%s.json" % suffix))
+    with codecs.open(summary_file, "w+", "utf-8") as f:
+        f.write(summary + "\n")
+    with codecs.open(timings_file, "w+", "utf-8") as f:
+        f.write(json.dumps(pages, indent=2))
+    print("\n" + summary)
+    print("\n(Page timings saved to: %s)" % timings_folder)
@@ -0,0 +1,168 @@
+"""
+This module contains methods for profiling WebDriver traffic. (--sb-profile)
+Every WebDriver command gets recorded with its latency, along with the test
+and the BaseCase method that caused it. At the end of the test session,
+a summary is printed and saved, along with a Chrome-trace-format JSON file.
+(Load the JSON file from "chrome://tracing" to view the timeline.)
+The wait latency histograms from timing_helper get saved there as well.
+These helper methods SHOULD NOT be called directly from tests.
+"""
+import codecs
+import json
+import os
+import sys
+import threading
+import time
+from seleniumbase.core import timing_helper
+
+PROFILE_FOLDER = "profile_logs"
+SUMMARY_FILE = "profile_summary.txt"
+TRACE_FILE = "profile_trace.json"
+WAITS_FILE = "wait_histograms.json"
+NO_METHOD = "(direct driver call)"
+
+_records = []  # (test_id, method, command, start_time, duration)
+_records_lock = threading.Lock()
+_current_test = {"id": None}
+_base_case_files = {}
+
+
+def set_current_test(test_id):
+    """ Commands get attributed to this test until the next one starts. """
+    _current_test["id"] = test_id
+
+
+def _is_base_case_file(filename):
+    if filename not in _base_case_files:
+        path = os.path.normpath(filename)
+        _base_case_files[filename] = path.endswith(
+            os.path.join("fixtures", "base_case.py"))
+    return _base_case_files[filename]
+
+
+def _get_calling_method():
+    """ Returns the outermost BaseCase method on the call stack, which is
+        the method that the test called. (Eg: click() for a find_element()
+        command that was made from inside of click().) """
+    method = NO_METHOD
+    frame = sys._getframe(1)
+    while frame is not None:
+        if _is_base_case_file(frame.f_code.co_filename):
+            method = frame.f_code.co_name
+        frame = frame.f_back
+    return method
+
+
+def instrument_driver(driver):
+    """ Wraps driver.execute() so that every command gets recorded.
+        WebElement commands also go through the driver's execute(). """
+    if getattr(driver, "_sb_profiled", False):
+        return driver
+    original_execute = driver.execute
+
+    def execute(driver_command, params=None):
+        method = _get_calling_method()
+        start_time = time.time()
+        try:
+            return original_execute(driver_command, params)
+        finally:
+            duration = time.time() - start_time
+            with _records_lock:
+                _records.append((
+                    _current_test["id"], method, driver_command,
+                    start_time, duration))
+
+    driver.execute = execute
+    driver._sb_profiled = True
+    return driver
+
+
+def _summarize(key_index):
+    """ Returns [(key, command_count, total_seconds)], slowest first. """
+    totals = {}
+    for record in _records:
+        key = record[key_index]
+        count, total = totals.get(key, (0, 0.0))
+        totals[key] = (count + 1, total + record[4])
+    summary = [(key, v[0], v[1]) for key, v in totals.items()]
+    summary.sort(key=lambda item: item[2], reverse=True)
+    return summary
+
+
+def get_summary():
+    """ Returns the per-test and per-method summary as a string. """
+    lines = []
+    total_time = sum([record[4] for record in _records])
+    lines.append("WebDriver Profile: %s commands in %.3fs" % (
+        len(_records), total_time))
+    for title, key_index in (("Test", 0), ("BaseCase Method", 1)):
+        lines.append("")
+        lines.append("%-58s %8s %10s %9s" % (
+            "* %s" % title, "Commands", "Total(ms)", "Avg(ms)"))
+        for key, count, total in _summarize(key_index):
+            lines.append("%-58s %8s %10.1f %9.2f" % (
+                str(key)[-58:], count, total * 1000.0,
+                total * 1000.0 / count))
+    return "\n".join(lines)
+
+
+def get_chrome_trace():
+    """ Returns the recorded commands in the Chrome Trace Event Format.
+        Each test gets its own row (tid) in the timeline. """
+    pid = os.getpid()
+    events = []
+    test_ids = []
+    for test_id, method, command, start_time, duration in _records:
+        if test_id not in test_ids:
+            test_ids.append(test_id)
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": pid,
+                "tid": len(test_ids), "args": {"name": str(test_id)}})
+        events.append({
+            "name": "%s: %s" % (method, command),
+            "cat": method,
+            "ph": "X",
+            "ts": int(start_time * 1000000),
+            "dur": int(duration * 1000000),
+            "pid": pid,
+            "tid": test_ids.index(test_id) + 1,
+            "args": {"test": test_id, "method": method, "command": command},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def save_report():
+    """ Prints the summary, and saves it with the Chrome trace JSON file.
+        When running tests in parallel, each worker saves its own files. """
+    with _records_lock:
+        if not _records:
+            return
+        summary = get_summary()
+        trace = get_chrome_trace()
+    wait_summary = timing_helper.get_histogram_summary()
+    if wait_summary:
+        summary += "\n\n" + wait_summary
+    suffix = ""
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        suffix = "_%s" % worker
+    abs_path = os.path.abspath('.')
+    profile_folder = os.path.join(abs_path, PROFILE_FOLDER)
+    if not os.path.exists(profile_folder):
+        try:
+            os.makedirs(profile_folder)
+        except Exception:
+            pass  # (Another worker may have already created it)
+    summary_file = os.path.join(
+        profile_folder, SUMMARY_FILE.replace(".txt", "%s.txt" % suffix))
+    trace_file = os.path.join(
+        profile_folder, TRACE_FILE.replace(".json", "%s.json" % suffix))
+    waits_file = os.path.join(
+        profile_folder, WAITS_FILE.replace(".json", "%s.json" % suffix))
+    timing_helper.save_histograms(waits_file)
+    with codecs.open(summary_file, "w+", "utf-8") as f:
+        f.write(summary + "\n")
+    with codecs.open(trace_file, "w+", "utf-8") as f:
+        f.write(json.dumps(trace))
+    print("\n" + summary)
+    print("\n(Profile saved to: %s)" % profile_folder)
@@ -1,161 +1,165 @@
-import re
+"""
+This module applies the overrides of a custom settings file (--settings_file)
+to the SeleniumBase settings (seleniumbase/config/settings.py).
+The file gets parsed as Python code, so values can be any literal (strings,
+numbers, booleans, lists, dicts) or an expression of earlier settings,
+such as: "LARGE_TIMEOUT = SMALL_TIMEOUT * 2".
+Parsed files are cached by path and modification time, and the overrides
+only get applied once per process (unless the file changes).
+These helper methods SHOULD NOT be called directly from tests.
+"""
+import ast
+import os
 from seleniumbase.config import settings
 
+try:
+    string_types = (str, unicode)  # noqa: ignore=F821 (Python 2)
+except NameError:
+    string_types = (str,)
+number_types = (int, float)
+type_names = {bool: "bool", float: "number", str: "string"}
 
-def set_settings(settings_file):
-    if not settings_file.endswith('.py'):
-        raise Exception("\n\n`%s` is not a Python file!\n\n" % settings_file)
+_parsed_settings = {}  # {abs_path: SettingsOverrides}
+_applied_settings = None  # The SettingsOverrides that were applied last
 
-    f = open(settings_file, 'r')
-    all_code = f.read()
-    f.close()
 
-    override_settings = {}
-    num_settings = 0
+def get_setting_names():
+    """ Returns the names of the settings that can be overridden. """
+    return [name for name in dir(settings) if name.isupper()]
 
-    code_lines = all_code.split('\n')
-    for line in code_lines:
 
-        # KEY = "VALUE"
-        data = re.match(r'^\s*([\S]+)\s*=\s*"([\S\s]+)"\s*$', line)
-        if data:
-            key = data.group(1)
-            value = '"' + data.group(2) + '"'
-            override_settings[key] = value
-            num_settings += 1
-            continue
+def get_setting_type(value):
+    """ Returns the type group of a setting value, which is what the value of
+        an override gets checked against. (Ints and floats are both OK.) """
+    if isinstance(value, bool):
+        return bool
+    elif isinstance(value, number_types):
+        return float
+    elif isinstance(value, string_types):
+        return str
+    return type(value)
 
-        # KEY = 'VALUE'
-        data = re.match(r"^\s*([\S]+)\s*=\s*'([\S\s]+)'\s*$", line)
-        if data:
-            key = data.group(1)
-            value = "'" + data.group(2) + "'"
-            override_settings[key] = value
-            num_settings += 1
-            continue
 
-        # KEY = VALUE
-        data = re.match(r'^\s*([\S]+)\s*=\s*([\S]+)\s*$', line)
-        if data:
-            key = data.group(1)
-            value = data.group(2)
-            override_settings[key] = value
-            num_settings += 1
-            continue
+class SettingsOverrides(object):
+    """ The parsed (and type-checked) overrides of a custom settings file. """
 
-    for key in override_settings.keys():
-        value = override_settings[key]
-        if value.replace('.', '1').isdigit():
-            if value.count('.') == 1:
-                override_settings[key] = float(value)
-            elif value.count('.') == 0:
-                override_settings[key] = int(value)
-            else:
-                continue
-        elif value == "True":
-            override_settings[key] = True
-        elif value == "False":
-            override_settings[key] = False
-        elif len(value) > 1 and value.startswith('"') and value.endswith('"'):
-            override_settings[key] = value[1:-1]
-        elif len(value) > 1 and value.startswith("'") and value.endswith("'"):
-            override_settings[key] = value[1:-1]
-        else:
-            continue
+    def __init__(self, settings_file, values, file_stat=None):
+        self.settings_file = settings_file
+        self.values = values  # {setting_name: value}
+        self.file_stat = file_stat  # (mtime, size) when the file was parsed
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["values"][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def is_current(self, file_stat):
+        return self.file_stat == file_stat
+
+    def apply(self):
+        for key, value in self.values.items():
+            setattr(settings, key, value)
+
+
+def _get_file_stat(settings_file):
+    stat = os.stat(settings_file)
+    return (stat.st_mtime, stat.st_size)
 
-        if key == "MINI_TIMEOUT":
-            settings.MINI_TIMEOUT = override_settings[key]
-        elif key == "SMALL_TIMEOUT":
-            settings.SMALL_TIMEOUT = override_settings[key]
-        elif key == "LARGE_TIMEOUT":
-            settings.LARGE_TIMEOUT = override_settings[key]
-        elif key == "EXTREME_TIMEOUT":
-            settings.EXTREME_TIMEOUT = override_settings[key]
-        elif key == "ARCHIVE_EXISTING_LOGS":
-            settings.ARCHIVE_EXISTING_LOGS = override_settings[key]
-        elif key == "ARCHIVE_EXISTING_DOWNLOADS":
-            settings.ARCHIVE_EXISTING_DOWNLOADS = override_settings[key]
-        elif key == "SCREENSHOT_NAME":
-            settings.SCREENSHOT_NAME = override_settings[key]
-        elif key == "BASIC_INFO_NAME":
-            settings.BASIC_INFO_NAME = override_settings[key]
-        elif key == "PAGE_SOURCE_NAME":
-            settings.PAGE_SOURCE_NAME = override_settings[key]
-        elif key == "LATEST_REPORT_DIR":
-            settings.LATEST_REPORT_DIR = override_settings[key]
-        elif key == "REPORT_ARCHIVE_DIR":
-            settings.REPORT_ARCHIVE_DIR = override_settings[key]
-        elif key == "HTML_REPORT":
-            settings.HTML_REPORT = override_settings[key]
-        elif key == "RESULTS_TABLE":
-            settings.RESULTS_TABLE = override_settings[key]
-        elif key == "WAIT_FOR_RSC_ON_PAGE_LOADS":
-            settings.WAIT_FOR_RSC_ON_PAGE_LOADS = override_settings[key]
-        elif key == "WAIT_FOR_RSC_ON_CLICKS":
-            settings.WAIT_FOR_RSC_ON_CLICKS = override_settings[key]
-        elif key == "WAIT_FOR_ANGULARJS":
-            settings.WAIT_FOR_ANGULARJS = override_settings[key]
-        elif key == "DEFAULT_DEMO_MODE_TIMEOUT":
-            settings.DEFAULT_DEMO_MODE_TIMEOUT = override_settings[key]
-        elif key == "HIGHLIGHTS":
-            settings.HIGHLIGHTS = override_settings[key]
-        elif key == "DEFAULT_MESSAGE_DURATION":
-            settings.DEFAULT_MESSAGE_DURATION = override_settings[key]
-        elif key == "DISABLE_CSP_ON_FIREFOX":
-            settings.DISABLE_CSP_ON_FIREFOX = override_settings[key]
-        elif key == "DISABLE_CSP_ON_CHROME":
-            settings.DISABLE_CSP_ON_CHROME = override_settings[key]
-        elif key == "RAISE_INVALID_PROXY_STRING_EXCEPTION":
-            settings.RAISE_INVALID_PROXY_STRING_EXCEPTION = (
-                override_settings[key])
-        elif key == "MASTERQA_DEFAULT_VALIDATION_MESSAGE":
-            settings.MASTERQA_DEFAULT_VALIDATION_MESSAGE = (
-                override_settings[key])
-        elif key == "MASTERQA_WAIT_TIME_BEFORE_VERIFY":
-            settings.MASTERQA_WAIT_TIME_BEFORE_VERIFY = (
-                override_settings[key])
-        elif key == "MASTERQA_START_IN_FULL_SCREEN_MODE":
-            settings.MASTERQA_START_IN_FULL_SCREEN_MODE = (
-                override_settings[key])
-        elif key == "MASTERQA_MAX_IDLE_TIME_BEFORE_QUIT":
-            settings.MASTERQA_MAX_IDLE_TIME_BEFORE_QUIT = (
-                override_settings[key])
-        elif key == "TOTP_KEY":
-            settings.TOTP_KEY = override_settings[key]
-        elif key == "DB_HOST":
-            settings.DB_HOST = override_settings[key]
-        elif key == "DB_USERNAME":
-            settings.DB_USERNAME = override_settings[key]
-        elif key == "DB_PASSWORD":
-            settings.DB_PASSWORD = override_settings[key]
-        elif key == "DB_SCHEMA":
-            settings.DB_SCHEMA = override_settings[key]
-        elif key == "S3_LOG_BUCKET":
-            settings.S3_LOG_BUCKET = override_settings[key]
-        elif key == "S3_BUCKET_URL":
-            settings.S3_BUCKET_URL = override_settings[key]
-        elif key == "S3_SELENIUM_ACCESS_KEY":
-            settings.S3_SELENIUM_ACCESS_KEY = override_settings[key]
-        elif key == "S3_SELENIUM_SECRET_KEY":
-            settings.S3_SELENIUM_SECRET_KEY = override_settings[key]
-        elif key == "ENCRYPTION_KEY":
-            settings.ENCRYPTION_KEY = override_settings[key]
-        elif key == "OBFUSCATION_START_TOKEN":
-            settings.OBFUSCATION_START_TOKEN = override_settings[key]
-        elif key == "OBFUSCATION_END_TOKEN":
-            settings.OBFUSCATION_END_TOKEN = override_settings[key]
-        elif key == "EMAIL_USERNAME":
-            settings.EMAIL_USERNAME = override_settings[key]
-        elif key == "EMAIL_PASSWORD":
-            settings.EMAIL_PASSWORD = override_settings[key]
-        elif key == "EMAIL_IMAP_STRING":
-            settings.EMAIL_IMAP_STRING = override_settings[key]
-        elif key == "EMAIL_IMAP_PORT":
-            settings.EMAIL_IMAP_PORT = override_settings[key]
-        else:
+
+def _get_assignments(settings_file, all_code):
+    """ Returns [(key, value_node, line_number)] of the top-level
+        "KEY = VALUE" assignments of the settings file. """
+    try:
+        tree = ast.parse(all_code, settings_file)
+    except SyntaxError as e:
+        raise Exception(
+            "\n\nUnable to parse the settings file {%s}!\n%s\n\n" % (
+                settings_file, e))
+    assignments = []
+    for node in tree.body:
+        if not isinstance(node, ast.Assign):
             continue
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                assignments.append((target.id, node.value, node.lineno))
+    return assignments
+
+
+def _get_value(settings_file, value_node, namespace):
+    try:
+        return ast.literal_eval(value_node)
+    except ValueError:
+        pass
+    # An expression, such as: "LARGE_TIMEOUT = SMALL_TIMEOUT * 2"
+    expression = ast.Expression(body=value_node)
+    code = compile(expression, settings_file, "eval")
+    return eval(code, {"__builtins__": {}}, namespace)
 
-    if num_settings == 0:
+
+def parse_settings(settings_file):
+    """ Parses the settings file into a SettingsOverrides object.
+        Only known settings (the ones in settings.py) are kept, and each
+        value must have the same type as the default value. """
+    if not settings_file.endswith('.py'):
+        raise Exception("\n\n`%s` is not a Python file!\n\n" % settings_file)
+    file_stat = _get_file_stat(settings_file)
+    with open(settings_file, 'r') as f:
+        all_code = f.read()
+    assignments = _get_assignments(settings_file, all_code)
+    if not assignments:
         raise Exception("Unable to parse the settings file!")
 
-    return override_settings
+    setting_names = get_setting_names()
+    namespace = {}
+    for name in setting_names:
+        namespace[name] = getattr(settings, name)
+    values = {}
+    for key, value_node, line_number in assignments:
+        try:
+            value = _get_value(settings_file, value_node, namespace)
+        except Exception as e:
+            if key not in setting_names:
+                continue  # (Not a SeleniumBase setting)
+            raise Exception(
+                "\n\nUnable to parse the value of {%s} in the settings file "
+                "{%s} (line %s): %s\n\n" % (
+                    key, settings_file, line_number, e))
+        namespace[key] = value
+        if key not in setting_names:
+            continue
+        expected_type = get_setting_type(getattr(settings, key))
+        if get_setting_type(value) != expected_type:
+            raise Exception(
+                "\n\nThe setting {%s} in the settings file {%s} (line %s) "
+                "must be of type {%s}, not {%s}!\n\n" % (
+                    key, settings_file, line_number,
+                    type_names.get(expected_type, expected_type.__name__),
+                    type(value).__name__))
+        values[key] = value
+    return SettingsOverrides(settings_file, values, file_stat)
+
+
+def get_settings(settings_file):
+    """ Returns the SettingsOverrides of the settings file.
+        The file only gets parsed again if it was modified. """
+    abs_path = os.path.abspath(settings_file)
+    overrides = _parsed_settings.get(abs_path)
+    if overrides and overrides.is_current(_get_file_stat(abs_path)):
+        return overrides
+    overrides = parse_settings(settings_file)
+    _parsed_settings[abs_path] = overrides
+    return overrides
+
+
+def set_settings(settings_file):
+    """ Applies the overrides of the settings file to the settings.
+        This gets called from the setUp() of every test, but the overrides
+        only get applied again if the settings file has changed.
+        Returns the dictionary of overrides. """
+    global _applied_settings
+    overrides = get_settings(settings_file)
+    if overrides is not _applied_settings:
+        overrides.apply()
+        _applied_settings = overrides
+    return dict(overrides.values)
@@ -0,0 +1,126 @@
+"""
+This module contains the Deadline timer that is used by the wait loops of
+page_actions.py and js_utils.py, along with the wait latency histograms.
+Deadlines use a monotonic clock, which doesn't drift when the system clock
+changes. Each wait records how long it actually took (and if it timed out)
+into a per-wait histogram, which can be exported at the end of a session.
+(The "--sb-profile" option saves the histograms with the profile report.)
+These helper methods SHOULD NOT be called directly from tests.
+"""
+import json
+import threading
+import time
+
+try:
+    clock = time.perf_counter  # Python 3.3+ (Monotonic & high resolution)
+except AttributeError:
+    clock = time.time  # Python 2
+
+# Histogram bucket upper bounds in milliseconds (The last bucket is "inf")
+BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+_histograms = {}  # {wait_name: {"count", "timeouts", "total", "max", ...}}
+_histograms_lock = threading.Lock()
+
+
+class Deadline(object):
+    """ A timeout that starts counting down as soon as it is created.
+        Usage:
+            deadline = Deadline(timeout, "wait_for_something")
+            while True:
+                if something():
+                    deadline.record()
+                    return True
+                if deadline.expired():
+                    break
+                deadline.sleep(0.1)
+            deadline.record(timed_out=True) """
+
+    def __init__(self, timeout, name=None):
+        self.name = name
+        self.start_time = clock()
+        self.stop_time = self.start_time + timeout
+
+    def elapsed(self):
+        return clock() - self.start_time
+
+    def remaining(self):
+        return max(0.0, self.stop_time - clock())
+
+    def expired(self):
+        return clock() >= self.stop_time
+
+    def sleep(self, seconds):
+        """ Sleeps for the given seconds, but not past the deadline. """
+        time.sleep(min(seconds, self.remaining()))
+
+    def record(self, timed_out=False):
+        """ Adds the time that the wait took into the wait's histogram. """
+        if self.name:
+            record_wait(self.name, self.elapsed(), timed_out)
+
+
+def record_wait(name, duration, timed_out=False):
+    duration_ms = duration * 1000.0
+    bucket = len(BUCKETS_MS)
+    for index, upper_bound in enumerate(BUCKETS_MS):
+        if duration_ms <= upper_bound:
+            bucket = index
+            break
+    with _histograms_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = {"count": 0, "timeouts": 0, "total": 0.0, "max": 0.0,
+                         "buckets": [0] * (len(BUCKETS_MS) + 1)}
+            _histograms[name] = histogram
+        histogram["count"] += 1
+        histogram["total"] += duration
+        histogram["buckets"][bucket] += 1
+        if timed_out:
+            histogram["timeouts"] += 1
+        if duration > histogram["max"]:
+            histogram["max"] = duration
+
+
+def get_histograms():
+    """ Returns a copy of the wait histograms. (Durations are in seconds.)
+        Each bucket count is for waits up to that many ms in BUCKETS_MS. """
+    with _histograms_lock:
+        histograms = {}
+        for name, histogram in _histograms.items():
+            histograms[name] = dict(histogram)
+            histograms[name]["buckets"] = list(histogram["buckets"])
+        return histograms
+
+
+def get_histogram_summary():
+    """ Returns the wait histograms as a printable table, slowest first. """
+    histograms = get_histograms()
+    if not histograms:
+        return ""
+    labels = ["<=%sms" % upper_bound for upper_bound in BUCKETS_MS]
+    labels.append(">%sms" % BUCKETS_MS[-1])
+    lines = ["Wait Latency: (count, timeouts, avg ms, max ms, histogram)"]
+    for name in sorted(
+            histograms, key=lambda n: histograms[n]["total"], reverse=True):
+        histogram = histograms[name]
+        lines.append("* %s: %s, %s, %.1f, %.1f" % (
+            name, histogram["count"], histogram["timeouts"],
+            histogram["total"] * 1000.0 / histogram["count"],
+            histogram["max"] * 1000.0))
+        lines.append("    " + " ".join([
+            "%s:%s" % (label, count)
+            for label, count in zip(labels, histogram["buckets"]) if count]))
+    return "\n".join(lines)
+
+
+def save_histograms(file_path):
+    """ Saves the wait histograms to a JSON file. """
+    data = {"buckets_ms": BUCKETS_MS, "waits": get_histograms()}
+    with open(file_path, "w") as f:
+        f.write(json.dumps(data, indent=2, sort_keys=True))
+
+
+def reset_histograms():
+    with _histograms_lock:
+        _histograms.clear()
@@ -7,6 +7,7 @@ import re
 import time
 from selenium.webdriver.common.by import By
 from seleniumbase.config import settings
+from seleniumbase.core import bundle_helper
 from seleniumbase.core import style_sheet
 from seleniumbase.fixtures import constants
 from seleniumbase.fixtures import js_utils
@@ -38,6 +39,8 @@ def activate_bootstrap(driver):
     js_utils.add_css_style(driver, backdrop_style)
     js_utils.wait_for_ready_state_complete(driver)
     js_utils.wait_for_angularjs(driver)
+    if bundle_helper.inject_bundle(driver, "bootstrap_tour"):
+        return
     for x in range(4):
         js_utils.activate_jquery(driver)
         js_utils.add_css_link(driver, bootstrap_tour_css)
@@ -81,6 +84,8 @@ def activate_hopscotch(driver):
     js_utils.wait_for_ready_state_complete(driver)
     js_utils.wait_for_angularjs(driver)
     js_utils.add_css_style(driver, backdrop_style)
+    if bundle_helper.inject_bundle(driver, "hopscotch"):
+        return
     for x in range(4):
         js_utils.activate_jquery(driver)
         js_utils.add_css_link(driver, hopscotch_css)
@@ -124,6 +129,8 @@ def activate_introjs(driver):
     activate_bootstrap(driver)
     js_utils.wait_for_ready_state_complete(driver)
     js_utils.wait_for_angularjs(driver)
+    if bundle_helper.inject_bundle(driver, "introjs"):
+        return
     for x in range(4):
         js_utils.activate_jquery(driver)
         js_utils.add_css_link(driver, intro_css)
@@ -175,6 +182,13 @@ def activate_shepherd(driver):
     js_utils.add_css_style(driver, backdrop_style)
     js_utils.wait_for_ready_state_complete(driver)
     js_utils.wait_for_angularjs(driver)
+    if bundle_helper.inject_bundle(driver, "shepherd"):
+        try:
+            driver.execute_script(sh_style)  # Verify Shepherd has loaded
+            driver.execute_script(sh_style)  # Need it twice for ordering
+            return
+        except Exception:
+            pass  # Fall back to loading the library files by URL
     for x in range(4):
         js_utils.add_css_link(driver, spinner_css)
         js_utils.add_css_link(driver, sh_theme_arrows_css)
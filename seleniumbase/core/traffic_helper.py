@@ -0,0 +1,194 @@
+"""
+This module contains the traffic engine for generate_traffic() and
+generate_traffic_chain() when using more than one worker.
+Referrals get spread across a pool of browsers (one thread per browser),
+with an optional rate limit (from decorators.rate_limited) that is shared
+by all the workers. A report of the achieved requests per second and the
+referral latency percentiles gets returned at the end.
+These helper methods SHOULD NOT be called directly from tests.
+"""
+import math
+import threading
+from seleniumbase.common import decorators
+from seleniumbase.config import settings
+from seleniumbase.core import timing_helper
+try:
+    import queue  # Python 3
+except ImportError:
+    import Queue as queue  # Python 2
+
+PERCENTILES = [50, 90, 95, 99]
+REFERRAL_SELECTOR = "a.analytics.referral.test"
+
+# Replaces the page body with a link to the destination page.
+REFERRAL_SCRIPT = (
+    """document.body.outerHTML = "<body><a class='analytics referral test' "
+           + "style='font-family: Arial,sans-serif; font-size: 30px; "
+           + "color: #18a2cd'>Magic Link Button</a></body>";
+       document.querySelector('%s').href = arguments[0];"""
+    % REFERRAL_SELECTOR)
+
+# The referral is done once the link is gone and the new page has loaded.
+REFERRAL_DONE_SCRIPT = (
+    """return (!document.querySelector('%s') &&
+               document.readyState === 'complete');""" % REFERRAL_SELECTOR)
+
+
+def make_referral(driver, start_page, destination_page,
+                  timeout=settings.LARGE_TIMEOUT):
+    """ Same as BaseCase.generate_referral(), but without fixed sleeps.
+        Returns after the destination page has finished loading. """
+    if start_page:
+        driver.get(start_page)
+    driver.execute_script(REFERRAL_SCRIPT, destination_page)
+    driver.find_element_by_css_selector(REFERRAL_SELECTOR).click()
+    deadline = timing_helper.Deadline(timeout)
+    while not deadline.expired():
+        try:
+            if driver.execute_script(REFERRAL_DONE_SCRIPT):
+                return
+        except Exception:
+            pass  # The next page may still be loading
+        deadline.sleep(0.05)
+    raise Exception(
+        "Referral to {%s} did not load after %s seconds!" % (
+            destination_page, timeout))
+
+
+def _percentile(sorted_values, percent):
+    """ Returns the percentile of the sorted values (nearest-rank method). """
+    if not sorted_values:
+        return 0.0
+    rank = int(math.ceil(percent / 100.0 * len(sorted_values)))
+    rank = min(max(rank, 1), len(sorted_values))
+    return sorted_values[rank - 1]
+
+
+def get_report(latencies, failures, errors, duration, workers):
+    """ Returns the traffic report as a dict. (Latencies are in seconds.) """
+    latencies = sorted(latencies)
+    requests = len(latencies)
+    report = {
+        "requests": requests,
+        "failures": failures,
+        "errors": errors,
+        "workers": workers,
+        "duration": duration,
+        "rps": 0.0,
+        "latency": {},
+    }
+    if duration > 0:
+        report["rps"] = requests / duration
+    for percent in PERCENTILES:
+        report["latency"]["p%s" % percent] = _percentile(latencies, percent)
+    if latencies:
+        report["latency"]["min"] = latencies[0]
+        report["latency"]["max"] = latencies[-1]
+    return report
+
+
+def get_report_summary(report):
+    """ Returns the traffic report as a printable string. """
+    lines = []
+    lines.append(
+        "Traffic: %s referrals (%s failed) in %.2fs with %s workers" % (
+            report["requests"], report["failures"], report["duration"],
+            report["workers"]))
+    lines.append("Achieved: %.2f requests per second" % report["rps"])
+    latency = report["latency"]
+    lines.append("Latency (ms): " + ", ".join([
+        "p%s=%.1f" % (percent, latency["p%s" % percent] * 1000.0)
+        for percent in PERCENTILES]))
+    for error in report["errors"]:
+        lines.append("* Error: %s" % error)
+    return "\n".join(lines)
+
+
+def _start_drivers(driver_factory, workers):
+    """ Launches the browsers at the same time. (Browser startup time does
+        not count towards the traffic report.) """
+    drivers = []
+    errors = []
+    lock = threading.Lock()
+
+    def start_driver():
+        try:
+            driver = driver_factory()
+            with lock:
+                drivers.append(driver)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+
+    threads = [threading.Thread(target=start_driver) for x in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors and not drivers:
+        raise Exception("Unable to launch traffic browsers: %s" % errors[0])
+    return drivers
+
+
+def generate_traffic(driver_factory, pages, loops=1, workers=2,
+                     max_per_second=None):
+    """ Runs the referrals in pages for the number of loops, spread across
+        a pool of browsers from driver_factory(), which are quit at the end.
+        pages: [start_page, destination_page, ...] (start_page may be None)
+        max_per_second: The max number of referrals per second (all workers)
+        Returns the report from get_report(). """
+    if workers < 1:
+        raise Exception("The number of traffic workers must be at least 1!")
+    if max_per_second:
+        throttle = decorators.rate_limited(max_per_second)(lambda: None)
+    else:
+        def throttle():
+            pass
+    jobs = queue.Queue()
+    for loop in range(loops):
+        jobs.put(loop)
+    latencies = []
+    errors = []
+    failures = [0]
+    lock = threading.Lock()
+
+    def run_worker(driver):
+        while True:
+            try:
+                jobs.get_nowait()
+            except queue.Empty:
+                return
+            start_page = pages[0]
+            for destination_page in pages[1:]:
+                throttle()
+                start_time = timing_helper.clock()
+                try:
+                    make_referral(driver, start_page, destination_page)
+                    with lock:
+                        latencies.append(timing_helper.clock() - start_time)
+                except Exception as e:
+                    with lock:
+                        failures[0] += 1
+                        if len(errors) < 5:
+                            errors.append(str(e).strip())
+                    break  # The rest of the chain starts from the wrong page
+                start_page = None  # (Chains continue from the current page)
+
+    drivers = _start_drivers(driver_factory, min(workers, max(loops, 1)))
+    try:
+        start_time = timing_helper.clock()
+        threads = [
+            threading.Thread(target=run_worker, args=(driver,))
+            for driver in drivers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = timing_helper.clock() - start_time
+    finally:
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    return get_report(latencies, failures[0], errors, duration, len(drivers))
@@ -23,6 +23,7 @@ Code becomes greatly simplified and easier to maintain.
 """
 
 import codecs
+import contextlib
 import json
 import logging
 import math
@@ -45,9 +46,14 @@ from seleniumbase.common import decorators
 from seleniumbase.config import settings
 from seleniumbase.core.testcase_manager import TestcaseDataPayload
 from seleniumbase.core.testcase_manager import TestcaseManager
+from seleniumbase.core import console_log_helper
+from seleniumbase.core import display_helper
 from seleniumbase.core import download_helper
 from seleniumbase.core import log_helper
+from seleniumbase.core import page_timing_helper
+from seleniumbase.core import profile_helper
 from seleniumbase.core import settings_parser
+from seleniumbase.core import timing_helper
 from seleniumbase.core import tour_helper
 from seleniumbase.core import visual_helper
 from seleniumbase.fixtures import constants
@@ -78,6 +84,7 @@ class BaseCase(unittest.TestCase):
         self.__last_page_screenshot_png = None
         self.__delayed_assert_count = 0
         self.__delayed_assert_failures = []
+        self.__delayed_assert_batch = None
         # Requires self._* instead of self.__* for external class use
         self._html_report_extra = []  # (Used by pytest_plugin.py)
         self._default_driver = None
@@ -90,6 +97,13 @@ class BaseCase(unittest.TestCase):
         self.driver.get(url)
         if settings.WAIT_FOR_RSC_ON_PAGE_LOADS:
             self.wait_for_ready_state_complete()
+        if self.record_page_timings:
+            try:
+                page_timing_helper.record(
+                    self.id(), js_utils.get_page_timings(
+                        self.driver, timeout=settings.MINI_TIMEOUT))
+            except Exception:
+                pass  # Page timings are not available on all pages
         self.__demo_mode_pause_if_active()
 
     def open_url(self, url):
@@ -119,12 +133,15 @@ class BaseCase(unittest.TestCase):
                 # Handle a special case of partial links hidden in dropdowns
                 self.click_partial_link_text(selector, timeout=timeout)
                 return
-        element = page_actions.wait_for_element_visible(
-            self.driver, selector, by, timeout=timeout)
-        self.__demo_mode_highlight_if_active(selector, by)
+        pre_action_url = None
         if not self.demo_mode:
-            self.__scroll_to_element(element)
-        pre_action_url = self.driver.current_url
+            element = self.__get_visible_element_in_view(
+                selector, by, timeout=timeout)
+        else:
+            element = page_actions.wait_for_element_visible(
+                self.driver, selector, by, timeout=timeout)
+            self.__demo_mode_highlight_if_active(selector, by)
+            pre_action_url = self.driver.current_url
         if delay and delay > 0:
             time.sleep(delay)
         try:
@@ -256,19 +273,20 @@ class BaseCase(unittest.TestCase):
 
     def wait_for_link_text_present(self, link_text,
                                    timeout=settings.SMALL_TIMEOUT):
-        start_ms = time.time() * 1000.0
-        stop_ms = start_ms + (timeout * 1000.0)
-        for x in range(int(timeout * 5)):
+        deadline = timing_helper.Deadline(
+            timeout, "wait_for_link_text_present")
+        while True:
             try:
                 if not self.is_link_text_present(link_text):
                     raise Exception(
                         "Link text {%s} was not found!" % link_text)
+                deadline.record()
                 return
             except Exception:
-                now_ms = time.time() * 1000.0
-                if now_ms >= stop_ms:
+                if deadline.expired():
                     break
-                time.sleep(0.2)
+                deadline.sleep(0.2)
+        deadline.record(timed_out=True)
         raise Exception(
             "Link text {%s} was not present after %s seconds!" % (
                 link_text, timeout))
@@ -702,6 +720,117 @@ class BaseCase(unittest.TestCase):
             by = By.XPATH
         self.update_text(selector, text, by=by, timeout=timeout, retry=retry)
 
+    def fill_form(self, form_data, by=By.CSS_SELECTOR,
+                  timeout=settings.LARGE_TIMEOUT, native_keys=None):
+        """ Fills in many form fields with a single script call.
+            All fields are found and validated before any value gets set.
+            Text fields get their value set, with input/change events.
+            Dropdowns are selected by option text, like select_option_by_text.
+            (Use {"index": 2} or {"value": "v"} to select by index or value.)
+            Checkboxes and radio buttons are checked/unchecked with True/False.
+            Fields that need native key events (input masks, autocompletes,
+            values ending in "\\n") fall back to using update_text().
+            @Params
+            form_data - a dict of {selector: value} (Use an OrderedDict or
+                        a list of (selector, value) tuples to set the order)
+            by - the type of selector to search by (Default: CSS Selector)
+            timeout - how long to wait for fields that aren't visible yet
+            native_keys - a list of selectors to always use send_keys() on
+            Example:
+                self.fill_form({
+                    "#first_name": "Ada",
+                    "select#country": "United Kingdom",
+                    "input#subscribe": True,
+                })
+        """
+        if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
+            timeout = self.__get_new_timeout(timeout)
+        if hasattr(form_data, "items"):
+            form_data = list(form_data.items())
+        if not native_keys:
+            native_keys = []
+        fields = []
+        use_native_keys = []
+        for selector, value in form_data:
+            use_native_keys.append(selector in native_keys)
+            selector, field_by = self.__recalculate_selector(selector, by)
+            fields.append((selector, field_by, value))
+        if self.demo_mode:
+            # Show each action individually so that the form can be seen
+            for selector, field_by, value in fields:
+                self.__fill_form_field(selector, field_by, value, timeout)
+            return
+        script_fields = []
+        for index, (selector, field_by, value) in enumerate(fields):
+            is_xpath = (field_by == By.XPATH)
+            if not is_xpath:
+                selector = self.convert_to_css_selector(selector, by=field_by)
+            if isinstance(value, bool):
+                kind = "check"
+            elif isinstance(value, dict):
+                kind, value = list(value.items())[0]
+                if kind not in ["text", "index", "value"]:
+                    raise Exception(
+                        'Dropdown options are selected by "text", "index", '
+                        'or "value"! (Not by {%s})' % kind)
+                if kind == "index":
+                    value = int(value)
+            else:
+                kind = "text"
+                value = "%s" % value
+                if value.endswith('\n') or use_native_keys[index]:
+                    kind = "native"
+            script_fields.append([selector, is_xpath, kind, value])
+        result = js_utils.fill_form(self.driver, script_fields)
+        if result["missing"]:
+            for index in result["missing"]:
+                selector, field_by, value = fields[index]
+                self.wait_for_element_visible(
+                    selector, by=field_by, timeout=timeout)
+            result = js_utils.fill_form(self.driver, script_fields)
+            if result["missing"]:
+                missing = [fields[index][0] for index in result["missing"]]
+                raise Exception(
+                    "Form fields were not visible and enabled: %s" % missing)
+        if result["errors"]:
+            errors = ["{%s}: %s" % (fields[index][0], message)
+                      for index, message in result["errors"]]
+            raise Exception("Unable to fill form fields! %s" % errors)
+        for index in result["native"]:
+            selector, field_by, value = fields[index]
+            self.update_text(selector, "%s" % value, by=field_by,
+                             timeout=timeout)
+        for index in result["file"]:
+            # (File inputs can't be cleared, so update_text() won't work)
+            selector, field_by, value = fields[index]
+            self.choose_file(selector, "%s" % value, by=field_by,
+                             timeout=timeout)
+        if settings.WAIT_FOR_RSC_ON_PAGE_LOADS:
+            self.wait_for_ready_state_complete()
+
+    def __fill_form_field(self, selector, by, value, timeout):
+        if isinstance(value, bool):
+            element = self.wait_for_element_visible(
+                selector, by=by, timeout=timeout)
+            if element.is_selected() != value:
+                self.click(selector, by=by, timeout=timeout)
+        elif isinstance(value, dict):
+            option_by, option = list(value.items())[0]
+            self.__select_option(selector, option, dropdown_by=by,
+                                 option_by=option_by, timeout=timeout)
+        else:
+            element = self.wait_for_element_visible(
+                selector, by=by, timeout=timeout)
+            if element.tag_name.lower() == "select":
+                self.__select_option(selector, "%s" % value, dropdown_by=by,
+                                     option_by="text", timeout=timeout)
+            elif (element.get_attribute("type") or "").lower() == "file":
+                self.choose_file(selector, "%s" % value, by=by,
+                                 timeout=timeout)
+            else:
+                self.update_text(selector, "%s" % value, by=by,
+                                 timeout=timeout)
+
     def is_element_present(self, selector, by=By.CSS_SELECTOR):
         selector, by = self.__recalculate_selector(selector, by)
         return page_actions.is_element_present(self.driver, selector, by)
@@ -743,23 +872,31 @@ class BaseCase(unittest.TestCase):
             If "limit" is set and > 0, will only return that many elements. """
         self.wait_for_ready_state_complete()
         selector, by = self.__recalculate_selector(selector, by)
-        v_elems = page_actions.find_visible_elements(self.driver, selector, by)
-        if limit and limit > 0 and len(v_elems) > limit:
-            v_elems = v_elems[:limit]
-        return v_elems
+        return page_actions.find_visible_elements(
+            self.driver, selector, by, limit=limit)
 
-    def click_visible_elements(self, selector, by=By.CSS_SELECTOR, limit=0):
+    def click_visible_elements(self, selector, by=By.CSS_SELECTOR, limit=0,
+                               batch=False, native_fallback=True):
         """ Finds all matching page elements and clicks visible ones in order.
             If a click reloads or opens a new page, the clicking will stop.
             Works best for actions such as clicking all checkboxes on a page.
             Example:  self.click_visible_elements('input[type="checkbox"]')
-            If "limit" is set and > 0, will only click that many elements. """
+            If "limit" is set and > 0, will only click that many elements.
+            If "batch" is True, the visible elements get clicked from a single
+            script call (instead of several round trips per element).
+            If "native_fallback" is True, elements that can't be clicked from
+            the script (or that are covered by another element, such as an
+            overlay) get a native click instead.
+            Returns the number of elements that were clicked. """
+        if batch:
+            return self.__click_visible_elements_in_batch(
+                selector, by=by, limit=limit, native_fallback=native_fallback)
         elements = self.find_elements(selector, by=by)
         count = 0
         click_count = 0
         for element in elements:
             if limit and limit > 0 and click_count >= limit:
-                return
+                return click_count
             count += 1
             if count == 1:
                 self.wait_for_ready_state_complete()
@@ -782,7 +919,45 @@ class BaseCase(unittest.TestCase):
                             element.click()
                             click_count += 1
                     except (StaleElementReferenceException, ENI_Exception):
-                        return  # Probably on new page / Elements are all stale
+                        return click_count  # Probably on new page / All stale
+        return click_count
+
+    def __click_visible_elements_in_batch(
+            self, selector, by=By.CSS_SELECTOR, limit=0, native_fallback=True):
+        start_url = self.get_current_url()
+        try:
+            elements = self.find_elements(selector, by=by)
+            click_count, failed, navigating = (
+                js_utils.click_visible_elements(
+                    self.driver, elements, limit=limit,
+                    check_obscured=native_fallback))
+        except (StaleElementReferenceException, ENI_Exception):
+            self.wait_for_ready_state_complete()
+            time.sleep(0.05)
+            try:
+                elements = self.find_elements(selector, by=by)
+                click_count, failed, navigating = (
+                    js_utils.click_visible_elements(
+                        self.driver, elements, limit=limit,
+                        check_obscured=native_fallback))
+            except (StaleElementReferenceException, ENI_Exception):
+                return 0  # Probably on new page / Elements are all stale
+        if navigating:
+            # A click may have started loading a new page
+            self.wait_for_ready_state_complete()
+            if self.get_current_url() != start_url:
+                return click_count  # On a new page. The elements are stale
+        if not native_fallback:
+            return click_count
+        for element in failed:
+            try:
+                if element.is_displayed():
+                    self.__scroll_to_element(element)
+                    element.click()
+                    click_count += 1
+            except (StaleElementReferenceException, ENI_Exception):
+                return click_count  # Probably on new page / All stale
+        return click_count
 
     def is_element_in_an_iframe(self, selector, by=By.CSS_SELECTOR):
         """ Returns True if the selector's element is located in an iframe.
@@ -1613,19 +1788,13 @@ class BaseCase(unittest.TestCase):
         self.safe_execute_script(remove_script)
 
     def ad_block(self):
-        from seleniumbase.config import ad_block_list
-        for css_selector in ad_block_list.AD_BLOCK_LIST:
-            css_selector = re.escape(css_selector)
-            css_selector = self.__escape_quotes_if_needed(css_selector)
-            script = ("""var $elements = document.querySelectorAll('%s');
-                      var index = 0, length = $elements.length;
-                      for(; index < length; index++){
-                      $elements[index].remove();}"""
-                      % css_selector)
-            try:
-                self.execute_script(script)
-            except Exception:
-                pass  # Don't fail test if ad_blocking fails
+        """ Removes the ads defined in ad_block_list.AD_BLOCK_LIST from the
+            page, with one script call. Ads that get added later are also
+            removed, until the next page load. """
+        try:
+            js_utils.ad_block(self.driver)
+        except Exception:
+            pass  # Don't fail test if ad_blocking fails
 
     def get_domain_url(self, url):
         return page_utils.get_domain_url(url)
@@ -1747,28 +1916,45 @@ class BaseCase(unittest.TestCase):
         with open(image_file_path, "wb") as file:
             file.write(element_png)
 
-    def download_file(self, file_url, destination_folder=None):
+    def download_file(self, file_url, destination_folder=None,
+                      checksum=None):
         """ Downloads the file from the url to the destination folder.
             If no destination folder is specified, the default one is used.
-            (The default downloads folder = "./downloaded_files") """
+            (The default downloads folder = "./downloaded_files")
+            The file is streamed to disk, and interrupted downloads resume.
+            If a checksum is given ("sha256:HEX" or "md5:HEX"), the file
+            gets verified. Returns the path of the downloaded file. """
         if not destination_folder:
-            destination_folder = constants.Files.DOWNLOADS_FOLDER
-        page_utils._download_file_to(file_url, destination_folder)
+            destination_folder = self.get_downloads_folder()
+        return page_utils._download_file_to(
+            file_url, destination_folder, checksum=checksum)
 
-    def save_file_as(self, file_url, new_file_name, destination_folder=None):
+    def save_file_as(self, file_url, new_file_name, destination_folder=None,
+                     checksum=None):
         """ Similar to self.download_file(), except that you get to rename the
             file being downloaded to whatever you want. """
         if not destination_folder:
-            destination_folder = constants.Files.DOWNLOADS_FOLDER
-        page_utils._download_file_to(
-            file_url, destination_folder, new_file_name)
+            destination_folder = self.get_downloads_folder()
+        return page_utils._download_file_to(
+            file_url, destination_folder, new_file_name, checksum=checksum)
+
+    def start_download(self, file_url, new_file_name=None,
+                       destination_folder=None, checksum=None):
+        """ Same as self.save_file_as(), but the file gets downloaded in a
+            background thread pool while the test continues.
+            Returns a future. future.result() waits for the download, and
+            returns the path of the downloaded file (or raises the error). """
+        if not destination_folder:
+            destination_folder = self.get_downloads_folder()
+        return download_helper.start_download(
+            file_url, destination_folder, new_file_name, checksum=checksum)
 
     def save_data_as(self, data, file_name, destination_folder=None):
         """ Saves the data specified to a file of the name specified.
             If no destination folder is specified, the default one is used.
             (The default downloads folder = "./downloaded_files") """
         if not destination_folder:
-            destination_folder = constants.Files.DOWNLOADS_FOLDER
+            destination_folder = self.get_downloads_folder()
         page_utils._save_data_as(data, destination_folder, file_name)
 
     def get_downloads_folder(self):
@@ -1784,9 +1970,29 @@ class BaseCase(unittest.TestCase):
         """ Checks if the file exists in the Downloads Folder. """
         return os.path.exists(self.get_path_of_downloaded_file(file))
 
-    def assert_downloaded_file(self, file):
-        """ Asserts that the file exists in the Downloads Folder. """
-        assert os.path.exists(self.get_path_of_downloaded_file(file))
+    def wait_for_downloaded_file(self, file,
+                                 timeout=settings.LARGE_TIMEOUT):
+        """ Waits for a file to finish downloading into the Downloads Folder,
+            and returns the path of the downloaded file. Returns the moment
+            the download completes. (Downloads in progress have temp files,
+            such as ".crdownload" on Chrome, and ".part" on Firefox.) """
+        if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
+            timeout = self.__get_new_timeout(timeout)
+        return download_helper.wait_for_downloaded_file(
+            file, timeout, self.get_downloads_folder())
+
+    def assert_downloaded_file(self, file, timeout=settings.SMALL_TIMEOUT):
+        """ Asserts that the file exists in the Downloads Folder.
+            Waits for the download to complete if it's still in progress.
+            Default timeout = SMALL_TIMEOUT. """
+        if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
+            timeout = self.__get_new_timeout(timeout)
+        try:
+            download_helper.wait_for_downloaded_file(
+                file, timeout, self.get_downloads_folder())
+        except Exception as e:
+            raise AssertionError(str(e))
+        return True
 
     def assert_true(self, expr, msg=None):
         self.assertTrue(expr, msg=msg)
@@ -1806,29 +2012,63 @@ class BaseCase(unittest.TestCase):
 
     def assert_no_js_errors(self):
         """ Asserts that there are no JavaScript "SEVERE"-level page errors.
-            Works ONLY for Chrome (non-headless) and Chrome-based browsers.
-            Does NOT work on Firefox, Edge, IE, and some other browsers:
+            Errors get collected from the browser log after each page load,
+            so errors on earlier pages get reported (with their URLs) too.
+            Only new errors since the last call get checked.
+            On Chrome (and Chrome-based browsers), all "SEVERE" entries count.
+            On browsers without a browser log (such as Firefox), a hook on
+            window.onerror & console.error gets injected into the page to
+            collect its errors. (This used to be skipped on those browsers.)
                 * See https://github.com/SeleniumHQ/selenium/issues/1161
             Based on the following Stack Overflow solution:
                 * https://stackoverflow.com/a/41150512/7058266 """
-        try:
-            browser_logs = self.driver.get_log('browser')
-        except (ValueError, WebDriverException):
-            # If unable to get browser logs, skip the assert and return.
-            return
+        collector = console_log_helper.start_collector(self.driver, self.id())
+        collector.collect()
+        self.__assert_no_new_js_errors(collector)
 
+    def __assert_no_new_js_errors(self, collector):
         messenger_library = "//cdnjs.cloudflare.com/ajax/libs/messenger"
         errors = []
-        for entry in browser_logs:
-            if entry['level'] == 'SEVERE':
-                if messenger_library not in entry['message']:
-                    # Add errors if not caused by SeleniumBase dependencies
-                    errors.append(entry)
+        for entry in collector.get_new_errors():
+            if messenger_library not in entry['message']:
+                # Add errors if not caused by SeleniumBase dependencies
+                errors.append(entry)
         if len(errors) > 0:
             current_url = self.get_current_url()
             raise Exception(
                 "JavaScript errors found on %s => %s" % (current_url, errors))
 
+    def get_page_timings(self, max_largest=10):
+        """ Returns the Navigation Timing & Resource Timing data of the page
+            (from the browser's Performance API) in one compact dictionary:
+            {"url", "page_load", "navigation": {...}, "resources": {...}}
+            Times are in milliseconds from the start of the page navigation.
+            "page_load" is None if the "load" event hasn't finished yet.
+            "resources" includes the "max_largest" largest resources.
+            (See PAGE_TIMINGS_SCRIPT in js_utils.py for all the fields.) """
+        timings = js_utils.get_page_timings(
+            self.driver, max_largest, timeout=settings.MINI_TIMEOUT)
+        if not timings:
+            raise Exception(
+                "Page timings are not supported on this browser!")
+        return timings
+
+    def assert_page_load_under(self, ms):
+        """ Asserts that the current page loaded in under "ms" milliseconds.
+            (The time from the start of navigation to the end of the
+            "load" event, as measured by the browser.) """
+        self.wait_for_ready_state_complete()
+        timings = self.get_page_timings(max_largest=0)
+        if timings["page_load"] is None:
+            raise Exception(
+                "The \"load\" event of {%s} did not finish within %s "
+                "seconds!" % (timings["url"], settings.MINI_TIMEOUT))
+        if not timings["page_load"] < ms:
+            raise Exception(
+                "Page load time of {%sms} for {%s} was not under {%sms}!" % (
+                    timings["page_load"], timings["url"], ms))
+        return True
+
     def get_google_auth_password(self, totp_key=None):
         """ Returns a time-based one-time password based on the
             Google Authenticator password algorithm. Works with Authy.
@@ -2097,8 +2337,25 @@ class BaseCase(unittest.TestCase):
         except Exception:
             pass
 
-    def generate_traffic(self, start_page, destination_page, loops=1):
-        """ Similar to generate_referral(), but can do multiple loops. """
+    def generate_traffic(self, start_page, destination_page, loops=1,
+                         workers=None, max_per_second=None):
+        """ Similar to generate_referral(), but can do multiple loops.
+            If "workers" is set, the loops get spread across that many
+            headless browsers (one thread each), and the max number of
+            referrals per second across all of them can be set with
+            "max_per_second". In that case, a report is printed & returned
+            with the achieved requests per second and latency percentiles.
+            (See seleniumbase/core/traffic_helper.py for the report format.)
+        """
+        if workers:
+            for page in (start_page, destination_page):
+                if page and not page_utils.is_valid_url(page):
+                    raise Exception(
+                        "Exception: Website page {%s} is not a valid URL!"
+                        % page)
+            return self.__generate_concurrent_traffic(
+                [start_page, destination_page], loops,
+                workers, max_per_second)
         for loop in range(loops):
             self.generate_referral(start_page, destination_page)
             time.sleep(0.05)
@@ -2123,12 +2380,59 @@ class BaseCase(unittest.TestCase):
         for page in pages:
             self.generate_referral(None, page)
 
-    def generate_traffic_chain(self, pages, loops=1):
-        """ Similar to generate_referral_chain(), but for multiple loops. """
+    def generate_traffic_chain(self, pages, loops=1,
+                               workers=None, max_per_second=None):
+        """ Similar to generate_referral_chain(), but for multiple loops.
+            If "workers" is set, the loops get spread across that many
+            headless browsers. (See generate_traffic() for details.) """
+        if workers:
+            if not type(pages) is tuple and not type(pages) is list:
+                raise Exception(
+                    "Exception: Expecting a list of website pages for "
+                    "chaining!")
+            if len(pages) < 2:
+                raise Exception(
+                    "Exception: At least two website pages required for "
+                    "chaining!")
+            for page in pages:
+                if not page_utils.is_valid_url(page):
+                    raise Exception(
+                        "Exception: Website page {%s} is not a valid URL!"
+                        % page)
+            return self.__generate_concurrent_traffic(
+                list(pages), loops, workers, max_per_second)
         for loop in range(loops):
             self.generate_referral_chain(pages)
             time.sleep(0.05)
 
+    def __generate_concurrent_traffic(self, pages, loops, workers,
+                                      max_per_second):
+        from seleniumbase.core import browser_launcher
+        from seleniumbase.core import traffic_helper
+        use_grid = False
+        if self.servername != "localhost":
+            use_grid = True
+
+        def get_traffic_driver():
+            return browser_launcher.get_driver(
+                browser_name=self.browser,
+                headless=True,
+                use_grid=use_grid,
+                servername=self.servername,
+                port=self.port,
+                proxy_string=self.proxy_string,
+                user_agent=self.user_agent,
+                cap_file=self.cap_file,
+                cap_name=self.cap_name,
+                ad_block_on=self.ad_block_on,
+                block=self.block_resources)
+
+        report = traffic_helper.generate_traffic(
+            get_traffic_driver, pages, loops=loops, workers=workers,
+            max_per_second=max_per_second)
+        print("\n" + traffic_helper.get_report_summary(report))
+        return report
+
     ############
 
     def wait_for_element_present(self, selector, by=By.CSS_SELECTOR,
@@ -2414,18 +2718,29 @@ class BaseCase(unittest.TestCase):
         is_ready = js_utils.wait_for_ready_state_complete(self.driver, timeout)
         self.wait_for_angularjs(timeout=settings.MINI_TIMEOUT)
         if self.js_checking_on:
-            self.assert_no_js_errors()
-        if self.ad_block_on:
+            collector = console_log_helper.start_collector(
+                self.driver, self.id())
+        else:
+            collector = console_log_helper.get_collector(
+                self.driver, self.id())
+        if not collector and not self.ad_block_on:
+            return is_ready
+        current_url = self.get_current_url()
+        is_new_page = (current_url != self.__last_page_load_url)
+        if collector:
+            # (Only new pages get drained, unless JS checking is on)
+            if is_new_page:
+                collector.on_page_load(current_url)
+            elif self.js_checking_on:
+                collector.collect()
+            if self.js_checking_on:
+                self.__assert_no_new_js_errors(collector)
+        if self.ad_block_on and is_new_page:
             # If the ad_block feature is enabled, then block ads for new URLs
-            current_url = self.get_current_url()
-            if not current_url == self.__last_page_load_url:
-                time.sleep(0.02)
-                self.ad_block()
-                time.sleep(0.01)
-                if self.is_element_present("iframe"):
-                    time.sleep(0.07)  # iframe ads take slightly longer to load
-                    self.ad_block()  # Do ad_block on slower-loading iframes
-                self.__last_page_load_url = current_url
+            # Slower-loading ads (such as iframes) get removed by the
+            # MutationObserver that ad_block() leaves on the page.
+            self.ad_block()
+        self.__last_page_load_url = current_url
         return is_ready
 
     def wait_for_angularjs(self, timeout=settings.LARGE_TIMEOUT, **kwargs):
@@ -2674,7 +2989,8 @@ class BaseCase(unittest.TestCase):
                        servername=None, port=None, proxy=None, agent=None,
                        switch_to=True, cap_file=None, disable_csp=None,
                        enable_sync=None, user_data_dir=None,
-                       extension_zip=None, extension_dir=None):
+                       extension_zip=None, extension_dir=None,
+                       cap_name=None):
         """ This method spins up an extra browser for tests that require
             more than one. The first browser is already provided by tests
             that import base_case.BaseCase from seleniumbase. If parameters
@@ -2692,6 +3008,7 @@ class BaseCase(unittest.TestCase):
             user_data_dir - Chrome's User Data Directory to use (Chrome-only)
             extension_zip - A Chrome Extension ZIP file to use (Chrome-only)
             extension_dir - A Chrome Extension folder to use (Chrome-only)
+            cap_name - the named capability set of the cap_file to use
         """
         if self.browser == "remote" and self.servername == "localhost":
             raise Exception('Cannot use "remote" browser driver on localhost!'
@@ -2747,6 +3064,8 @@ class BaseCase(unittest.TestCase):
             disable_csp = True
         if cap_file is None:
             cap_file = self.cap_file
+        if cap_name is None:
+            cap_name = self.cap_name
         valid_browsers = constants.ValidBrowsers.valid_browsers
         if browser_name not in valid_browsers:
             raise Exception("Browser: {%s} is not a valid browser option. "
@@ -2765,7 +3084,11 @@ class BaseCase(unittest.TestCase):
                                                  enable_sync=enable_sync,
                                                  user_data_dir=user_data_dir,
                                                  extension_zip=extension_zip,
-                                                 extension_dir=extension_dir)
+                                                 extension_dir=extension_dir,
+                                                 ad_block_on=self.ad_block_on,
+                                                 block=self.block_resources,
+                                                 profile=self.sb_profile,
+                                                 cap_name=cap_name)
         self._drivers_list.append(new_driver)
         if switch_to:
             self.driver = new_driver
@@ -2877,8 +3200,12 @@ class BaseCase(unittest.TestCase):
                                timeout=settings.MINI_TIMEOUT):
         """ A non-terminating assertion for an element on a page.
             Failures will be saved until the process_delayed_asserts()
-            method is called from inside a test, likely at the end of it. """
+            method is called from inside a test, likely at the end of it.
+            Inside of a delayed_assert_batch(), the check gets evaluated
+            when the batch ends. (Returns None in that case.) """
         self.__delayed_assert_count += 1
+        if self.__add_to_delayed_assert_batch(selector, by, None):
+            return None
         try:
             url = self.get_current_url()
             if url == self.__last_url_of_delayed_assert:
@@ -2898,8 +3225,12 @@ class BaseCase(unittest.TestCase):
                             timeout=settings.MINI_TIMEOUT):
         """ A non-terminating assertion for text from an element on a page.
             Failures will be saved until the process_delayed_asserts()
-            method is called from inside a test, likely at the end of it. """
+            method is called from inside a test, likely at the end of it.
+            Inside of a delayed_assert_batch(), the check gets evaluated
+            when the batch ends. (Returns None in that case.) """
         self.__delayed_assert_count += 1
+        if self.__add_to_delayed_assert_batch(selector, by, text):
+            return None
         try:
             url = self.get_current_url()
             if url == self.__last_url_of_delayed_assert:
@@ -2915,6 +3246,89 @@ class BaseCase(unittest.TestCase):
             self.__add_delayed_assert_failure()
             return False
 
+    @contextlib.contextmanager
+    def delayed_assert_batch(self, timeout=settings.MINI_TIMEOUT):
+        """ Collects the delayed_assert_element() and delayed_assert_text()
+            calls made inside the "with" block, and then evaluates all of
+            them together in the browser, which shares one timeout between
+            all the checks instead of waiting on each missing item in turn.
+            Failures get saved for process_delayed_asserts() as usual, along
+            with a single screenshot of the page (in the logs folder).
+            Usage:
+                with self.delayed_assert_batch():
+                    self.delayed_assert_element("img.logo")
+                    self.delayed_assert_text("Welcome", "h1")
+                self.process_delayed_asserts() """
+        if self.__delayed_assert_batch is not None:
+            yield  # Already collecting checks for an outer batch
+            return
+        self.__delayed_assert_batch = []
+        try:
+            yield
+        finally:
+            checks = self.__delayed_assert_batch
+            self.__delayed_assert_batch = None
+        self.__process_delayed_assert_batch(checks, timeout)
+
+    def __add_to_delayed_assert_batch(self, selector, by, text):
+        """ Adds a check to the current delayed_assert_batch(), if any.
+            Returns False if the check needs to be evaluated right away. """
+        if self.__delayed_assert_batch is None:
+            return False
+        selector, by = self.__recalculate_selector(selector, by)
+        if by not in (By.CSS_SELECTOR, By.XPATH):
+            return False
+        self.__delayed_assert_batch.append(
+            (self.__delayed_assert_count, selector, by, text))
+        return True
+
+    def __process_delayed_assert_batch(self, checks, timeout):
+        if not checks:
+            return
+        script_checks = [
+            [selector, by == By.XPATH, text]
+            for (count, selector, by, text) in checks]
+        pending = list(range(len(checks)))
+        deadline = timing_helper.Deadline(timeout, "delayed_assert_batch")
+        while True:
+            try:
+                failed = js_utils.get_failed_delayed_asserts(
+                    self.driver, [script_checks[i] for i in pending])
+                pending = [pending[i] for i in failed]
+            except Exception:
+                pass  # The page may be changing. Keep all pending checks.
+            if not pending or deadline.expired():
+                break
+            deadline.sleep(0.1)
+        deadline.record(timed_out=bool(pending))
+        if not pending:
+            return
+        try:
+            current_url = self.driver.current_url
+            self.__last_url_of_delayed_assert = current_url
+        except Exception:
+            current_url = self.__last_url_of_delayed_assert
+        try:
+            self.save_screenshot(
+                "delayed_asserts_%s.png" % checks[pending[0]][0],
+                folder=os.path.join(self.log_path, self.id()))
+        except Exception:
+            pass
+        plural = "s"
+        if timeout == 1:
+            plural = ""
+        for index in pending:
+            count, selector, by, text = checks[index]
+            if text is None:
+                message = "Element {%s} was not visible after %s second%s!" % (
+                    selector, timeout, plural)
+            else:
+                message = (
+                    "Expected text {%s} for {%s} was not visible after "
+                    "%s second%s!" % (text, selector, timeout, plural))
+            self.__delayed_assert_failures.append(
+                "CHECK #%s: (%s)\n %s" % (count, current_url, message))
+
     def process_delayed_asserts(self, print_only=False):
         """ To be used with any test that uses delayed_asserts, which are
             non-terminating verifications that only raise exceptions
@@ -3060,6 +3474,21 @@ class BaseCase(unittest.TestCase):
         js_utils.scroll_to_element(self.driver, element)
         self.__demo_mode_pause_if_active(tiny=True)
 
+    def __get_visible_element_in_view(self, selector, by, timeout):
+        """ The fast path for click(): Finds the element, then checks if it's
+            visible and scrolls to it (if needed) with one script call.
+            Falls back to waiting for the element if that doesn't work. """
+        try:
+            element = self.driver.find_element(by=by, value=selector)
+            if js_utils.scroll_to_element_if_visible(self.driver, element):
+                return element
+        except Exception:
+            pass
+        element = page_actions.wait_for_element_visible(
+            self.driver, selector, by, timeout=timeout)
+        self.__scroll_to_element(element)
+        return element
+
     def __slow_scroll_to_element(self, element):
         js_utils.slow_scroll_to_element(self.driver, element, self.browser)
 
@@ -3203,11 +3632,13 @@ class BaseCase(unittest.TestCase):
             self.proxy_string = sb_config.proxy_string
             self.user_agent = sb_config.user_agent
             self.cap_file = sb_config.cap_file
+            self.cap_name = sb_config.cap_name
             self.settings_file = sb_config.settings_file
             self.database_env = sb_config.database_env
             self.message_duration = sb_config.message_duration
             self.js_checking_on = sb_config.js_checking_on
             self.ad_block_on = sb_config.ad_block_on
+            self.block_resources = sb_config.block_resources
             self.verify_delay = sb_config.verify_delay
             self.disable_csp = sb_config.disable_csp
             self.enable_sync = sb_config.enable_sync
@@ -3218,6 +3649,8 @@ class BaseCase(unittest.TestCase):
             self.save_screenshot_after_test = sb_config.save_screenshot
             self.visual_baseline = sb_config.visual_baseline
             self.timeout_multiplier = sb_config.timeout_multiplier
+            self.sb_profile = sb_config.sb_profile
+            self.record_page_timings = sb_config.record_page_timings
             self.pytest_html_report = sb_config.pytest_html_report
             self.report_on = False
             if self.pytest_html_report:
@@ -3266,10 +3699,8 @@ class BaseCase(unittest.TestCase):
                 self.case_start_time = int(time.time() * 1000)
             if self.headless:
                 try:
-                    # from pyvirtualdisplay import Display  # Skip for own lib
-                    from seleniumbase.virtual_display.display import Display
-                    self.display = Display(visible=0, size=(1440, 1880))
-                    self.display.start()
+                    # (The virtual display is reused across tests)
+                    self.display = display_helper.get_display()
                     self.headless_active = True
                 except Exception:
                     # pyvirtualdisplay might not be necessary anymore because
@@ -3284,6 +3715,8 @@ class BaseCase(unittest.TestCase):
                             """ >>> "python setup.py develop" <<< """)
         if self.settings_file:
             settings_parser.set_settings(self.settings_file)
+        if self.sb_profile:
+            profile_helper.set_current_test(self.id())
 
         # Launch WebDriver for both Pytest and Nosetests
         self.driver = self.get_new_driver(browser=self.browser,
@@ -3376,6 +3809,7 @@ class BaseCase(unittest.TestCase):
         # Close all open browser windows
         self._drivers_list.reverse()  # Last In, First Out
         for driver in self._drivers_list:
+            console_log_helper.stop_collector(driver)
             try:
                 driver.quit()
             except AttributeError:
@@ -3502,12 +3936,7 @@ class BaseCase(unittest.TestCase):
                 self.__quit_all_drivers()
             if self.headless:
                 if self.headless_active:
-                    try:
-                        self.display.stop()
-                    except AttributeError:
-                        pass
-                    except Exception:
-                        pass
+                    # (The virtual display stays up for the next test)
                     self.display = None
             if self.with_db_reporting:
                 if has_exception:
@@ -2,14 +2,19 @@
 This module contains useful Javascript utility methods for base_case.py
 These helper methods SHOULD NOT be called directly from tests.
 """
+import json
 import re
-import requests
 import time
+from selenium.common.exceptions import TimeoutException
 from selenium.common.exceptions import WebDriverException
 from seleniumbase.common import decorators
 from seleniumbase.config import settings
+from seleniumbase.core import bundle_helper
+from seleniumbase.core import timing_helper
 from seleniumbase.fixtures import constants
 
+_js_code_cache = {}
+
 
 def wait_for_ready_state_complete(driver, timeout=settings.EXTREME_TIMEOUT):
     """
@@ -19,23 +24,25 @@ def wait_for_ready_state_complete(driver, timeout=settings.EXTREME_TIMEOUT):
     This method will wait until document.readyState == "complete".
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    deadline = timing_helper.Deadline(
+        timeout, "wait_for_ready_state_complete")
+    while True:
         try:
             ready_state = driver.execute_script("return document.readyState")
         except WebDriverException:
             # Bug fix for: [Permission denied to access property "document"]
             time.sleep(0.03)
+            deadline.record()
             return True
         if ready_state == u'complete':
             time.sleep(0.01)  # Better be sure everything is done loading
+            deadline.record()
             return True
         else:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     raise Exception(
         "Page elements never fully loaded after %s seconds!" % timeout)
 
@@ -84,18 +91,21 @@ def is_jquery_activated(driver):
 
 def wait_for_jquery_active(driver, timeout=None):
     if not timeout:
-        timeout = int(settings.MINI_TIMEOUT * 10.0)
-    else:
-        timeout = int(timeout * 10.0)
-    for x in range(timeout):
+        timeout = settings.MINI_TIMEOUT
+    deadline = timing_helper.Deadline(timeout, "wait_for_jquery_active")
+    while True:
         # jQuery needs a small amount of time to activate.
         try:
             driver.execute_script("jQuery('html')")
             wait_for_ready_state_complete(driver)
             wait_for_angularjs(driver)
+            deadline.record()
             return
         except Exception:
-            time.sleep(0.1)
+            if deadline.expired():
+                break
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
 
 
 def activate_jquery(driver):
@@ -109,6 +119,9 @@ def activate_jquery(driver):
     except Exception:
         # jQuery is not currently defined. Let's proceed by defining it.
         pass
+    if bundle_helper.inject_bundle(driver, "jquery"):
+        # The local copy of jQuery was injected inline. (No CDN needed.)
+        return
     jquery_js = constants.JQuery.MIN_JS
     activate_jquery_script = (
         '''var script = document.createElement('script');'''
@@ -176,104 +189,130 @@ def safe_execute_script(driver, script):
 def wait_for_css_query_selector(
         driver, selector, timeout=settings.SMALL_TIMEOUT):
     element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    css_selector = escape_quotes_if_needed(re.escape(selector))
+    deadline = timing_helper.Deadline(timeout, "wait_for_css_query_selector")
+    while True:
         try:
-            selector = re.escape(selector)
-            selector = escape_quotes_if_needed(selector)
             element = driver.execute_script(
-                """return document.querySelector('%s')""" % selector)
+                """return document.querySelector('%s')""" % css_selector)
             if element:
+                deadline.record()
                 return element
         except Exception:
             element = None
         if not element:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
-
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     raise Exception(
         "Element {%s} was not present after %s seconds!" % (
             selector, timeout))
 
 
-def highlight_with_js(driver, selector, loops, o_bs):
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(128, 128, 128, 0.5)';"""
-              % selector)
-    driver.execute_script(script)
-    for n in range(loops):
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(255, 0, 0, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(128, 0, 128, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(0, 0, 255, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(0, 255, 0, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(128, 128, 0, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(128, 0, 128, 1)';"""
-                  % selector)
+HIGHLIGHT_COLORS = [
+    "0px 0px 6px 6px rgba(255, 0, 0, 1)",
+    "0px 0px 6px 6px rgba(128, 0, 128, 1)",
+    "0px 0px 6px 6px rgba(0, 0, 255, 1)",
+    "0px 0px 6px 6px rgba(0, 255, 0, 1)",
+    "0px 0px 6px 6px rgba(128, 128, 0, 1)",
+    "0px 0px 6px 6px rgba(128, 0, 128, 1)",
+]
+HIGHLIGHT_START_COLOR = "0px 0px 6px 6px rgba(128, 128, 128, 0.5)"
+HIGHLIGHT_2_COLORS = [
+    "0px 0px 6px 6px rgba(128, 128, 128, 0.5)",
+    "0px 0px 6px 6px rgba(205, 30, 0, 1)",
+    "0px 0px 6px 6px rgba(128, 0, 128, 1)",
+    "0px 0px 6px 6px rgba(50, 50, 128, 1)",
+    "0px 0px 6px 6px rgba(50, 205, 50, 1)",
+]
+# (The jQuery version has always used a brighter shade of blue)
+HIGHLIGHT_2_JQUERY_COLORS = [
+    "0px 0px 6px 6px rgba(128, 128, 128, 0.5)",
+    "0px 0px 6px 6px rgba(205, 30, 0, 1)",
+    "0px 0px 6px 6px rgba(128, 0, 128, 1)",
+    "0px 0px 6px 6px rgba(50, 50, 200, 1)",
+    "0px 0px 6px 6px rgba(50, 205, 50, 1)",
+]
+HIGHLIGHT_FRAME_MS = 30  # How long each color is displayed for
+
+# Runs the whole highlight animation in the browser with requestAnimationFrame.
+# When run with execute_async_script(), the callback fires once it's done.
+# (Hidden tabs don't get animation frames, so setTimeout() is used there.)
+HIGHLIGHT_ANIMATION_SCRIPT = (
+    """var paint = function(box_shadow) { %s };
+       var colors = %s;
+       var restore = %s;
+       var frameMs = %s;
+       var done = arguments[arguments.length - 1];
+       if (typeof done !== 'function') { done = null; }
+       var nextFrame = function(f) { window.setTimeout(f, 16); };
+       if (window.requestAnimationFrame && !document.hidden) {
+           nextFrame = function(f) { window.requestAnimationFrame(f); };
+       }
+       var start = new Date().getTime();
+       var step = function() {
+           try {
+               var now = new Date().getTime();
+               var frame = Math.floor((now - start) / frameMs);
+               if (frame < colors.length) {
+                   paint(colors[frame]);
+                   nextFrame(step);
+                   return;
+               }
+               if (restore !== null) { paint(restore); }
+           } catch (e) {}
+           if (done) { done(true); }
+       };
+       paint(colors[0]);
+       nextFrame(step);""")
+
+
+def _js_paint(selector):
+    return ("""document.querySelector('%s').style =
+              'box-shadow: ' + box_shadow;""" % selector)
+
+
+def _jquery_paint(selector):
+    return """jQuery('%s').css('box-shadow', box_shadow);""" % selector
+
+
+def _animate_highlight(driver, paint, colors, o_bs, wait=True):
+    """ Plays the highlight animation with a single script call.
+        If o_bs (the original box-shadow) is None, it isn't restored.
+        If wait is False, returns without waiting for the animation to end. """
+    if o_bs is not None:
+        o_bs = json.dumps(o_bs)
+    else:
+        o_bs = "null"
+    script = HIGHLIGHT_ANIMATION_SCRIPT % (
+        paint, json.dumps(colors), o_bs, HIGHLIGHT_FRAME_MS)
+    if wait:
+        timeout = settings.SMALL_TIMEOUT + (
+            len(colors) * HIGHLIGHT_FRAME_MS / 1000.0)
+        execute_async_script(driver, script, timeout=timeout)
+    else:
         driver.execute_script(script)
-        time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: %s';"""
-              % (selector, o_bs))
-    driver.execute_script(script)
 
 
-def highlight_with_jquery(driver, selector, loops, o_bs):
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(128, 128, 128, 0.5)');""" % selector
-    safe_execute_script(driver, script)
-    for n in range(loops):
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(255, 0, 0, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(128, 0, 128, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(0, 0, 255, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(0, 255, 0, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(128, 128, 0, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(128, 0, 128, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow', '%s');""" % (selector, o_bs)
+def _restore_box_shadow(driver, paint, o_bs):
+    script = "var box_shadow = %s; %s" % (json.dumps(o_bs), paint)
     driver.execute_script(script)
 
 
+def highlight_with_js(driver, selector, loops, o_bs, wait=True):
+    colors = [HIGHLIGHT_START_COLOR] + (HIGHLIGHT_COLORS * loops)
+    _animate_highlight(driver, _js_paint(selector), colors, o_bs, wait=wait)
+
+
+def highlight_with_jquery(driver, selector, loops, o_bs, wait=True):
+    if not is_jquery_activated(driver):
+        activate_jquery(driver)
+    colors = [HIGHLIGHT_START_COLOR] + (HIGHLIGHT_COLORS * loops)
+    _animate_highlight(
+        driver, _jquery_paint(selector), colors, o_bs, wait=wait)
+
+
 def add_css_link(driver, css_link):
     script_to_add_css = (
         """function injectCSS(css) {
@@ -325,7 +364,10 @@ def add_css_style(driver, css_style):
 def add_js_code_from_link(driver, js_link):
     if js_link.startswith("//"):
         js_link = "http:" + js_link
-    js_code = requests.get(js_link).text
+    if js_link not in _js_code_cache:
+        import requests
+        _js_code_cache[js_link] = requests.get(js_link).text
+    js_code = _js_code_cache[js_link]
     add_js_code_script = (
         '''var h = document.getElementsByTagName('head').item(0);'''
         '''var s = document.createElement("script");'''
@@ -368,6 +410,10 @@ def activate_jquery_confirm(driver):
     jq_confirm_css = constants.JqueryConfirm.MIN_CSS
     jq_confirm_js = constants.JqueryConfirm.MIN_JS
 
+    if bundle_helper.inject_bundle(driver, "jquery_confirm"):
+        wait_for_ready_state_complete(driver)
+        wait_for_angularjs(driver)
+        return
     if not is_jquery_activated(driver):
         add_js_link(driver, jquery_js)
         wait_for_jquery_active(driver, timeout=0.6)
@@ -405,6 +451,11 @@ def activate_messenger(driver):
                  "messenger-on-bottom messenger-on-right', "
                  "theme: 'future'}")
 
+    if bundle_helper.inject_bundle(driver, "messenger"):
+        driver.execute_script(msg_style)
+        wait_for_ready_state_complete(driver)
+        wait_for_angularjs(driver)
+        return
     add_js_link(driver, jquery_js)
     add_css_link(driver, messenger_css)
     add_css_link(driver, msgr_theme_flat_css)
@@ -528,67 +579,494 @@ def post_messenger_error_message(driver, message, msg_dur):
 def highlight_with_js_2(driver, message, selector, o_bs, msg_dur):
     if selector == "html":
         selector = "body"
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(128, 128, 128, 0.5)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(205, 30, 0, 1)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(128, 0, 128, 1)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(50, 50, 128, 1)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(50, 205, 50, 1)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
+    paint = _js_paint(selector)
+    _animate_highlight(driver, paint, HIGHLIGHT_2_COLORS, None)
 
     post_messenger_success_message(driver, message, msg_dur)
 
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: %s';""" % (selector, o_bs))
-    driver.execute_script(script)
+    _restore_box_shadow(driver, paint, o_bs)
 
 
 def highlight_with_jquery_2(driver, message, selector, o_bs, msg_dur):
     if selector == "html":
         selector = "body"
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(128, 128, 128, 0.5)');""" % selector
-    safe_execute_script(driver, script)
-    time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(205, 30, 0, 1)');""" % selector
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(128, 0, 128, 1)');""" % selector
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(50, 50, 200, 1)');""" % selector
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(50, 205, 50, 1)');""" % selector
-    driver.execute_script(script)
-    time.sleep(0.0181)
+    if not is_jquery_activated(driver):
+        activate_jquery(driver)
+    paint = _jquery_paint(selector)
+    _animate_highlight(driver, paint, HIGHLIGHT_2_JQUERY_COLORS, None)
 
     post_messenger_success_message(driver, message, msg_dur)
 
-    script = """jQuery('%s').css('box-shadow', '%s');""" % (selector, o_bs)
-    driver.execute_script(script)
+    _restore_box_shadow(driver, paint, o_bs)
+
+
+# Removes all elements that match the combined ad_block selector, and then
+# keeps a MutationObserver on the page that removes matching elements that
+# get added later. If any selector in the list is invalid, the combined
+# selector gets rebuilt from the valid ones. (Only one observer per page.)
+AD_BLOCK_SCRIPT = (
+    """var selectors = %s;
+       var selector = selectors.join(', ');
+       try {
+           document.querySelector(selector);
+       } catch (e) {
+           selector = selectors.filter(function(s) {
+               try { document.querySelector(s); return true; }
+               catch (e2) { return false; }
+           }).join(', ');
+       }
+       if (!selector) { return 0; }
+       var removeAds = function(root) {
+           var ads = root.querySelectorAll(selector);
+           for (var i = 0; i < ads.length; i++) { ads[i].remove(); }
+           return ads.length;
+       };
+       var removed = removeAds(document);
+       if (!window.sbAdBlockObserver && window.MutationObserver) {
+           window.sbAdBlockObserver = new MutationObserver(function(records) {
+               for (var r = 0; r < records.length; r++) {
+                   var nodes = records[r].addedNodes;
+                   for (var n = 0; n < nodes.length; n++) {
+                       var node = nodes[n];
+                       if (node.nodeType !== 1 || !node.parentNode) {
+                           continue;
+                       }
+                       if (node.matches && node.matches(selector)) {
+                           node.remove();
+                       } else {
+                           removeAds(node);
+                       }
+                   }
+               }
+           });
+           window.sbAdBlockObserver.observe(
+               document.documentElement, {childList: true, subtree: true});
+       }
+       return removed;""")
+
+_ad_block_script = {}
+
+
+def get_ad_block_script():
+    """ Compiles ad_block_list.AD_BLOCK_LIST into the ad_block script.
+        (This only happens once per process.) """
+    if "script" not in _ad_block_script:
+        from seleniumbase.config import ad_block_list
+        _ad_block_script["script"] = AD_BLOCK_SCRIPT % json.dumps(
+            ad_block_list.AD_BLOCK_LIST)
+    return _ad_block_script["script"]
+
+
+def ad_block(driver):
+    """ Removes ads with a single script call. Returns the number removed.
+        Ads that get added to the page later are also removed. """
+    return driver.execute_script(get_ad_block_script())
+
+
+# JS functions that get shared by the scripts below. isVisible() is similar to
+# WebElement.is_displayed(), but it can check many elements in one round trip.
+VISIBILITY_FUNCTIONS = (
+    """var isVisible = function(element) {
+           var rect = element.getBoundingClientRect();
+           if (!(rect.width > 0 || rect.height > 0)) { return false; }
+           var style = window.getComputedStyle(element);
+           return !(style.visibility === 'hidden' || style.opacity === '0');
+       };
+       var scrollIntoViewIfNeeded = function(element) {
+           var rect = element.getBoundingClientRect();
+           var viewHeight = window.innerHeight ||
+                            document.documentElement.clientHeight;
+           if (rect.top < 0 || rect.bottom > viewHeight) {
+               var y = Math.floor(rect.top + window.pageYOffset - 130);
+               window.scrollTo(0, Math.max(0, y));
+           }
+       };
+    """)
+
+# Returns false if the element is not visible. Otherwise, scrolls the window
+# so that the element is 130px below the top (only if the element isn't
+# already fully in the viewport), and returns true.
+SCROLL_IF_VISIBLE_SCRIPT = VISIBILITY_FUNCTIONS + (
+    """var element = arguments[0];
+       if (!isVisible(element)) { return false; }
+       scrollIntoViewIfNeeded(element);
+       return true;""")
+
+# Returns the visible elements (up to the limit, if the limit is > 0).
+# Matches come from the CSS Selector or XPath, or else from arguments[3].
+# Only the visible elements get serialized back to WebDriver.
+FIND_VISIBLE_ELEMENTS_SCRIPT = VISIBILITY_FUNCTIONS + (
+    """var selector = arguments[0];
+       var isXPath = arguments[1];
+       var limit = arguments[2];
+       var matches = arguments[3];
+       if (!matches) {
+           matches = [];
+           if (isXPath) {
+               var snapshot = document.evaluate(
+                   selector, document, null,
+                   XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+               for (var s = 0; s < snapshot.snapshotLength; s++) {
+                   var node = snapshot.snapshotItem(s);
+                   if (node.nodeType === 1) { matches.push(node); }
+               }
+           } else {
+               matches = document.querySelectorAll(selector);
+           }
+       }
+       var visible = [];
+       for (var i = 0; i < matches.length; i++) {
+           if (limit > 0 && visible.length >= limit) { break; }
+           if (isVisible(matches[i])) { visible.push(matches[i]); }
+       }
+       return visible;""")
+
+# Fills in form fields from a list of [selector, is_xpath, kind, value].
+# Kinds: "text", "index", "value" (for dropdowns, "text" is the option text),
+# "check" (for checkboxes & radio buttons), "native" (to use send_keys).
+# All fields must be visible and enabled before any value gets set.
+# Returns {"missing": [indexes], "native": [indexes], "file": [indexes],
+#          "errors": [[i, msg]]}.
+# Fields need native key events if they're autocompletes, or if the value
+# didn't stick after setting it. (Such as from input masks.)
+# File inputs are returned in "file", since those can't be cleared.
+FILL_FORM_SCRIPT = VISIBILITY_FUNCTIONS + (
+    """var fields = arguments[0];
+       var result = {missing: [], "native": [], file: [], errors: []};
+       var findElement = function(selector, isXPath) {
+           if (isXPath) {
+               return document.evaluate(
+                   selector, document, null,
+                   XPathResult.FIRST_ORDERED_NODE_TYPE, null
+               ).singleNodeValue;
+           }
+           return document.querySelector(selector);
+       };
+       var fireEvent = function(element, eventType) {
+           var event = document.createEvent('HTMLEvents');
+           event.initEvent(eventType, true, true);
+           element.dispatchEvent(event);
+       };
+       var setValue = function(element, value) {
+           var proto = Object.getPrototypeOf(element);
+           var desc = Object.getOwnPropertyDescriptor(proto, 'value');
+           if (desc && desc.set) {
+               desc.set.call(element, value);  // (Also works with React)
+           } else {
+               element.value = value;
+           }
+       };
+       var normalize = function(text) {
+           return text.replace(/\\s+/g, ' ').replace(/^ | $/g, '');
+       };
+       var elements = [];
+       for (var i = 0; i < fields.length; i++) {
+           var found = findElement(fields[i][0], fields[i][1]);
+           if (!found || !isVisible(found) || found.disabled) {
+               result.missing.push(i);
+           }
+           elements.push(found);
+       }
+       if (result.missing.length > 0) { return result; }
+       for (var i = 0; i < fields.length; i++) {
+           var element = elements[i];
+           var kind = fields[i][2];
+           var value = fields[i][3];
+           var tag = element.tagName.toLowerCase();
+           var type = (element.getAttribute('type') || '').toLowerCase();
+           if (tag === 'select') {
+               var index = -1;
+               for (var j = 0; j < element.options.length; j++) {
+                   var option = element.options[j];
+                   if ((kind === 'index' && j === value) ||
+                       (kind === 'value' && option.value === value) ||
+                       (kind === 'text' &&
+                           normalize(option.text) === normalize(value))) {
+                       index = j;
+                       break;
+                   }
+               }
+               if (index < 0) {
+                   result.errors.push(
+                       [i, 'Option {' + value + '} not found by ' + kind]);
+                   continue;
+               }
+               element.selectedIndex = index;
+               fireEvent(element, 'input');
+               fireEvent(element, 'change');
+           } else if (type === 'checkbox' || type === 'radio') {
+               if (element.checked !== !!value) { element.click(); }
+           } else if (type === 'file') {
+               result.file.push(i);  // (Files are chosen with send_keys)
+           } else if (kind === 'native' ||
+                      element.isContentEditable ||
+                      element.getAttribute('aria-autocomplete') ||
+                      element.getAttribute('role') === 'combobox') {
+               result["native"].push(i);
+           } else {
+               element.focus();
+               setValue(element, value);
+               fireEvent(element, 'input');
+               fireEvent(element, 'change');
+               element.blur();
+               if (element.value !== value) { result["native"].push(i); }
+           }
+       }
+       return result;""")
+
+# Evaluates delayed_assert checks from a list of [selector, is_xpath, text].
+# If text is null, the check passes if the element is visible. Otherwise, the
+# first matching element must be visible and contain the text.
+# Returns the indexes of the checks that failed.
+DELAYED_ASSERT_BATCH_SCRIPT = VISIBILITY_FUNCTIONS + (
+    """var checks = arguments[0];
+       var failed = [];
+       var findElement = function(selector, isXPath) {
+           if (isXPath) {
+               return document.evaluate(
+                   selector, document, null,
+                   XPathResult.FIRST_ORDERED_NODE_TYPE, null
+               ).singleNodeValue;
+           }
+           return document.querySelector(selector);
+       };
+       for (var i = 0; i < checks.length; i++) {
+           try {
+               var element = findElement(checks[i][0], checks[i][1]);
+               var text = checks[i][2];
+               if (!element || !isVisible(element) || (text !== null &&
+                       (element.innerText || '').indexOf(text) < 0)) {
+                   failed.push(i);
+               }
+           } catch (e) {
+               failed.push(i);  // (Such as from an invalid selector)
+           }
+       }
+       return failed;""")
+
+# Returns the Navigation Timing and Resource Timing data of the current page
+# in one compact structure. Times are in ms from the start of the navigation.
+# "page_load" is the load event end time (or null if it hasn't finished yet).
+# Sizes are in bytes. (Cross-origin resources might not report their sizes.)
+# Falls back to the older performance.timing API if needed.
+PAGE_TIMINGS_SCRIPT = (
+    """var maxLargest = arguments[0];
+       var perf = window.performance;
+       if (!perf) { return null; }
+       var getEntries = function(type) {
+           return perf.getEntriesByType ? perf.getEntriesByType(type) : [];
+       };
+       var ms = function(value) { return Math.round(value || 0); };
+       var size = function(entry) {
+           return Math.max(entry.transferSize || 0,
+                           entry.encodedBodySize || 0);
+       };
+       var nav = getEntries('navigation')[0];
+       var navStart = 0;
+       if (!nav && perf.timing) {
+           nav = perf.timing;
+           navStart = nav.navigationStart;
+       }
+       var at = function(value) {
+           return value ? ms(value - navStart) : 0;
+       };
+       var navigation = {};
+       if (nav) {
+           navigation = {
+               redirect: ms(nav.redirectEnd - nav.redirectStart),
+               dns: ms(nav.domainLookupEnd - nav.domainLookupStart),
+               connect: ms(nav.connectEnd - nav.connectStart),
+               ttfb: at(nav.responseStart),
+               response: ms(nav.responseEnd - nav.responseStart),
+               dom_interactive: at(nav.domInteractive),
+               dom_content_loaded: at(nav.domContentLoadedEventEnd),
+               load: at(nav.loadEventEnd),
+               transfer_size: size(nav)
+           };
+       }
+       var resources = getEntries('resource');
+       var totalSize = 0;
+       var lastEnd = 0;
+       var byType = {};
+       var all = [];
+       for (var i = 0; i < resources.length; i++) {
+           var r = resources[i];
+           var rSize = size(r);
+           var rType = r.initiatorType || 'other';
+           totalSize += rSize;
+           lastEnd = Math.max(lastEnd, r.responseEnd);
+           if (!byType[rType]) { byType[rType] = [0, 0]; }
+           byType[rType][0] += 1;
+           byType[rType][1] += rSize;
+           all.push([r.name, rType, rSize, ms(r.duration)]);
+       }
+       all.sort(function(a, b) { return (b[2] - a[2]) || (b[3] - a[3]); });
+       return {
+           url: window.location.href,
+           page_load: (navigation.load || null),
+           navigation: navigation,
+           resources: {
+               count: resources.length,
+               transfer_size: totalSize,
+               last_response_end: ms(lastEnd),
+               by_type: byType,
+               largest: all.slice(0, maxLargest)
+           }
+       };""")
+
+# Clicks the visible elements in order, scrolling to each one if needed.
+# Stops early at the limit, or after a click that can load a new page:
+# a click on a link or on a form submit button (unless the click event was
+# canceled), or a click that fired "beforeunload" / "pagehide".
+# (The URL doesn't change during the script, since navigation is async.)
+# Returns [click_count, indexes of elements where the JS click failed,
+#          whether a click may have started loading a new page].
+CLICK_VISIBLE_ELEMENTS_SCRIPT = VISIBILITY_FUNCTIONS + (
+    """var elements = arguments[0];
+       var limit = arguments[1];
+       var checkObscured = arguments[2];
+       var clickCount = 0;
+       var failed = [];
+       var unloading = false;
+       var lastEvent = null;
+       var onUnload = function() { unloading = true; };
+       var onClick = function(event) { lastEvent = event; };
+       var getLink = function(element) {
+           while (element && element.tagName) {
+               if (element.tagName.toLowerCase() === 'a' &&
+                       element.hasAttribute('href')) {
+                   return element;
+               }
+               element = element.parentNode;
+           }
+           return null;
+       };
+       var isObscured = function(element) {
+           var rect = element.getBoundingClientRect();
+           var target = document.elementFromPoint(
+               rect.left + rect.width / 2, rect.top + rect.height / 2);
+           return !target || (
+               target !== element && !element.contains(target));
+       };
+       var isNavigating = function(element) {
+           if (!lastEvent || lastEvent.defaultPrevented) { return false; }
+           var link = getLink(element);
+           if (link) {
+               var href = link.getAttribute('href');
+               var target = (link.getAttribute('target') || '').toLowerCase();
+               return href.charAt(0) !== '#' && target !== '_blank' &&
+                   href.toLowerCase().indexOf('javascript:') !== 0;
+           }
+           var tag = element.tagName.toLowerCase();
+           var type = (element.getAttribute('type') || '').toLowerCase();
+           return !!element.form && (
+               (tag === 'button' && (type === '' || type === 'submit')) ||
+               (tag === 'input' && (type === 'submit' || type === 'image')));
+       };
+       window.addEventListener('beforeunload', onUnload);
+       window.addEventListener('pagehide', onUnload);
+       window.addEventListener('click', onClick, true);
+       var navigating = false;
+       try {
+           for (var i = 0; i < elements.length; i++) {
+               if (limit > 0 && clickCount + failed.length >= limit) {
+                   break;
+               }
+               var element = elements[i];
+               if (!isVisible(element)) { continue; }
+               try {
+                   scrollIntoViewIfNeeded(element);
+                   if (checkObscured && isObscured(element)) {
+                       // (Covered by another element, such as an overlay)
+                       failed.push(i);
+                       continue;
+                   }
+                   lastEvent = null;
+                   element.click();
+                   clickCount++;
+               } catch (e) {
+                   failed.push(i);
+                   continue;
+               }
+               if (unloading || isNavigating(element)) {
+                   navigating = true;
+                   break;
+               }
+           }
+       } finally {
+           window.removeEventListener('beforeunload', onUnload);
+           window.removeEventListener('pagehide', onUnload);
+           window.removeEventListener('click', onClick, true);
+       }
+       return [clickCount, failed, navigating];""")
+
+
+def scroll_to_element_if_visible(driver, element):
+    """ Checks visibility, checks the viewport, and scrolls if needed,
+        all with a single script call. Returns True if the element is
+        visible. (Used to skip extra round trips before clicking.) """
+    return bool(driver.execute_script(SCROLL_IF_VISIBLE_SCRIPT, element))
+
+
+def find_visible_elements(driver, selector, is_xpath=False, limit=0,
+                          elements=None):
+    """ Returns the visible elements with a single script call.
+        If elements is None, matches come from the CSS Selector or XPath. """
+    if not limit or limit < 0:
+        limit = 0
+    return driver.execute_script(
+        FIND_VISIBLE_ELEMENTS_SCRIPT, selector, is_xpath, int(limit),
+        elements)
+
+
+def fill_form(driver, fields):
+    """ Fills in form fields with a single script call.
+        (See FILL_FORM_SCRIPT for the format of fields and the results.) """
+    return driver.execute_script(FILL_FORM_SCRIPT, fields)
+
+
+def get_failed_delayed_asserts(driver, checks):
+    """ Evaluates all the checks with a single script call.
+        (See DELAYED_ASSERT_BATCH_SCRIPT for the format of checks.)
+        Returns the indexes of the checks that failed. """
+    return driver.execute_script(DELAYED_ASSERT_BATCH_SCRIPT, checks)
+
+
+def get_page_timings(driver, max_largest=10, timeout=0):
+    """ Returns the page timings with a single script call.
+        (See PAGE_TIMINGS_SCRIPT for the format.) Returns None if the
+        browser doesn't support the Performance API.
+        "page_load" is None until the "load" event handlers have finished,
+        which can be after document.readyState is "complete". If so, this
+        polls for up to "timeout" seconds for the "load" event to finish. """
+    deadline = timing_helper.Deadline(timeout, "get_page_timings")
+    while True:
+        timings = driver.execute_script(PAGE_TIMINGS_SCRIPT, int(max_largest))
+        if not timings or timings["page_load"] is not None:
+            deadline.record()
+            return timings
+        if deadline.expired():
+            break
+        deadline.sleep(0.05)
+    deadline.record(timed_out=True)
+    return timings
+
+
+def click_visible_elements(driver, elements, limit=0, check_obscured=False):
+    """ Clicks the visible elements with a single script call.
+        Returns a tuple of: (click_count, [elements where the click failed],
+        navigating), where navigating is True if the last click may have
+        started loading a new page. (The script stops clicking if so.)
+        If check_obscured is True, elements that are covered by another
+        element at their center (such as an overlay) don't get clicked,
+        and get returned with the failed ones instead.
+        (The caller can use native clicks on the failed elements.) """
+    if not limit or limit < 0:
+        limit = 0
+    click_count, failed, navigating = driver.execute_script(
+        CLICK_VISIBLE_ELEMENTS_SCRIPT, elements, int(limit),
+        bool(check_obscured))
+    return (click_count, [elements[index] for index in failed], navigating)
 
 
 def scroll_to_element(driver, element):
@@ -610,36 +1088,56 @@ def scroll_to_element(driver, element):
         pass  # Older versions of Firefox experienced issues here
 
 
+# Scrolls the window (with ease-in-out timing) so that the element ends up
+# 130px below the top, then calls back with the distance that was scrolled.
+# If the element is already fully in the viewport, no scrolling happens.
+SLOW_SCROLL_SCRIPT = (
+    """var element = arguments[0];
+       var done = arguments[arguments.length - 1];
+       var rect = element.getBoundingClientRect();
+       var viewHeight = window.innerHeight ||
+                        document.documentElement.clientHeight;
+       if (rect.top >= 0 && rect.bottom <= viewHeight) {
+           done(0);
+           return;
+       }
+       var startY = window.pageYOffset;
+       var targetY = Math.max(0, Math.floor(rect.top + startY - 130));
+       var distance = targetY - startY;
+       var duration = Math.min(Math.max(Math.abs(distance) / 3, 100), 1000);
+       var nextFrame = function(f) { window.setTimeout(f, 16); };
+       if (window.requestAnimationFrame && !document.hidden) {
+           nextFrame = function(f) { window.requestAnimationFrame(f); };
+       }
+       var start = new Date().getTime();
+       var step = function() {
+           var t = Math.min((new Date().getTime() - start) / duration, 1);
+           var eased = t < 0.5 ? 4 * t * t * t :
+                       1 - Math.pow(-2 * t + 2, 3) / 2;
+           window.scrollTo(0, startY + distance * eased);
+           if (t < 1) {
+               nextFrame(step);
+           } else {
+               window.scrollTo(0, targetY);
+               done(distance);
+           }
+       };
+       nextFrame(step);""")
+
+
 def slow_scroll_to_element(driver, element, browser):
     if browser == 'ie':
         # IE breaks on slow-scrolling. Do a fast scroll instead.
         scroll_to_element(driver, element)
         return
-    scroll_position = driver.execute_script("return window.scrollY;")
-    element_location = None
     try:
-        element_location = element.location['y']
-    except Exception:
-        element.location_once_scrolled_into_view
+        driver.set_script_timeout(settings.SMALL_TIMEOUT)
+        distance = driver.execute_async_script(SLOW_SCROLL_SCRIPT, element)
+    except TimeoutException:
+        # The animation never finished (the browser may be throttling it).
+        scroll_to_element(driver, element)
         return
-    element_location = element_location - 130
-    if element_location < 0:
-        element_location = 0
-    distance = element_location - scroll_position
-    if distance != 0:
-        total_steps = int(abs(distance) / 50.0) + 2.0
-        step_value = float(distance) / total_steps
-        new_position = scroll_position
-        for y in range(int(total_steps)):
-            time.sleep(0.0114)
-            new_position += step_value
-            scroll_script = "window.scrollTo(0, %s);" % new_position
-            driver.execute_script(scroll_script)
-    time.sleep(0.01)
-    scroll_script = "window.scrollTo(0, %s);" % element_location
-    driver.execute_script(scroll_script)
-    time.sleep(0.01)
-    if distance > 430 or distance < -300:
+    if distance and (distance > 430 or distance < -300):
         # Add small recovery time for long-distance slow-scrolling
         time.sleep(0.162)
 
@@ -22,8 +22,8 @@ By.PARTIAL_LINK_TEXT
 import codecs
 import os
 import sys
-import time
 import traceback
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.remote.errorhandler import ElementNotVisibleException
@@ -32,6 +32,8 @@ from selenium.webdriver.remote.errorhandler import NoAlertPresentException
 from selenium.webdriver.remote.errorhandler import NoSuchFrameException
 from selenium.webdriver.remote.errorhandler import NoSuchWindowException
 from seleniumbase.config import settings
+from seleniumbase.core import timing_helper
+from seleniumbase.fixtures import js_utils
 
 
 def is_element_present(driver, selector, by=By.CSS_SELECTOR):
@@ -113,21 +115,21 @@ def hover_and_click(driver, hover_selector, click_selector,
     click_by - the method to search by (Default: By.CSS_SELECTOR)
     timeout - number of seconds to wait for click element to appear after hover
     """
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
+    deadline = timing_helper.Deadline(timeout, "hover_and_click")
     element = driver.find_element(by=hover_by, value=hover_selector)
     hover = ActionChains(driver).move_to_element(element)
     hover.perform()
-    for x in range(int(timeout * 10)):
+    while True:
         try:
             element = driver.find_element(by=click_by, value=click_selector)
             element.click()
+            deadline.record()
             return element
         except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     raise NoSuchElementException(
         "Element {%s} was not present after %s seconds!" %
         (click_selector, timeout))
@@ -139,20 +141,20 @@ def hover_element_and_click(driver, element, click_selector,
     """
     Similar to hover_and_click(), but assumes top element is already found.
     """
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
+    deadline = timing_helper.Deadline(timeout, "hover_element_and_click")
     hover = ActionChains(driver).move_to_element(element)
     hover.perform()
-    for x in range(int(timeout * 10)):
+    while True:
         try:
             element = driver.find_element(by=click_by, value=click_selector)
             element.click()
+            deadline.record()
             return element
         except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     raise NoSuchElementException(
         "Element {%s} was not present after %s seconds!" %
         (click_selector, timeout))
@@ -175,17 +177,17 @@ def wait_for_element_present(driver, selector, by=By.CSS_SELECTOR,
     """
 
     element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    deadline = timing_helper.Deadline(timeout, "wait_for_element_present")
+    while True:
         try:
             element = driver.find_element(by=by, value=selector)
+            deadline.record()
             return element
         except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     if not element:
         raise NoSuchElementException(
             "Element {%s} was not present after %s seconds!" % (
@@ -210,21 +212,21 @@ def wait_for_element_visible(driver, selector, by=By.CSS_SELECTOR,
     """
 
     element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    deadline = timing_helper.Deadline(timeout, "wait_for_element_visible")
+    while True:
         try:
             element = driver.find_element(by=by, value=selector)
             if element.is_displayed():
+                deadline.record()
                 return element
             else:
                 element = None
                 raise Exception()
         except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     plural = "s"
     if timeout == 1:
         plural = ""
@@ -256,21 +258,21 @@ def wait_for_text_visible(driver, text, selector, by=By.CSS_SELECTOR,
     """
 
     element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    deadline = timing_helper.Deadline(timeout, "wait_for_text_visible")
+    while True:
         try:
             element = driver.find_element(by=by, value=selector)
             if element.is_displayed() and text in element.text:
+                deadline.record()
                 return element
             else:
                 element = None
                 raise Exception()
         except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     plural = "s"
     if timeout == 1:
         plural = ""
@@ -299,21 +301,21 @@ def wait_for_exact_text_visible(driver, text, selector, by=By.CSS_SELECTOR,
     """
 
     element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    deadline = timing_helper.Deadline(timeout, "wait_for_exact_text_visible")
+    while True:
         try:
             element = driver.find_element(by=by, value=selector)
             if element.is_displayed() and text.strip() == element.text.strip():
+                deadline.record()
                 return element
             else:
                 element = None
                 raise Exception()
         except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     plural = "s"
     if timeout == 1:
         plural = ""
@@ -336,17 +338,17 @@ def wait_for_element_absent(driver, selector, by=By.CSS_SELECTOR,
     timeout - the time to wait for elements in seconds
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    deadline = timing_helper.Deadline(timeout, "wait_for_element_absent")
+    while True:
         try:
             driver.find_element(by=by, value=selector)
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
         except Exception:
+            deadline.record()
             return True
+    deadline.record(timed_out=True)
     plural = "s"
     if timeout == 1:
         plural = ""
@@ -367,20 +369,21 @@ def wait_for_element_not_visible(driver, selector, by=By.CSS_SELECTOR,
     timeout - the time to wait for the element in seconds
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    deadline = timing_helper.Deadline(timeout, "wait_for_element_not_visible")
+    while True:
         try:
             element = driver.find_element(by=by, value=selector)
             if element.is_displayed():
-                now_ms = time.time() * 1000.0
-                if now_ms >= stop_ms:
+                if deadline.expired():
                     break
-                time.sleep(0.1)
+                deadline.sleep(0.1)
             else:
+                deadline.record()
                 return True
         except Exception:
+            deadline.record()
             return True
+    deadline.record(timed_out=True)
     plural = "s"
     if timeout == 1:
         plural = ""
@@ -389,17 +392,37 @@ def wait_for_element_not_visible(driver, selector, by=By.CSS_SELECTOR,
             selector, timeout, plural))
 
 
-def find_visible_elements(driver, selector, by=By.CSS_SELECTOR):
+def find_visible_elements(driver, selector, by=By.CSS_SELECTOR, limit=0):
     """
     Finds all WebElements that match a selector and are visible.
     Similar to webdriver.find_elements.
+    Visibility is checked for all matches with a single script call.
+    (Instead of calling is_displayed() on each element separately.)
     @Params
     driver - the webdriver object (required)
     selector - the locator that is used to search the DOM (required)
     by - the method to search for the locator (Default: By.CSS_SELECTOR)
+    limit - if > 0, only return up to that many elements (Default: 0)
     """
+    if by == By.CSS_SELECTOR or by == By.XPATH:
+        # Find the elements in the browser, which means that only the
+        # visible elements (up to the limit) get sent back to WebDriver
+        try:
+            return js_utils.find_visible_elements(
+                driver, selector, is_xpath=(by == By.XPATH), limit=limit)
+        except WebDriverException:
+            pass  # Eg: Not valid for querySelectorAll(). Use WebDriver.
     elements = driver.find_elements(by=by, value=selector)
-    return [element for element in elements if element.is_displayed()]
+    if not elements:
+        return []
+    try:
+        return js_utils.find_visible_elements(
+            driver, None, limit=limit, elements=elements)
+    except WebDriverException:
+        v_elems = [element for element in elements if element.is_displayed()]
+        if limit and limit > 0 and len(v_elems) > limit:
+            v_elems = v_elems[:limit]
+        return v_elems
 
 
 def save_screenshot(driver, name, folder=None):
@@ -502,19 +525,19 @@ def wait_for_and_switch_to_alert(driver, timeout=settings.LARGE_TIMEOUT):
     timeout - the time to wait for the alert in seconds
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    deadline = timing_helper.Deadline(timeout, "wait_for_and_switch_to_alert")
+    while True:
         try:
             alert = driver.switch_to.alert
             # Raises exception if no alert present
             dummy_variable = alert.text  # noqa
+            deadline.record()
             return alert
         except NoAlertPresentException:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     raise Exception("Alert was not present after %s seconds!" % timeout)
 
 
@@ -528,17 +551,17 @@ def switch_to_frame(driver, frame, timeout=settings.SMALL_TIMEOUT):
     timeout - the time to wait for the alert in seconds
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
+    deadline = timing_helper.Deadline(timeout, "switch_to_frame")
+    while True:
         try:
             driver.switch_to.frame(frame)
+            deadline.record()
             return True
         except NoSuchFrameException:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
+            if deadline.expired():
                 break
-            time.sleep(0.1)
+            deadline.sleep(0.1)
+    deadline.record(timed_out=True)
     raise Exception("Frame was not present after %s seconds!" % timeout)
 
 
@@ -552,29 +575,30 @@ def switch_to_window(driver, window, timeout=settings.SMALL_TIMEOUT):
     timeout - the time to wait for the window in seconds
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
+    deadline = timing_helper.Deadline(timeout, "switch_to_window")
     if isinstance(window, int):
-        for x in range(int(timeout * 10)):
+        while True:
             try:
                 window_handle = driver.window_handles[window]
                 driver.switch_to.window(window_handle)
+                deadline.record()
                 return True
             except IndexError:
-                now_ms = time.time() * 1000.0
-                if now_ms >= stop_ms:
+                if deadline.expired():
                     break
-                time.sleep(0.1)
+                deadline.sleep(0.1)
+        deadline.record(timed_out=True)
         raise Exception("Window was not present after %s seconds!" % timeout)
     else:
         window_handle = window
-        for x in range(int(timeout * 10)):
+        while True:
             try:
                 driver.switch_to.window(window_handle)
+                deadline.record()
                 return True
             except NoSuchWindowException:
-                now_ms = time.time() * 1000.0
-                if now_ms >= stop_ms:
+                if deadline.expired():
                     break
-                time.sleep(0.1)
+                deadline.sleep(0.1)
+        deadline.record(timed_out=True)
         raise Exception("Window was not present after %s seconds!" % timeout)
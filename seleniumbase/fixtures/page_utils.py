@@ -3,7 +3,6 @@ This module contains useful utility methods.
 """
 import codecs
 import re
-import requests
 
 
 def get_domain_url(url):
@@ -180,6 +179,7 @@ def _get_link_status_code(link, allow_redirects=False, timeout=5):
         For a list of available status codes, see:
         https://en.wikipedia.org/wiki/List_of_HTTP_status_codes
     """
+    import requests
     status_code = None
     try:
         response = requests.get(
@@ -203,14 +203,11 @@ def _print_unique_links_with_status_codes(page_url, soup):
         print(link, " -> ", status_code)
 
 
-def _download_file_to(file_url, destination_folder, new_file_name=None):
-    if new_file_name:
-        file_name = new_file_name
-    else:
-        file_name = file_url.split('/')[-1]
-    r = requests.get(file_url)
-    with open(destination_folder + '/' + file_name, "wb") as code:
-        code.write(r.content)
+def _download_file_to(file_url, destination_folder, new_file_name=None,
+                      checksum=None):
+    from seleniumbase.core import download_helper
+    return download_helper.download_file(
+        file_url, destination_folder, new_file_name, checksum=checksum)
 
 
 def _save_data_as(data, destination_folder, file_name):
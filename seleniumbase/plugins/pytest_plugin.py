@@ -5,7 +5,11 @@ import optparse
 import pytest
 import sys
 from seleniumbase import config as sb_config
+from seleniumbase.core import capabilities_parser
+from seleniumbase.core import display_helper
 from seleniumbase.core import log_helper
+from seleniumbase.core import page_timing_helper
+from seleniumbase.core import profile_helper
 from seleniumbase.core import proxy_helper
 from seleniumbase.fixtures import constants
 
@@ -15,6 +19,7 @@ def pytest_addoption(parser):
     This parser plugin includes the following command-line options for pytest:
     --browser=BROWSER  (The web browser to use.)
     --cap_file=FILE  (The web browser's desired capabilities to use.)
+    --cap_name=NAME  (The named capability set of the cap_file to use.)
     --settings_file=FILE  (Overrides SeleniumBase settings.py values.)
     --env=ENV  (Set a test environment. Use "self.env" to use this in tests.)
     --data=DATA  (Extra data to pass to tests. Use "self.data" in tests.)
@@ -36,6 +41,7 @@ def pytest_addoption(parser):
     --message_duration=SECONDS  (The time length for Messenger alerts.)
     --check_js  (The option to check for JavaScript errors after page loads.)
     --ad_block  (The option to block some display ads after page loads.)
+    --block=TYPES  (Block resources: images,fonts,media,3p comma-separated.)
     --verify_delay=SECONDS  (The delay before MasterQA verification checks.)
     --disable_csp  (This disables the Content Security Policy of websites.)
     --enable_sync  (The option to enable "Chrome Sync".)
@@ -43,6 +49,8 @@ def pytest_addoption(parser):
     --save_screenshot  (The option to save a screenshot after each test.)
     --visual_baseline  (Set the visual baseline for Visual/Layout tests.)
     --timeout_multiplier=MULTIPLIER  (Multiplies the default timeout values.)
+    --sb_profile  (Profile WebDriver commands and save a Chrome trace file.)
+    --page_timings  (Record page timings to find the slowest pages & files.)
     """
     parser = parser.getgroup('SeleniumBase',
                              'SeleniumBase specific configuration options')
@@ -83,7 +91,14 @@ def pytest_addoption(parser):
                      dest='cap_file',
                      default=None,
                      help="""The file that stores browser desired capabilities
-                          for BrowserStack or Sauce Labs web drivers.""")
+                          for BrowserStack or Sauce Labs web drivers.
+                          (A Python, JSON, or YAML file.)""")
+    parser.addoption('--cap_name', '--cap-name',
+                     dest='cap_name',
+                     default=None,
+                     help="""The named capability set to use from the
+                          "capability_sets" of the cap_file.
+                          Default: None. (Only the top-level capabilities.)""")
     parser.addoption('--settings_file', '--settings-file', '--settings',
                      action='store',
                      dest='settings_file',
@@ -261,6 +276,16 @@ def pytest_addoption(parser):
                      default=False,
                      help="""Using this makes WebDriver block display ads
                           that are defined in ad_block_list.AD_BLOCK_LIST.""")
+    parser.addoption('--block',
+                     action='store',
+                     dest='block_resources',
+                     default=None,
+                     help="""Designates the resource types for the browser
+                          to block at the network level, so that they never
+                          get downloaded. (Defined in resource_block_list.py)
+                          Format: A comma-separated list from:
+                                  images, fonts, media, 3p
+                          Default: None.""")
     parser.addoption('--verify_delay', '--verify-delay',
                      action='store',
                      dest='verify_delay',
@@ -310,6 +335,25 @@ def pytest_addoption(parser):
                      help="""Setting this overrides the default timeout
                           by the multiplier when waiting for page elements.
                           Unused when tests overide the default value.""")
+    parser.addoption('--sb_profile', '--sb-profile',
+                     action='store_true',
+                     dest='sb_profile',
+                     default=False,
+                     help="""Using this records every WebDriver command
+                          with its latency, and the test and BaseCase method
+                          that called it. At the end of the session, a summary
+                          and a Chrome-trace-format JSON file get saved to the
+                          "profile_logs" folder, along with wait latency
+                          histograms.""")
+    parser.addoption('--page_timings', '--page-timings',
+                     action='store_true',
+                     dest='record_page_timings',
+                     default=False,
+                     help="""Using this records the page timings (from the
+                          browser's Performance API) after every open() call.
+                          At the end of the session, a summary of the slowest
+                          pages and the largest resources gets saved to the
+                          "profile_logs" folder.""")
 
 
 def pytest_configure(config):
@@ -335,6 +379,7 @@ def pytest_configure(config):
     sb_config.port = config.getoption('port')
     sb_config.proxy_string = config.getoption('proxy_string')
     sb_config.cap_file = config.getoption('cap_file')
+    sb_config.cap_name = config.getoption('cap_name')
     sb_config.settings_file = config.getoption('settings_file')
     sb_config.user_data_dir = config.getoption('user_data_dir')
     sb_config.database_env = config.getoption('database_env')
@@ -346,6 +391,7 @@ def pytest_configure(config):
     sb_config.message_duration = config.getoption('message_duration')
     sb_config.js_checking_on = config.getoption('js_checking_on')
     sb_config.ad_block_on = config.getoption('ad_block_on')
+    sb_config.block_resources = config.getoption('block_resources')
     sb_config.verify_delay = config.getoption('verify_delay')
     sb_config.disable_csp = config.getoption('disable_csp')
     sb_config.enable_sync = config.getoption('enable_sync')
@@ -353,6 +399,8 @@ def pytest_configure(config):
     sb_config.save_screenshot = config.getoption('save_screenshot')
     sb_config.visual_baseline = config.getoption('visual_baseline')
     sb_config.timeout_multiplier = config.getoption('timeout_multiplier')
+    sb_config.sb_profile = config.getoption('sb_profile')
+    sb_config.record_page_timings = config.getoption('record_page_timings')
     sb_config.pytest_html_report = config.getoption('htmlpath')  # --html=FILE
 
     if "linux" in sys.platform and (
@@ -364,6 +412,11 @@ def pytest_configure(config):
     if not sb_config.headless:
         sb_config.headed = True
 
+    if sb_config.cap_file:
+        # Parse and validate the capabilities file before any tests run
+        capabilities_parser.get_desired_capabilities(
+            sb_config.cap_file, sb_config.cap_name)
+
     if sb_config.with_testing_base:
         log_helper.log_folder_setup(sb_config.log_path, sb_config.archive_logs)
     proxy_helper.remove_proxy_zip_if_present()
@@ -372,6 +425,11 @@ def pytest_configure(config):
 def pytest_unconfigure():
     """ This runs after all tests have completed with pytest. """
     proxy_helper.remove_proxy_zip_if_present()
+    display_helper.stop_displays()
+    if sb_config.sb_profile:
+        profile_helper.save_report()
+    if sb_config.record_page_timings:
+        page_timing_helper.save_report()
 
 
 def pytest_runtest_setup():
@@ -382,7 +440,8 @@ def pytest_runtest_setup():
 def pytest_runtest_teardown(item):
     """ This runs after every test with pytest """
 
-    # Make sure webdriver has exited properly and any headless display
+    # Make sure webdriver has exited properly
+    # (Headless displays are reused across tests, until the session ends)
     try:
         self = item._testcase
         try:
@@ -390,13 +449,6 @@ def pytest_runtest_teardown(item):
                 self.driver.quit()
         except Exception:
             pass
-        try:
-            if hasattr(self, 'headless') and self.headless:
-                if self.headless_active:
-                    if hasattr(self, 'display') and self.display:
-                        self.display.stop()
-        except Exception:
-            pass
     except Exception:
         pass
 
@@ -5,7 +5,6 @@ The S3 Logging Plugin to upload all logs to the S3 bucket specifed.
 import uuid
 import logging
 import os
-from seleniumbase.core.s3_manager import S3LoggingBucket
 from nose.plugins import Plugin
 
 
@@ -22,6 +21,7 @@ class S3Logging(Plugin):
 
     def afterTest(self, test):
         """ After each testcase, upload logs to the S3 bucket. """
+        from seleniumbase.core.s3_manager import S3LoggingBucket
         s3_bucket = S3LoggingBucket()
         guid = str(uuid.uuid4().hex)
         path = "%s/%s" % (self.options.log_path,
@@ -3,6 +3,10 @@
 
 import sys
 from nose.plugins import Plugin
+from seleniumbase.core import capabilities_parser
+from seleniumbase.core import display_helper
+from seleniumbase.core import page_timing_helper
+from seleniumbase.core import profile_helper
 from seleniumbase.core import proxy_helper
 from seleniumbase.fixtures import constants
 
@@ -12,6 +16,7 @@ class SeleniumBrowser(Plugin):
     This parser plugin includes the following command-line options for Nose:
     --browser=BROWSER  (The web browser to use.)
     --cap_file=FILE  (The web browser's desired capabilities to use.)
+    --cap_name=NAME  (The named capability set of the cap_file to use.)
     --user_data_dir=DIR  (Set the Chrome user data directory to use.)
     --server=SERVER  (The server / IP address used by the tests.)
     --port=PORT  (The port that's used by the test server.)
@@ -28,6 +33,7 @@ class SeleniumBrowser(Plugin):
     --message_duration=SECONDS  (The time length for Messenger alerts.)
     --check_js  (The option to check for JavaScript errors after page loads.)
     --ad_block  (The option to block some display ads after page loads.)
+    --block=TYPES  (Block resources: images,fonts,media,3p comma-separated.)
     --verify_delay=SECONDS  (The delay before MasterQA verification checks.)
     --disable_csp  (This disables the Content Security Policy of websites.)
     --enable_sync  (The option to enable "Chrome Sync".)
@@ -35,6 +41,8 @@ class SeleniumBrowser(Plugin):
     --save_screenshot  (The option to save a screenshot after each test.)
     --visual_baseline  (Set the visual baseline for Visual/Layout tests.)
     --timeout_multiplier=MULTIPLIER  (Multiplies the default timeout values.)
+    --sb_profile  (Profile WebDriver commands and save a Chrome trace file.)
+    --page_timings  (Record page timings to find the slowest pages & files.)
     """
     name = 'selenium'  # Usage: --with-selenium
 
@@ -63,7 +71,16 @@ class SeleniumBrowser(Plugin):
             dest='cap_file',
             default=None,
             help="""The file that stores browser desired capabilities
-                    for BrowserStack or Sauce Labs web drivers.""")
+                    for BrowserStack or Sauce Labs web drivers.
+                    (A Python, JSON, or YAML file.)""")
+        parser.add_option(
+            '--cap_name', '--cap-name',
+            action='store',
+            dest='cap_name',
+            default=None,
+            help="""The named capability set to use from the
+                    "capability_sets" of the cap_file.
+                    Default: None. (Only the top-level capabilities.)""")
         parser.add_option(
             '--user_data_dir', '--user-data-dir',
             action='store',
@@ -189,6 +206,17 @@ class SeleniumBrowser(Plugin):
             default=False,
             help="""Using this makes WebDriver block display ads
                     that are defined in ad_block_list.AD_BLOCK_LIST.""")
+        parser.add_option(
+            '--block',
+            action='store',
+            dest='block_resources',
+            default=None,
+            help="""Designates the resource types for the browser
+                    to block at the network level, so that they never
+                    get downloaded. (Defined in resource_block_list.py)
+                    Format: A comma-separated list from:
+                            images, fonts, media, 3p
+                    Default: None.""")
         parser.add_option(
             '--verify_delay', '--verify-delay',
             action='store',
@@ -244,6 +272,27 @@ class SeleniumBrowser(Plugin):
             help="""Setting this overrides the default timeout
                     by the multiplier when waiting for page elements.
                     Unused when tests overide the default value.""")
+        parser.add_option(
+            '--sb_profile', '--sb-profile',
+            action='store_true',
+            dest='sb_profile',
+            default=False,
+            help="""Using this records every WebDriver command
+                    with its latency, and the test and BaseCase method
+                    that called it. At the end of the session, a summary
+                    and a Chrome-trace-format JSON file get saved to the
+                    "profile_logs" folder, along with wait latency
+                    histograms.""")
+        parser.add_option(
+            '--page_timings', '--page-timings',
+            action='store_true',
+            dest='record_page_timings',
+            default=False,
+            help="""Using this records the page timings (from the
+                    browser's Performance API) after every open() call.
+                    At the end of the session, a summary of the slowest
+                    pages and the largest resources gets saved to the
+                    "profile_logs" folder.""")
 
     def configure(self, options, conf):
         super(SeleniumBrowser, self).configure(options, conf)
@@ -251,10 +300,15 @@ class SeleniumBrowser(Plugin):
         self.options = options
         self.headless_active = False  # Default setting
         proxy_helper.remove_proxy_zip_if_present()
+        if options.cap_file:
+            # Parse and validate the capabilities file before any tests run
+            capabilities_parser.get_desired_capabilities(
+                options.cap_file, options.cap_name)
 
     def beforeTest(self, test):
         test.test.browser = self.options.browser
         test.test.cap_file = self.options.cap_file
+        test.test.cap_name = self.options.cap_name
         test.test.headless = self.options.headless
         test.test.headed = self.options.headed
         test.test.start_page = self.options.start_page
@@ -271,6 +325,7 @@ class SeleniumBrowser(Plugin):
         test.test.message_duration = self.options.message_duration
         test.test.js_checking_on = self.options.js_checking_on
         test.test.ad_block_on = self.options.ad_block_on
+        test.test.block_resources = self.options.block_resources
         test.test.verify_delay = self.options.verify_delay  # MasterQA
         test.test.disable_csp = self.options.disable_csp
         test.test.enable_sync = self.options.enable_sync
@@ -278,6 +333,8 @@ class SeleniumBrowser(Plugin):
         test.test.save_screenshot_after_test = self.options.save_screenshot
         test.test.visual_baseline = self.options.visual_baseline
         test.test.timeout_multiplier = self.options.timeout_multiplier
+        test.test.sb_profile = self.options.sb_profile
+        test.test.record_page_timings = self.options.record_page_timings
         test.test.use_grid = False
         if test.test.servername != "localhost":
             # Use Selenium Grid (Use --server=127.0.0.1 for localhost Grid)
@@ -294,10 +351,8 @@ class SeleniumBrowser(Plugin):
             test.test.headed = True
         if self.options.headless:
             try:
-                # from pyvirtualdisplay import Display  # Skip for own lib
-                from seleniumbase.virtual_display.display import Display
-                self.display = Display(visible=0, size=(1440, 1880))
-                self.display.start()
+                # (The virtual display is reused across tests)
+                self.display = display_helper.get_display()
                 self.headless_active = True
             except Exception:
                 # pyvirtualdisplay might not be necessary anymore because
@@ -310,6 +365,11 @@ class SeleniumBrowser(Plugin):
     def finalize(self, result):
         """ This runs after all tests have completed with nosetests. """
         proxy_helper.remove_proxy_zip_if_present()
+        display_helper.stop_displays()
+        if self.options.sb_profile:
+            profile_helper.save_report()
+        if self.options.record_page_timings:
+            page_timing_helper.save_report()
 
     def afterTest(self, test):
         try:
@@ -321,9 +381,5 @@ class SeleniumBrowser(Plugin):
             pass
         if self.options.headless:
             if self.headless_active:
-                try:
-                    self.display.stop()
-                except AttributeError:
-                    pass
-                except Exception:
-                    pass
+                # (The virtual display stays up for the next test)
+                self.display = None
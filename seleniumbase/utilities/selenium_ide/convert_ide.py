@@ -12,33 +12,535 @@ Usage:
 Output:
         [NEW_FILE_SB].py  (adds "_SB" to the original file name)
                           (the original file is kept intact)
+
+Batch Usage:
+        seleniumbase convert [FILES / DIRECTORIES / "GLOBS"] [--processes=N]
+Output:
+        A [NEW_FILE_SB].py for each file. (Files are converted in parallel.)
+        Directories are searched recursively for Python files.
+        A summary of converted & unconverted lines of each file is printed,
+        and saved to "convert_report.txt" in the current folder.
 """
 
 import codecs
+import glob
+import multiprocessing
+import os
 import re
 import sys
+from seleniumbase.core import timing_helper
 from seleniumbase.fixtures import js_utils
 
+EXPECTED_ARG = ("[A PYTHON_WEBDRIVER_UNITTEST_FILE exported from a "
+                "Katalon/Selenium-IDE recording].py")
+BATCH_REPORT_FILE = "convert_report.txt"
+
+# Patterns are compiled once, rather than for every line of every file
+UTF8_CODING_PATTERN = re.compile(
+    r'^\s*# -\*- coding: utf-8 -\*-\s*$')
+BASECASE_CLASS_PATTERN = re.compile(
+    r'^class\s\S+\(BaseCase\):\s*$')
+UNITTEST_CLASS_PATTERN = re.compile(
+    r'^class\s\S+\(unittest\.TestCase\):\s*$')
+BASE_URL_PATTERN = re.compile(
+    r'^\s*self.base_url = "(\S+)"\s*$')
+METHOD_DEF_PATTERN = re.compile(
+    r'^\s*def\s(\S+)\(self[,\s\S]*\):\s*$')
+DRIVER_ASSIGNMENT_PATTERN = re.compile(
+    r'^\s*driver = self.driver\s*$')
+OPEN_BASE_URL_PATTERN = re.compile(
+    r'^(\s*)driver\.get\((self\.base_url \+ \"/\S*\")\)\s*$')
+OPEN_URL_PATTERN = re.compile(
+    r'^(\s*)driver\.get\(\"(\S*)\"\)\s*$')
+ID_CLICK_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_id\(\"(\S+)\"\)'''
+    r'''\.click\(\)\s*$''')
+ID_SUBMIT_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_id\(\"(\S+)\"\)'''
+    r'''\.submit\(\)\s*$''')
+ID_SEND_KEYS_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_id\(\"(\S+)\"\)'''
+    r'''\.send_keys\(\"([\S\s]+)\"\)\s*$''')
+ID_SEND_KEY_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_id\(\"(\S+)\"\)'''
+    r'''\.send_keys\(Keys\.([\S]+)\)\s*$''')
+NAME_CLICK_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_name\(\"(\S+)\"\)'''
+    r'''\.click\(\)\s*$''')
+NAME_SUBMIT_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_name\(\"(\S+)\"\)'''
+    r'''\.submit\(\)\s*$''')
+NAME_SEND_KEYS_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_name\(\"(\S+)\"\)'''
+    r'''\.send_keys\(\"([\S\s]+)\"\)\s*$''')
+NAME_SEND_KEY_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_name\(\"(\S+)\"\)'''
+    r'''\.send_keys\(Keys\.([\S]+)\)\s*$''')
+CSS_CLICK_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_css_selector\(\"([\S\s]+)\"\)'''
+    r'''\.click\(\)\s*$''')
+CSS_SUBMIT_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_css_selector\(\"([\S\s]+)\"\)'''
+    r'''\.submit\(\)\s*$''')
+CSS_SEND_KEYS_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_css_selector\(\"([\S\s]+)\"\)'''
+    r'''\.send_keys\(\"([\S\s]+)\"\)\s*$''')
+CSS_SEND_KEY_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_css_selector\(\"([\S\s]+)\"\)'''
+    r'''\.send_keys\(Keys\.([\S]+)\)\s*$''')
+XPATH_SEND_KEYS_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_xpath\(\"([\S\s]+)\"\)'''
+    r'''\.send_keys\(\"([\S\s]+)\"\)\s*$''')
+XPATH_SEND_KEY_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_xpath\(\"([\S\s]+)\"\)'''
+    r'''\.send_keys\(Keys\.([\S]+)\)\s*$''')
+CSS_SELECT_TEXT_PATTERN = re.compile(
+    r'''^(\s*)Select\(driver\.find_element_by_css_selector\('''
+    r'''\"([\S\s]+)\"\)\)\.select_by_visible_text\('''
+    r'''\"([\S\s]+)\"\)\s*$''')
+ID_SELECT_TEXT_PATTERN = re.compile(
+    r'''^(\s*)Select\(driver\.find_element_by_id\('''
+    r'''\"([\S\s]+)\"\)\)\.select_by_visible_text\('''
+    r'''\"([\S\s]+)\"\)\s*$''')
+XPATH_SELECT_TEXT_PATTERN = re.compile(
+    r'''^(\s*)Select\(driver\.find_element_by_xpath\('''
+    r'''\"([\S\s]+)\"\)\)\.select_by_visible_text\('''
+    r'''\"([\S\s]+)\"\)\s*$''')
+NAME_SELECT_TEXT_PATTERN = re.compile(
+    r'''^(\s*)Select\(driver\.find_element_by_name\('''
+    r'''\"([\S\s]+)\"\)\)\.select_by_visible_text\('''
+    r'''\"([\S\s]+)\"\)\s*$''')
+XPATH_CLICK_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_xpath\(u?\"([\S\s]+)\"\)'''
+    r'''\.click\(\)\s*$''')
+XPATH_SUBMIT_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_xpath\(u?\"([\S\s]+)\"\)'''
+    r'''\.submit\(\)\s*$''')
+LINK_TEXT_CLICK_PATTERN = re.compile(
+    r'''^(\s*)driver\.find_element_by_link_text\(u?\"([\S\s]+)\"\)'''
+    r'''\.click\(\)\s*$''')
+IS_LINK_TEXT_PRESENT_PATTERN = re.compile(
+    r'''^(\s*)([\S\s]*)self\.is_element_present\(By.LINK_TEXT, '''
+    r'''u?\"([\S\s]+)\"\)([\S\s]*)$''')
+IS_NAME_PRESENT_PATTERN = re.compile(
+    r'''^(\s*)([\S\s]*)self\.is_element_present\(By.NAME, '''
+    r'''u?\"([\S\s]+)\"\)([\S\s]*)$''')
+IS_ID_PRESENT_PATTERN = re.compile(
+    r'''^(\s*)([\S\s]*)self\.is_element_present\(By.ID, '''
+    r'''u?\"([\S\s]+)\"\)([\S\s]*)$''')
+IS_CLASS_PRESENT_PATTERN = re.compile(
+    r'''^(\s*)([\S\s]*)self\.is_element_present\(By.CLASS, '''
+    r'''u?\"([\S\s]+)\"\)([\S\s]*)$''')
+IS_CSS_PRESENT_PATTERN = re.compile(
+    r'''^(\s*)([\S\s]*)self\.is_element_present\(By.CSS_SELECTOR, '''
+    r'''u?\"([\S\s]+)\"\)([\S\s]*)$''')
+IS_XPATH_PRESENT_PATTERN = re.compile(
+    r'''^(\s*)([\S\s]*)self\.is_element_present\(By.XPATH, '''
+    r'''u?\"([\S\s]+)\"\)([\S\s]*)$''')
+WAIT_LOOP_START_PATTERN = re.compile(
+    r'^(\s*)for i in range\(60\):\s*$')
+WAIT_LOOP_END_PATTERN = re.compile(
+    r'^(\s*)else: self.fail\("time out"\)\s*$')
+WAIT_LOOP_ELEMENT_PATTERN = re.compile(
+    r'''^\s*if self.is_element_present\("([\S\s]+)"\)'''
+    r''': break\s*$''')
+WAIT_LOOP_ELEMENT_SQ_PATTERN = re.compile(
+    r'''^\s*if self.is_element_present\('([\S\s]+)'\)'''
+    r''': break\s*$''')
+WAIT_LOOP_LINK_TEXT_PATTERN = re.compile(
+    r'''^\s*if self.is_link_text_present'''
+    r'''\("([\S\s]+)"\): break\s*$''')
+WAIT_FOR_ELEMENT_PATTERN = re.compile(
+    r'''^\s*self.wait_for_element'''
+    r'''\((["|'])([\S\s]+)(["|'])\)'''
+    r'''\s*$''')
+WAIT_FOR_LINK_TEXT_PATTERN = re.compile(
+    r'''^\s*self.wait_for_link_text'''
+    r'''\((["|'])([\S\s]+)(["|'])\)'''
+    r'''\s*$''')
+
+
+def _convert_driver_line(line, ide_base_url):
+    """ Returns (command, uses_keys, has_unicode) for a line of WebDriver
+        code that has a SeleniumBase equivalent. Otherwise returns None. """
+    uses_keys = False
+    has_unicode = False
+
+    # Handle page loads
+    data = OPEN_BASE_URL_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        url = data.group(2)
+        url = url.replace("self.base_url", '"%s"' % ide_base_url)
+        if '/" + "/' in url:
+            url = url.replace('/" + "/', '/')
+        if "/' + '/" in url:
+            url = url.replace("/' + '/", "/")
+        command = '''%sself.open(%s)''' % (whitespace, url)
+        return command, uses_keys, has_unicode
+
+    # Handle more page loads
+    data = OPEN_URL_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        url = data.group(2)
+        command = '''%sself.open('%s')''' % (whitespace, url)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_id() + .click()
+    data = ID_CLICK_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '#%s' % data.group(2).replace('#', '\\#')
+        selector = selector.replace('[', '\\[').replace(']', '\\]')
+        selector = selector.replace('.', '\\.')
+        raw = ""
+        if "\\[" in selector or "\\]" in selector or "\\." in selector:
+            raw = "r"
+        command = '''%sself.click(%s'%s')''' % (whitespace, raw, selector)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_id() + .submit()
+    data = ID_SUBMIT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '#%s' % data.group(2).replace('#', '\\#')
+        selector = selector.replace('[', '\\[').replace(']', '\\]')
+        selector = selector.replace('.', '\\.')
+        raw = ""
+        if "\\[" in selector or "\\]" in selector or "\\." in selector:
+            raw = "r"
+        command = '''%sself.submit(%s'%s')''' % (whitespace, raw, selector)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_id() + .send_keys()
+    data = ID_SEND_KEYS_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '#%s' % data.group(2).replace('#', '\\#')
+        selector = selector.replace('[', '\\[').replace(']', '\\]')
+        selector = selector.replace('.', '\\.')
+        raw = ""
+        if "\\[" in selector or "\\]" in selector or "\\." in selector:
+            raw = "r"
+        text = data.group(3)
+        command = '''%sself.update_text(%s'%s', '%s')''' % (
+            whitespace, raw, selector, text)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_id() + .send_keys(Keys.<KEY>)
+    data = ID_SEND_KEY_PATTERN.match(line)
+    if data:
+        uses_keys = True
+        whitespace = data.group(1)
+        selector = '#%s' % data.group(2).replace('#', '\\#')
+        selector = selector.replace('[', '\\[').replace(']', '\\]')
+        selector = selector.replace('.', '\\.')
+        raw = ""
+        if "\\[" in selector or "\\]" in selector or "\\." in selector:
+            raw = "r"
+        key = 'Keys.%s' % data.group(3)
+        command = '''%sself.send_keys(%s'%s', %s)''' % (
+            whitespace, raw, selector, key)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_name() + .click()
+    data = NAME_CLICK_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '[name="%s"]' % data.group(2)
+        command = '''%sself.click('%s')''' % (whitespace, selector)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_name() + .submit()
+    data = NAME_SUBMIT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '[name="%s"]' % data.group(2)
+        command = '''%sself.submit('%s')''' % (whitespace, selector)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_name() + .send_keys()
+    data = NAME_SEND_KEYS_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '[name="%s"]' % data.group(2)
+        text = data.group(3)
+        command = '''%sself.update_text('%s', '%s')''' % (
+            whitespace, selector, text)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_name() + .send_keys(Keys.<KEY>)
+    data = NAME_SEND_KEY_PATTERN.match(line)
+    if data:
+        uses_keys = True
+        whitespace = data.group(1)
+        selector = '[name="%s"]' % data.group(2)
+        key = 'Keys.%s' % data.group(3)
+        command = '''%sself.send_keys('%s', %s)''' % (
+            whitespace, selector, key)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_css_selector() + .click()
+    data = CSS_CLICK_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '%s' % data.group(2)
+        command = '''%sself.click('%s')''' % (whitespace, selector)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_css_selector() + .submit()
+    data = CSS_SUBMIT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '%s' % data.group(2)
+        command = '''%sself.submit('%s')''' % (whitespace, selector)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_css_selector() + .send_keys()
+    data = CSS_SEND_KEYS_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '%s' % data.group(2)
+        text = data.group(3)
+        command = '''%sself.update_text('%s', '%s')''' % (
+            whitespace, selector, text)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_css_selector() + .send_keys(Keys.<KEY>)
+    data = CSS_SEND_KEY_PATTERN.match(line)
+    if data:
+        uses_keys = True
+        whitespace = data.group(1)
+        selector = '%s' % data.group(2)
+        key = 'Keys.%s' % data.group(3)
+        command = '''%sself.send_keys('%s', %s)''' % (
+            whitespace, selector, key)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_xpath() + .send_keys()
+    data = XPATH_SEND_KEYS_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '%s' % data.group(2)
+        text = data.group(3)
+        command = '''%sself.update_text("%s", '%s')''' % (
+            whitespace, selector, text)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_xpath() + .send_keys(Keys.<KEY>)
+    data = XPATH_SEND_KEY_PATTERN.match(line)
+    if data:
+        uses_keys = True
+        whitespace = data.group(1)
+        selector = '%s' % data.group(2)
+        key = 'Keys.%s' % data.group(3)
+        command = '''%sself.send_keys("%s", %s)''' % (
+            whitespace, selector, key)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle Select / by_css_selector() / select_by_visible_text()
+    data = CSS_SELECT_TEXT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '%s' % data.group(2)
+        visible_text = '%s' % data.group(3)
+        command = '''%sself.select_option_by_text('%s', '%s')''' % (
+            whitespace, selector, visible_text)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle Select / by_id() / select_by_visible_text()
+    data = ID_SELECT_TEXT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '#%s' % data.group(2).replace('#', '\\#')
+        selector = selector.replace('[', '\\[').replace(']', '\\]')
+        selector = selector.replace('.', '\\.')
+        raw = ""
+        if "\\[" in selector or "\\]" in selector or "\\." in selector:
+            raw = "r"
+        visible_text = '%s' % data.group(3)
+        command = '''%sself.select_option_by_text(%s'%s', '%s')''' % (
+            whitespace, raw, selector, visible_text)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle Select / by_xpath() / select_by_visible_text()
+    data = XPATH_SELECT_TEXT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '%s' % data.group(2)
+        visible_text = '%s' % data.group(3)
+        command = '''%sself.select_option_by_text("%s", '%s')''' % (
+            whitespace, selector, visible_text)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle Select / by_name() / select_by_visible_text()
+    data = NAME_SELECT_TEXT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        selector = '[name="%s"]' % data.group(2)
+        visible_text = '%s' % data.group(3)
+        command = '''%sself.select_option_by_text('%s', '%s')''' % (
+            whitespace, selector, visible_text)
+        if command.count('\\"') == command.count('"'):
+            command = command.replace('\\"', '"')
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_xpath() + .click()
+    data = XPATH_CLICK_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        xpath = '%s' % data.group(2)
+        uni = ""
+        if '(u"' in line:
+            uni = "u"
+            has_unicode = True
+        command = '''%sself.click(%s"%s")''' % (
+            whitespace, uni, xpath)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_xpath() + .submit()
+    data = XPATH_SUBMIT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        xpath = '%s' % data.group(2)
+        uni = ""
+        if '(u"' in line:
+            uni = "u"
+            has_unicode = True
+        command = '''%sself.submit(%s"%s")''' % (
+            whitespace, uni, xpath)
+        return command, uses_keys, has_unicode
+
+    # Handle .find_element_by_link_text() + .click()
+    data = LINK_TEXT_CLICK_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        link_text = '''%s''' % data.group(2)
+        uni = ""
+        if '(u"' in line:
+            uni = "u"
+            has_unicode = True
+        command = '''%sself.click(%s"link=%s")''' % (
+            whitespace, uni, link_text)
+        return command, uses_keys, has_unicode
+
+    # Handle self.is_element_present(By.LINK_TEXT, *)
+    data = IS_LINK_TEXT_PRESENT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        pre = data.group(2)
+        link_text = '''%s''' % data.group(3)
+        post = data.group(4)
+        uni = ""
+        if '(u"' in line:
+            uni = "u"
+            has_unicode = True
+        command = '''%s%sself.is_link_text_present(%s"%s")%s''' % (
+            whitespace, pre, uni, link_text, post)
+        return command, uses_keys, has_unicode
+
+    # Handle self.is_element_present(By.NAME, *)
+    data = IS_NAME_PRESENT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        pre = data.group(2)
+        name = '''%s''' % data.group(3)
+        post = data.group(4)
+        uni = ""
+        if '(u"' in line:
+            uni = "u"
+            has_unicode = True
+        command = '''%s%sself.is_element_present('[name="%s"]')%s''' % (
+            whitespace, pre, name, post)
+        return command, uses_keys, has_unicode
+
+    # Handle self.is_element_present(By.ID, *)
+    data = IS_ID_PRESENT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        pre = data.group(2)
+        the_id = '''%s''' % data.group(3)
+        post = data.group(4)
+        uni = ""
+        if '(u"' in line:
+            uni = "u"
+            has_unicode = True
+        command = '''%s%sself.is_element_present("#%s")%s''' % (
+            whitespace, pre, the_id, post)
+        return command, uses_keys, has_unicode
+
+    # Handle self.is_element_present(By.CLASS, *)
+    data = IS_CLASS_PRESENT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        pre = data.group(2)
+        the_class = '''%s''' % data.group(3)
+        post = data.group(4)
+        uni = ""
+        if '(u"' in line:
+            uni = "u"
+            has_unicode = True
+        command = '''%s%sself.is_element_present(".%s")%s''' % (
+            whitespace, pre, the_class, post)
+        return command, uses_keys, has_unicode
+
+    # Handle self.is_element_present(By.CSS_SELECTOR, *)
+    data = IS_CSS_PRESENT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        pre = data.group(2)
+        selector = '''%s''' % data.group(3)
+        post = data.group(4)
+        uni = ""
+        if '(u"' in line:
+            uni = "u"
+            has_unicode = True
+        command = '''%s%sself.is_element_present("%s")%s''' % (
+            whitespace, pre, selector, post)
+        return command, uses_keys, has_unicode
+
+    # Handle self.is_element_present(By.XPATH, *)
+    data = IS_XPATH_PRESENT_PATTERN.match(line)
+    if data:
+        whitespace = data.group(1)
+        pre = data.group(2)
+        xpath = '''%s''' % data.group(3)
+        post = data.group(4)
+        uni = ""
+        if '(u"' in line:
+            uni = "u"
+            has_unicode = True
+        command = '''%s%sself.is_element_present("%s")%s''' % (
+            whitespace, pre, xpath, post)
+        return command, uses_keys, has_unicode
+
+    return None
 
-def main():
-    expected_arg = ("[A PYTHON_WEBDRIVER_UNITTEST_FILE exported from a "
-                    "Katalon/Selenium-IDE recording].py")
-    num_args = len(sys.argv)
-    if sys.argv[0].split('/')[-1] == "seleniumbase" or (
-            sys.argv[0].split('\\')[-1] == "seleniumbase"):
-        if num_args < 3 or num_args > 3:
-            raise Exception('\n\n* INVALID RUN COMMAND! *  Usage:\n'
-                            '"seleniumbase convert %s"\n' % expected_arg)
-    else:
-        if num_args < 2 or num_args > 2:
-            raise Exception('\n\n* INVALID RUN COMMAND! *  Usage:\n'
-                            '"python convert_ide.py %s"\n' % expected_arg)
-    webdriver_python_file = sys.argv[num_args - 1]
-    if not webdriver_python_file.endswith('.py'):
-        raise Exception("\n\n`%s` is not a Python file!\n\n"
-                        "Expecting: %s\n"
-                        % (webdriver_python_file, expected_arg))
 
+def convert_code(all_code):
+    """ Converts the code of a Python WebDriver unittest file.
+        Returns (seleniumbase_code, converted_count, unconverted_lines),
+        where unconverted_lines is a list of (line_number, line) for lines
+        of test methods that were kept without SeleniumBase conversions. """
     seleniumbase_lines = []
     seleniumbase_lines.append("from seleniumbase import BaseCase")
     seleniumbase_lines.append("")  # Flake8 is very specific on whitespace
@@ -46,49 +548,43 @@ def main():
 
     ide_base_url = ""
     in_test_method = False
+    in_wait_loop = False
     has_unicode = False
     uses_keys = False
     uses_select = False
+    converted_count = 0
+    unconverted_lines = []
 
-    f = open(webdriver_python_file, 'r')
-    all_code = f.read()
-    f.close()
-    if "def test_" not in all_code:
-        raise Exception("\n\n`%s` is not a valid Python unittest.TestCase "
-                        "file!\n\nExpecting: %s\n\n"
-                        "Did you properly export your Katalon/Selenium-IDE "
-                        "recording as a Python WebDriver unittest file?\n"
-                        % (webdriver_python_file, expected_arg))
     code_lines = all_code.split('\n')
-    for line in code_lines:
+    for line_number, line in enumerate(code_lines, 1):
 
         # Handle utf-8 encoding if present
-        data = re.findall(r'^\s*# -\*- coding: utf-8 -\*-\s*$', line)
+        data = UTF8_CODING_PATTERN.findall(line)
         if data:
             has_unicode = True
             continue
 
         # Keep SeleniumBase classes if already used in the test script
-        data = re.findall(r'^class\s\S+\(BaseCase\):\s*$', line)
+        data = BASECASE_CLASS_PATTERN.findall(line)
         if data:
             seleniumbase_lines.append(line)
             continue
 
         # Have unittest.TestCase classes inherit BaseCase instead
-        data = re.findall(r'^class\s\S+\(unittest\.TestCase\):\s*$', line)
+        data = UNITTEST_CLASS_PATTERN.findall(line)
         if data:
             data = data[0].replace("unittest.TestCase", "BaseCase")
             seleniumbase_lines.append(data)
             continue
 
         # Get base_url if defined
-        data = re.match(r'^\s*self.base_url = "(\S+)"\s*$', line)
+        data = BASE_URL_PATTERN.match(line)
         if data:
             ide_base_url = data.group(1)
             continue
 
         # Handle method definitions
-        data = re.match(r'^\s*def\s(\S+)\(self[,\s\S]*\):\s*$', line)
+        data = METHOD_DEF_PATTERN.match(line)
         if data:
             method_name = data.group(1)
             if method_name.startswith('test_'):
@@ -113,468 +609,25 @@ def main():
 
         # If .clear(), skip because .update_text() already does this
         if line.strip().endswith(".clear()"):
+            converted_count += 1
             continue
 
         # Skip edge case
-        data = re.findall(r'^\s*driver = self.driver\s*$', line)
-        if data:
-            continue
-
-        # Handle page loads
-        data = re.match(
-            r'^(\s*)driver\.get\((self\.base_url \+ \"/\S*\")\)\s*$', line)
-        if data:
-            whitespace = data.group(1)
-            url = data.group(2)
-            url = url.replace("self.base_url", '"%s"' % ide_base_url)
-            if '/" + "/' in url:
-                url = url.replace('/" + "/', '/')
-            if "/' + '/" in url:
-                url = url.replace("/' + '/", "/")
-            command = '''%sself.open(%s)''' % (whitespace, url)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle more page loads
-        data = re.match(
-            r'^(\s*)driver\.get\(\"(\S*)\"\)\s*$', line)
-        if data:
-            whitespace = data.group(1)
-            url = data.group(2)
-            command = '''%sself.open('%s')''' % (whitespace, url)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_id() + .click()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_id\(\"(\S+)\"\)'''
-            r'''\.click\(\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '#%s' % data.group(2).replace('#', '\\#')
-            selector = selector.replace('[', '\\[').replace(']', '\\]')
-            selector = selector.replace('.', '\\.')
-            raw = ""
-            if "\\[" in selector or "\\]" in selector or "\\." in selector:
-                raw = "r"
-            command = '''%sself.click(%s'%s')''' % (whitespace, raw, selector)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_id() + .submit()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_id\(\"(\S+)\"\)'''
-            r'''\.submit\(\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '#%s' % data.group(2).replace('#', '\\#')
-            selector = selector.replace('[', '\\[').replace(']', '\\]')
-            selector = selector.replace('.', '\\.')
-            raw = ""
-            if "\\[" in selector or "\\]" in selector or "\\." in selector:
-                raw = "r"
-            command = '''%sself.submit(%s'%s')''' % (whitespace, raw, selector)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_id() + .send_keys()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_id\(\"(\S+)\"\)'''
-            r'''\.send_keys\(\"([\S\s]+)\"\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '#%s' % data.group(2).replace('#', '\\#')
-            selector = selector.replace('[', '\\[').replace(']', '\\]')
-            selector = selector.replace('.', '\\.')
-            raw = ""
-            if "\\[" in selector or "\\]" in selector or "\\." in selector:
-                raw = "r"
-            text = data.group(3)
-            command = '''%sself.update_text(%s'%s', '%s')''' % (
-                whitespace, raw, selector, text)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_id() + .send_keys(Keys.<KEY>)
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_id\(\"(\S+)\"\)'''
-            r'''\.send_keys\(Keys\.([\S]+)\)\s*$''', line)
-        if data:
-            uses_keys = True
-            whitespace = data.group(1)
-            selector = '#%s' % data.group(2).replace('#', '\\#')
-            selector = selector.replace('[', '\\[').replace(']', '\\]')
-            selector = selector.replace('.', '\\.')
-            raw = ""
-            if "\\[" in selector or "\\]" in selector or "\\." in selector:
-                raw = "r"
-            key = 'Keys.%s' % data.group(3)
-            command = '''%sself.send_keys(%s'%s', %s)''' % (
-                whitespace, raw, selector, key)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_name() + .click()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_name\(\"(\S+)\"\)'''
-            r'''\.click\(\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '[name="%s"]' % data.group(2)
-            command = '''%sself.click('%s')''' % (whitespace, selector)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_name() + .submit()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_name\(\"(\S+)\"\)'''
-            r'''\.submit\(\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '[name="%s"]' % data.group(2)
-            command = '''%sself.submit('%s')''' % (whitespace, selector)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_name() + .send_keys()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_name\(\"(\S+)\"\)'''
-            r'''\.send_keys\(\"([\S\s]+)\"\)\s*$''', line)
+        data = DRIVER_ASSIGNMENT_PATTERN.findall(line)
         if data:
-            whitespace = data.group(1)
-            selector = '[name="%s"]' % data.group(2)
-            text = data.group(3)
-            command = '''%sself.update_text('%s', '%s')''' % (
-                whitespace, selector, text)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_name() + .send_keys(Keys.<KEY>)
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_name\(\"(\S+)\"\)'''
-            r'''\.send_keys\(Keys\.([\S]+)\)\s*$''', line)
-        if data:
-            uses_keys = True
-            whitespace = data.group(1)
-            selector = '[name="%s"]' % data.group(2)
-            key = 'Keys.%s' % data.group(3)
-            command = '''%sself.send_keys('%s', %s)''' % (
-                whitespace, selector, key)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_css_selector() + .click()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_css_selector\(\"([\S\s]+)\"\)'''
-            r'''\.click\(\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            command = '''%sself.click('%s')''' % (whitespace, selector)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_css_selector() + .submit()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_css_selector\(\"([\S\s]+)\"\)'''
-            r'''\.submit\(\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            command = '''%sself.submit('%s')''' % (whitespace, selector)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_css_selector() + .send_keys()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_css_selector\(\"([\S\s]+)\"\)'''
-            r'''\.send_keys\(\"([\S\s]+)\"\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            text = data.group(3)
-            command = '''%sself.update_text('%s', '%s')''' % (
-                whitespace, selector, text)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_css_selector() + .send_keys(Keys.<KEY>)
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_css_selector\(\"([\S\s]+)\"\)'''
-            r'''\.send_keys\(Keys\.([\S]+)\)\s*$''', line)
-        if data:
-            uses_keys = True
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            key = 'Keys.%s' % data.group(3)
-            command = '''%sself.send_keys('%s', %s)''' % (
-                whitespace, selector, key)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
+            converted_count += 1
             continue
 
-        # Handle .find_element_by_xpath() + .send_keys()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_xpath\(\"([\S\s]+)\"\)'''
-            r'''\.send_keys\(\"([\S\s]+)\"\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            text = data.group(3)
-            command = '''%sself.update_text("%s", '%s')''' % (
-                whitespace, selector, text)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_xpath() + .send_keys(Keys.<KEY>)
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_xpath\(\"([\S\s]+)\"\)'''
-            r'''\.send_keys\(Keys\.([\S]+)\)\s*$''', line)
-        if data:
-            uses_keys = True
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            key = 'Keys.%s' % data.group(3)
-            command = '''%sself.send_keys("%s", %s)''' % (
-                whitespace, selector, key)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle Select / by_css_selector() / select_by_visible_text()
-        data = re.match(
-            r'''^(\s*)Select\(driver\.find_element_by_css_selector\('''
-            r'''\"([\S\s]+)\"\)\)\.select_by_visible_text\('''
-            r'''\"([\S\s]+)\"\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            visible_text = '%s' % data.group(3)
-            command = '''%sself.select_option_by_text('%s', '%s')''' % (
-                whitespace, selector, visible_text)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle Select / by_id() / select_by_visible_text()
-        data = re.match(
-            r'''^(\s*)Select\(driver\.find_element_by_id\('''
-            r'''\"([\S\s]+)\"\)\)\.select_by_visible_text\('''
-            r'''\"([\S\s]+)\"\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '#%s' % data.group(2).replace('#', '\\#')
-            selector = selector.replace('[', '\\[').replace(']', '\\]')
-            selector = selector.replace('.', '\\.')
-            raw = ""
-            if "\\[" in selector or "\\]" in selector or "\\." in selector:
-                raw = "r"
-            visible_text = '%s' % data.group(3)
-            command = '''%sself.select_option_by_text(%s'%s', '%s')''' % (
-                whitespace, raw, selector, visible_text)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle Select / by_xpath() / select_by_visible_text()
-        data = re.match(
-            r'''^(\s*)Select\(driver\.find_element_by_xpath\('''
-            r'''\"([\S\s]+)\"\)\)\.select_by_visible_text\('''
-            r'''\"([\S\s]+)\"\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            visible_text = '%s' % data.group(3)
-            command = '''%sself.select_option_by_text("%s", '%s')''' % (
-                whitespace, selector, visible_text)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle Select / by_name() / select_by_visible_text()
-        data = re.match(
-            r'''^(\s*)Select\(driver\.find_element_by_name\('''
-            r'''\"([\S\s]+)\"\)\)\.select_by_visible_text\('''
-            r'''\"([\S\s]+)\"\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '[name="%s"]' % data.group(2)
-            visible_text = '%s' % data.group(3)
-            command = '''%sself.select_option_by_text('%s', '%s')''' % (
-                whitespace, selector, visible_text)
-            if command.count('\\"') == command.count('"'):
-                command = command.replace('\\"', '"')
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_xpath() + .click()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_xpath\(u?\"([\S\s]+)\"\)'''
-            r'''\.click\(\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            xpath = '%s' % data.group(2)
-            uni = ""
-            if '(u"' in line:
-                uni = "u"
-                has_unicode = True
-            command = '''%sself.click(%s"%s")''' % (
-                whitespace, uni, xpath)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_xpath() + .submit()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_xpath\(u?\"([\S\s]+)\"\)'''
-            r'''\.submit\(\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            xpath = '%s' % data.group(2)
-            uni = ""
-            if '(u"' in line:
-                uni = "u"
-                has_unicode = True
-            command = '''%sself.submit(%s"%s")''' % (
-                whitespace, uni, xpath)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle .find_element_by_link_text() + .click()
-        data = re.match(
-            r'''^(\s*)driver\.find_element_by_link_text\(u?\"([\S\s]+)\"\)'''
-            r'''\.click\(\)\s*$''', line)
-        if data:
-            whitespace = data.group(1)
-            link_text = '''%s''' % data.group(2)
-            uni = ""
-            if '(u"' in line:
-                uni = "u"
-                has_unicode = True
-            command = '''%sself.click(%s"link=%s")''' % (
-                whitespace, uni, link_text)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.is_element_present(By.LINK_TEXT, *)
-        data = re.match(
-            r'''^(\s*)([\S\s]*)self\.is_element_present\(By.LINK_TEXT, '''
-            r'''u?\"([\S\s]+)\"\)([\S\s]*)$''', line)
-        if data:
-            whitespace = data.group(1)
-            pre = data.group(2)
-            link_text = '''%s''' % data.group(3)
-            post = data.group(4)
-            uni = ""
-            if '(u"' in line:
-                uni = "u"
-                has_unicode = True
-            command = '''%s%sself.is_link_text_present(%s"%s")%s''' % (
-                whitespace, pre, uni, link_text, post)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.is_element_present(By.NAME, *)
-        data = re.match(
-            r'''^(\s*)([\S\s]*)self\.is_element_present\(By.NAME, '''
-            r'''u?\"([\S\s]+)\"\)([\S\s]*)$''', line)
-        if data:
-            whitespace = data.group(1)
-            pre = data.group(2)
-            name = '''%s''' % data.group(3)
-            post = data.group(4)
-            uni = ""
-            if '(u"' in line:
-                uni = "u"
-                has_unicode = True
-            command = '''%s%sself.is_element_present('[name="%s"]')%s''' % (
-                whitespace, pre, name, post)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.is_element_present(By.ID, *)
-        data = re.match(
-            r'''^(\s*)([\S\s]*)self\.is_element_present\(By.ID, '''
-            r'''u?\"([\S\s]+)\"\)([\S\s]*)$''', line)
-        if data:
-            whitespace = data.group(1)
-            pre = data.group(2)
-            the_id = '''%s''' % data.group(3)
-            post = data.group(4)
-            uni = ""
-            if '(u"' in line:
-                uni = "u"
-                has_unicode = True
-            command = '''%s%sself.is_element_present("#%s")%s''' % (
-                whitespace, pre, the_id, post)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.is_element_present(By.CLASS, *)
-        data = re.match(
-            r'''^(\s*)([\S\s]*)self\.is_element_present\(By.CLASS, '''
-            r'''u?\"([\S\s]+)\"\)([\S\s]*)$''', line)
-        if data:
-            whitespace = data.group(1)
-            pre = data.group(2)
-            the_class = '''%s''' % data.group(3)
-            post = data.group(4)
-            uni = ""
-            if '(u"' in line:
-                uni = "u"
-                has_unicode = True
-            command = '''%s%sself.is_element_present(".%s")%s''' % (
-                whitespace, pre, the_class, post)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.is_element_present(By.CSS_SELECTOR, *)
-        data = re.match(
-            r'''^(\s*)([\S\s]*)self\.is_element_present\(By.CSS_SELECTOR, '''
-            r'''u?\"([\S\s]+)\"\)([\S\s]*)$''', line)
-        if data:
-            whitespace = data.group(1)
-            pre = data.group(2)
-            selector = '''%s''' % data.group(3)
-            post = data.group(4)
-            uni = ""
-            if '(u"' in line:
-                uni = "u"
-                has_unicode = True
-            command = '''%s%sself.is_element_present("%s")%s''' % (
-                whitespace, pre, selector, post)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.is_element_present(By.XPATH, *)
-        data = re.match(
-            r'''^(\s*)([\S\s]*)self\.is_element_present\(By.XPATH, '''
-            r'''u?\"([\S\s]+)\"\)([\S\s]*)$''', line)
-        if data:
-            whitespace = data.group(1)
-            pre = data.group(2)
-            xpath = '''%s''' % data.group(3)
-            post = data.group(4)
-            uni = ""
-            if '(u"' in line:
-                uni = "u"
-                has_unicode = True
-            command = '''%s%sself.is_element_present("%s")%s''' % (
-                whitespace, pre, xpath, post)
-            seleniumbase_lines.append(command)
-            continue
+        # Only lines that use the driver can be converted into SB methods
+        if "driver." in line or "is_element_present(" in line:
+            result = _convert_driver_line(line, ide_base_url)
+            if result:
+                command, line_uses_keys, line_has_unicode = result
+                uses_keys = uses_keys or line_uses_keys
+                has_unicode = has_unicode or line_has_unicode
+                seleniumbase_lines.append(command)
+                converted_count += 1
+                continue
 
         # Replace "self.base_url" with actual url if not already done
         if 'self.base_url' in line:
@@ -587,27 +640,36 @@ def main():
         # Add all other lines to final script without making changes
         seleniumbase_lines.append(line)
 
+        # (Selenium IDE wait loops get replaced with SB waits further below)
+        if WAIT_LOOP_START_PATTERN.match(line):
+            in_wait_loop = True
+        if in_wait_loop:
+            converted_count += 1
+            if WAIT_LOOP_END_PATTERN.match(line):
+                in_wait_loop = False
+        else:
+            unconverted_lines.append(
+                (line_number, code_lines[line_number - 1].strip()))
+
     # Chunk processing of inefficient waiting from Selenium IDE
     in_inefficient_wait = False
     whitespace = ""
     lines = seleniumbase_lines
     seleniumbase_lines = []
     for line in lines:
-        data = re.match(r'^(\s*)for i in range\(60\):\s*$', line)
+        data = WAIT_LOOP_START_PATTERN.match(line)
         if data:
             in_inefficient_wait = True
             whitespace = data.group(1)
             continue
 
-        data = re.match(r'^(\s*)else: self.fail\("time out"\)\s*$', line)
+        data = WAIT_LOOP_END_PATTERN.match(line)
         if data:
             in_inefficient_wait = False
             continue
 
         if in_inefficient_wait:
-            data = re.match(
-                r'''^\s*if self.is_element_present\("([\S\s]+)"\)'''
-                r''': break\s*$''', line)
+            data = WAIT_LOOP_ELEMENT_PATTERN.match(line)
             if data:
                 selector = data.group(1)
                 command = '%sself.wait_for_element("%s")' % (
@@ -615,9 +677,7 @@ def main():
                 seleniumbase_lines.append(command)
                 continue
 
-            data = re.match(
-                r'''^\s*if self.is_element_present\('([\S\s]+)'\)'''
-                r''': break\s*$''', line)
+            data = WAIT_LOOP_ELEMENT_SQ_PATTERN.match(line)
             if data:
                 selector = data.group(1)
                 command = "%sself.wait_for_element('%s')" % (
@@ -625,9 +685,7 @@ def main():
                 seleniumbase_lines.append(command)
                 continue
 
-            data = re.match(
-                r'''^\s*if self.is_link_text_present'''
-                r'''\("([\S\s]+)"\): break\s*$''', line)
+            data = WAIT_LOOP_LINK_TEXT_PATTERN.match(line)
             if data:
                 uni = ""
                 if '(u"' in line:
@@ -652,10 +710,7 @@ def main():
     seleniumbase_lines = []
     num_lines = len(lines)
     for line_num in range(len(lines)):
-        data = re.match(
-            r'''^\s*self.wait_for_element'''
-            r'''\((["|'])([\S\s]+)(["|'])\)'''
-            r'''\s*$''', lines[line_num])
+        data = WAIT_FOR_ELEMENT_PATTERN.match(lines[line_num])
         if data:
             # quote_type = data.group(1)
             selector = data.group(2)
@@ -680,10 +735,7 @@ def main():
     seleniumbase_lines = []
     num_lines = len(lines)
     for line_num in range(len(lines)):
-        data = re.match(
-            r'''^\s*self.wait_for_link_text'''
-            r'''\((["|'])([\S\s]+)(["|'])\)'''
-            r'''\s*$''', lines[line_num])
+        data = WAIT_FOR_LINK_TEXT_PATTERN.match(lines[line_num])
         if data:
             # quote_type = data.group(1)
             link_text = data.group(2)
@@ -706,10 +758,30 @@ def main():
     if uses_select:
         seleniumbase_code += (
             "from selenium.webdriver.support.ui import Select\n")
-    for line in seleniumbase_lines:
-        seleniumbase_code += line
-        seleniumbase_code += "\n"
+    seleniumbase_code += "\n".join(seleniumbase_lines) + "\n"
     # print(seleniumbase_code)  # (For debugging)
+    return seleniumbase_code, converted_count, unconverted_lines
+
+
+def convert_file(webdriver_python_file):
+    """ Converts a Python WebDriver unittest file, and saves the converted
+        code to a new file that has "_SB" added to the original file name.
+        Returns a dictionary with the results of the conversion. """
+    if not webdriver_python_file.endswith('.py'):
+        raise Exception("\n\n`%s` is not a Python file!\n\n"
+                        "Expecting: %s\n"
+                        % (webdriver_python_file, EXPECTED_ARG))
+    f = open(webdriver_python_file, 'r')
+    all_code = f.read()
+    f.close()
+    if "def test_" not in all_code:
+        raise Exception("\n\n`%s` is not a valid Python unittest.TestCase "
+                        "file!\n\nExpecting: %s\n\n"
+                        "Did you properly export your Katalon/Selenium-IDE "
+                        "recording as a Python WebDriver unittest file?\n"
+                        % (webdriver_python_file, EXPECTED_ARG))
+    seleniumbase_code, converted_count, unconverted_lines = (
+        convert_code(all_code))
 
     # Create SeleniumBase test file
     base_file_name = webdriver_python_file.split('.py')[0]
@@ -717,8 +789,161 @@ def main():
     out_file = codecs.open(converted_file_name, "w+")
     out_file.writelines(seleniumbase_code)
     out_file.close()
-    print('\n>>> [%s] was created from [%s]\n' % (
-        converted_file_name, webdriver_python_file))
+    return {"file": webdriver_python_file,
+            "converted_file": converted_file_name,
+            "converted": converted_count,
+            "unconverted": unconverted_lines,
+            "error": None}
+
+
+def _convert_file_safely(webdriver_python_file):
+    """ Used by the process pool so that one bad file doesn't stop the rest
+        of the batch. The error is kept in the results for the report. """
+    try:
+        return convert_file(webdriver_python_file)
+    except Exception as e:
+        return {"file": webdriver_python_file,
+                "converted_file": None,
+                "converted": 0,
+                "unconverted": [],
+                "error": str(e).strip().split('\n')[0]}
+
+
+def get_python_files(paths):
+    """ Expands the given files, directories (recursively), and glob patterns
+        into a list of Python files, skipping files that were already
+        converted ("_SB.py") when searching directories and globs. """
+    python_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file_name in sorted(files):
+                    if file_name.endswith('.py') and (
+                            not file_name.endswith('_SB.py')) and (
+                            file_name != "__init__.py"):
+                        python_files.append(os.path.join(root, file_name))
+        elif glob.has_magic(path):
+            for file_name in sorted(glob.glob(path)):
+                if file_name.endswith('.py') and (
+                        not file_name.endswith('_SB.py')):
+                    python_files.append(file_name)
+        else:
+            python_files.append(path)
+    unique_files = []
+    found = set()
+    for python_file in python_files:
+        if python_file not in found:
+            found.add(python_file)
+            unique_files.append(python_file)
+    return unique_files
+
+
+def convert_files(python_files, processes=None):
+    """ Converts the files across a pool of processes.
+        Returns the list of results, in the same order as the files. """
+    if not processes:
+        processes = multiprocessing.cpu_count()
+    processes = max(1, min(processes, len(python_files)))
+    if processes == 1:
+        return [_convert_file_safely(f) for f in python_files]
+    chunksize = max(1, len(python_files) // (processes * 4))
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(_convert_file_safely, python_files, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def get_batch_report(results, duration=None):
+    """ Returns a summary of the converted & unconverted lines of each file.
+        (Unconverted lines are kept as-is in the converted files.) """
+    converted_files = [r for r in results if not r["error"]]
+    total_converted = sum([r["converted"] for r in converted_files])
+    total_unconverted = sum([len(r["unconverted"]) for r in converted_files])
+    lines = []
+    summary = "Converted %s of %s files" % (
+        len(converted_files), len(results))
+    if duration is not None:
+        summary += " in %.2fs" % duration
+    lines.append(summary)
+    lines.append("Lines: %s converted, %s unconverted" % (
+        total_converted, total_unconverted))
+    lines.append("")
+    for result in results:
+        if result["error"]:
+            lines.append("* %s: NOT CONVERTED (%s)" % (
+                result["file"], result["error"]))
+            continue
+        lines.append("* %s: %s converted, %s unconverted" % (
+            result["file"], result["converted"], len(result["unconverted"])))
+        for line_number, line in result["unconverted"]:
+            lines.append("    Line %s: %s" % (line_number, line))
+    return "\n".join(lines)
+
+
+def convert_batch(paths, processes=None, report_file=BATCH_REPORT_FILE):
+    python_files = get_python_files(paths)
+    if not python_files:
+        raise Exception("\n\nNo Python files were found in: %s\n"
+                        % ", ".join(paths))
+    start_time = timing_helper.clock()
+    results = convert_files(python_files, processes)
+    duration = timing_helper.clock() - start_time
+    report = get_batch_report(results, duration)
+    if report_file:
+        out_file = codecs.open(report_file, "w+", "utf-8")
+        out_file.writelines(report + "\n")
+        out_file.close()
+    print("\n" + report)
+    if report_file:
+        print("\n>>> [%s] was created\n" % report_file)
+    return results
+
+
+def invalid_run_command(usage, msg=None):
+    exp = ('\n\n* INVALID RUN COMMAND! *  Usage:\n'
+           '"%s %s"\n'
+           '(Or with several files, folders, or wildcards, and an optional '
+           '"--processes=N")\n' % (usage, EXPECTED_ARG))
+    if msg:
+        exp += '\n%s\n' % msg
+    raise Exception(exp)
+
+
+def main():
+    if sys.argv[0].split('/')[-1] == "seleniumbase" or (
+            sys.argv[0].split('\\')[-1] == "seleniumbase"):
+        usage = "seleniumbase convert"
+        args = sys.argv[2:]
+    else:
+        usage = "python convert_ide.py"
+        args = sys.argv[1:]
+    processes = None
+    paths = []
+    for arg in args:
+        if arg.startswith("--processes="):
+            processes = arg.split("=", 1)[1]
+            if not processes.isdigit() or int(processes) < 1:
+                invalid_run_command(
+                    usage, "--processes must be a positive integer!")
+            processes = int(processes)
+        elif arg.startswith("-"):
+            invalid_run_command(usage, "Unknown option: %s" % arg)
+        else:
+            paths.append(arg)
+    if not paths:
+        invalid_run_command(usage)
+
+    if len(paths) == 1 and not os.path.isdir(paths[0]) and (
+            not glob.has_magic(paths[0])):
+        webdriver_python_file = paths[0]
+        result = convert_file(webdriver_python_file)
+        print('\n>>> [%s] was created from [%s]\n' % (
+            result["converted_file"], webdriver_python_file))
+    else:
+        convert_batch(paths, processes)
 
 
 if __name__ == "__main__":
@@ -3,17 +3,26 @@ Converts a SeleniumBase Python file into one that uses the Page Object Pattern.
 
 Usage:
         seleniumbase objectify [SELENIUMBASE_PYTHON_FILE].py
+    OR
+        seleniumbase objectify [FILES / DIRECTORIES / "GLOBS"]
 Output:
         A modified version of the file where the selectors
         have been replaced with variable names defined in
         "page_objects.py", supporting the Page Object Pattern.
+        (When given many files, "page_objects.py" is written once per
+        folder of tests, next to the tests that import from it, along
+        with a ".page_objects_index.json" cache of its page objects.)
 """
 
 import codecs
+import collections
+import glob
+import json
 import os
 import re
 import sys
 PAGE_OBJECTS_FILE = "page_objects.py"  # Don't change this. It's hard-coded.
+INDEX_CACHE_FILE = ".page_objects_index.json"  # Cache of PAGE_OBJECTS_FILE
 
 
 def invalid_run_command(shell_command):
@@ -36,6 +45,7 @@ def invalid_objectify_run_command():
     exp += "  Options:\n"
     exp += "         -c, --comments  (Add object selectors to the comments.)\n"
     exp += "                         (Default: No added comments.)\n"
+    exp += "         (Multiple files, directories & globs are accepted.)\n"
     exp += "  Output:\n"
     exp += "         Converts a SeleniumBase Python file into one that uses\n"
     exp += "         the Page Object Pattern by converting page selectors\n"
@@ -106,7 +116,7 @@ def remove_extra_slashes(selector):
     return selector
 
 
-def create_objects_file(selector_list_dict=None):
+def create_objects_file(selector_list_dict=None, folder=None):
     data = []
     if selector_list_dict:
         data.append("# -*- coding: utf-8 -*-")
@@ -131,7 +141,7 @@ def create_objects_file(selector_list_dict=None):
         data.append("class Page(object):")
         data.append('    html = "html"')
         data.append("")
-    file_path = PAGE_OBJECTS_FILE
+    file_path = _get_folder_path(folder, PAGE_OBJECTS_FILE)
     file = codecs.open(file_path, "w+", "utf-8")
     file.writelines("\r\n".join(data))
     file.close()
@@ -141,12 +151,13 @@ def create_objects_file(selector_list_dict=None):
         print('\n>>> ["%s"] was updated!' % file_path)
 
 
-def scan_objects_file():
-    if not os.path.exists(PAGE_OBJECTS_FILE):
-        create_objects_file()
+def scan_objects_file(folder=None):
+    file_path = _get_folder_path(folder, PAGE_OBJECTS_FILE)
+    if not os.path.exists(file_path):
+        create_objects_file(folder=folder)
 
     page_selectors = {}
-    f = open(PAGE_OBJECTS_FILE, 'r')
+    f = open(file_path, 'r')
     all_code = f.read()
     f.close()
 
@@ -217,6 +228,342 @@ def get_next_var_name(existing_names):
     raise Exception("Out of range! (Selector name generation)")
 
 
+class PageObjectIndex(object):
+    """ A project-wide index of the page objects in "page_objects.py",
+        keyed by selector, so that a whole test tree can be objectified
+        in one run with a single write of "page_objects.py" at the end.
+        The index is cached in INDEX_CACHE_FILE (next to "page_objects.py"),
+        which gets used instead of parsing "page_objects.py" while that file
+        remains unchanged. Each folder of tests gets its own index. """
+
+    def __init__(self, selector_list_dict, var_names, folder=None):
+        self.folder = folder
+        self.selector_list_dict = selector_list_dict
+        self.var_names = set(var_names)
+        self.selector_dict = {}  # Key: selector, Value: object
+        self.object_dict = {}  # Key: object, Value: selector
+        for key in selector_list_dict.keys():
+            for pair in selector_list_dict[key]:
+                self.__add_to_dicts(key, pair[0], pair[1])
+        self.next_var_number = 1
+        self.new_selectors = []
+
+    def __add_to_dicts(self, class_name, var_name, selector):
+        object_name = "%s.%s" % (str(class_name), str(var_name))
+        self.selector_dict[selector] = object_name
+        self.object_dict[object_name] = selector
+
+    @classmethod
+    def load(cls, folder=None):
+        """ Loads the index of the folder from the cache if it's still valid.
+            Otherwise scans "page_objects.py" (creating it if missing). """
+        cache = _read_index_cache(folder)
+        if cache:
+            selector_list_dict = collections.OrderedDict()
+            for class_name, pairs in cache["classes"]:
+                selector_list_dict[class_name] = [tuple(p) for p in pairs]
+            return cls(selector_list_dict, cache["var_names"], folder)
+        var_names, selectors, selector_list_dict = scan_objects_file(folder)
+        index = cls(selector_list_dict, var_names, folder)
+        index.save_cache()
+        return index
+
+    def get_next_var_name(self):
+        """ Same names as get_next_var_name(), without rescanning from 1. """
+        while "css_%s" % self.next_var_number in self.var_names:
+            self.next_var_number += 1
+        return "css_%s" % self.next_var_number
+
+    def add_selector(self, selector):
+        """ Returns the page object of the selector, adding a new one to
+            the "Page" class if the selector isn't in the index yet. """
+        selector = optimize_selector(selector)
+        if selector not in self.selector_dict:
+            var_name = self.get_next_var_name()
+            self.var_names.add(var_name)
+            self.selector_list_dict["Page"].append((var_name, selector))
+            self.__add_to_dicts("Page", var_name, selector)
+            self.new_selectors.append(selector)
+        return self.selector_dict[selector]
+
+    def save(self):
+        """ Writes "page_objects.py" and updates the index cache. """
+        create_objects_file(self.selector_list_dict, self.folder)
+        self.new_selectors = []
+        self.save_cache()
+
+    def save_cache(self):
+        page_objects_stat = _get_page_objects_stat(self.folder)
+        if not page_objects_stat:
+            return
+        cache = collections.OrderedDict()
+        cache["page_objects"] = page_objects_stat
+        cache["var_names"] = sorted(self.var_names)
+        cache["classes"] = [
+            [key, [list(pair) for pair in self.selector_list_dict[key]]]
+            for key in self.selector_list_dict.keys()]
+        try:
+            cache_file = _get_folder_path(self.folder, INDEX_CACHE_FILE)
+            with codecs.open(cache_file, "w+", "utf-8") as f:
+                f.write(json.dumps(cache, indent=1))
+        except Exception:
+            pass  # The cache is only an optimization
+
+
+def _get_folder_path(folder, file_name):
+    if not folder:
+        return file_name
+    return os.path.join(folder, file_name)
+
+
+def _get_page_objects_stat(folder=None):
+    file_path = _get_folder_path(folder, PAGE_OBJECTS_FILE)
+    if not os.path.exists(file_path):
+        return None
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def _read_index_cache(folder=None):
+    """ Returns the cached index if "page_objects.py" hasn't changed since
+        the cache was saved. Otherwise returns None. """
+    cache_file = _get_folder_path(folder, INDEX_CACHE_FILE)
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with codecs.open(cache_file, "r", "utf-8") as f:
+            cache = json.loads(
+                f.read(), object_pairs_hook=collections.OrderedDict)
+        if cache["page_objects"] != _get_page_objects_stat(folder):
+            return None
+        return cache
+    except Exception:
+        return None  # (Invalid cache) The file will get scanned instead
+
+
+def get_test_files(paths):
+    """ Expands files, directories (recursively), and glob patterns into a
+        list of Python files, skipping "page_objects.py" files. """
+    test_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file_name in sorted(files):
+                    if file_name.endswith('.py') and (
+                            file_name != PAGE_OBJECTS_FILE) and (
+                            file_name != "__init__.py"):
+                        test_files.append(os.path.join(root, file_name))
+        elif glob.has_magic(path):
+            for file_name in sorted(glob.glob(path)):
+                if file_name.endswith('.py') and (
+                        os.path.basename(file_name) != PAGE_OBJECTS_FILE):
+                    test_files.append(file_name)
+        else:
+            test_files.append(path)
+    unique_files = []
+    found = set()
+    for test_file in test_files:
+        if test_file not in found:
+            found.add(test_file)
+            unique_files.append(test_file)
+    return unique_files
+
+
+# The rewrite engine of process_test_file() is table-driven. Each line is
+# dispatched on the names of the methods called after "self.", and only the
+# rules of those methods get tried (in table order), using patterns that are
+# compiled once. Named groups from a match fill in the command template.
+# {method} and {selector} get filled in when the patterns are compiled.
+SELECTOR_LITERAL = r'''(?P<selector>r?['"][\S\s]+['"])'''
+SELECTOR_OR_OBJECT = r'''(?P<selector>[\S\s]+)'''
+
+# self.METHOD(SELECTOR)
+SELECTOR_SHAPE = (
+    r'''^(?P<whitespace>\s*)self\.{method}'''
+    r'''\({selector}\)(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)sself.{method}(%(selector)s)%(comments)s''')
+
+# self.METHOD_*(SELECTOR)
+BY_SELECTOR_SHAPE = (
+    r'''^(?P<whitespace>\s*)self\.{method}(?P<by_type>\S*)'''
+    r'''\({selector}\)(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)sself.{method}%(by_type)s(%(selector)s)%(comments)s''')
+
+# self.METHOD(SELECTOR, TEXT)
+SELECTOR_TEXT_SHAPE = (
+    r'''^(?P<whitespace>\s*)self\.{method}'''
+    r'''\({selector},\s?(?P<text>[\S\s]+)\)(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)sself.{method}(%(selector)s, %(text)s)%(comments)s''')
+
+# self.METHOD_*(SELECTOR, TEXT)
+BY_SELECTOR_TEXT_SHAPE = (
+    r'''^(?P<whitespace>\s*)self\.{method}(?P<by_type>\S*)'''
+    r'''\({selector},\s?(?P<text>[\S\s]+)\)(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)sself.{method}%(by_type)s'''
+    '''(%(selector)s, %(text)s)%(comments)s''')
+
+# self.METHOD(TEXT, SELECTOR)
+TEXT_SELECTOR_SHAPE = (
+    r'''^(?P<whitespace>\s*)self\.{method}'''
+    r'''\((?P<text>[\S\s]+),\s?{selector}\)(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)sself.{method}(%(text)s, %(selector)s)%(comments)s''')
+
+# if/elif self.METHOD_*(TEXT, SELECTOR):
+IF_BY_TEXT_SELECTOR_SHAPE = (
+    r'''^(?P<whitespace>\s*)(?P<if_type>\S*)\sself\.{method}'''
+    r'''(?P<by_type>\S*)\((?P<text>[\S\s]+),\s?{selector}\):'''
+    r'''(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)s%(if_type)s self.{method}%(by_type)s'''
+    '''(%(text)s, %(selector)s):%(comments)s''')
+
+# if/elif self.METHOD_*(SELECTOR):
+IF_BY_SELECTOR_SHAPE = (
+    r'''^(?P<whitespace>\s*)(?P<if_type>\S*)\sself\.{method}'''
+    r'''(?P<by_type>\S*)\({selector}\):(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)s%(if_type)s self.{method}%(by_type)s'''
+    '''(%(selector)s):%(comments)s''')
+
+# VAR = self.METHOD(SELECTOR, ATTRIBUTE)
+VAR_SELECTOR_ATTRIBUTE_SHAPE = (
+    r'''^(?P<whitespace>\s*)(?P<var_name>\S*)\s?=\s?self\.{method}'''
+    r'''\({selector},\s?(?P<attribute>['"][\S\s]+['"])\)'''
+    r'''(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)s%(var_name)s = self.{method}'''
+    '''(%(selector)s, %(attribute)s)%(comments)s''')
+
+# VAR = self.METHOD(SELECTOR)
+VAR_SELECTOR_SHAPE = (
+    r'''^(?P<whitespace>\s*)(?P<var_name>\S*)\s?=\s?self\.{method}'''
+    r'''\({selector}\)(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)s%(var_name)s = self.{method}'''
+    '''(%(selector)s)%(comments)s''')
+
+# if VAR [in|not in] self.METHOD(SELECTOR):
+IF_IN_SELECTOR_SHAPE = (
+    r'''^(?P<whitespace>\s*)if\s(?P<var_prefix>\S*\s?\S*)\sin\s?'''
+    r'''self\.{method}\({selector}\):(?P<comments>[\S\s]*)$''',
+    '''%(whitespace)sif %(var_prefix)s in self.{method}'''
+    '''(%(selector)s):%(comments)s''')
+
+# (method, shape, [new_method])  Methods ending in "_" are method prefixes.
+# The order matters: The first rule that matches a line gets used.
+REWRITE_RULES = [
+    ("click", SELECTOR_SHAPE),
+    ("js_click", SELECTOR_SHAPE),
+    ("slow_click", SELECTOR_SHAPE),
+    ("assert_element", SELECTOR_SHAPE),
+    ("assert_element_", BY_SELECTOR_SHAPE),  # present/not_visible/absent
+    ("find_element", SELECTOR_SHAPE),
+    ("get_element", SELECTOR_SHAPE),
+    ("wait_for_element", SELECTOR_SHAPE),
+    ("wait_for_element_", BY_SELECTOR_SHAPE),  # present/visible
+    ("update_text", SELECTOR_TEXT_SHAPE),
+    ("type", SELECTOR_TEXT_SHAPE),
+    ("send_keys", SELECTOR_TEXT_SHAPE),
+    ("set_value", SELECTOR_TEXT_SHAPE),
+    ("assert_text", TEXT_SELECTOR_SHAPE),
+    ("assert_exact_text", TEXT_SELECTOR_SHAPE),
+    ("find_text", TEXT_SELECTOR_SHAPE),
+    ("is_text_", IF_BY_TEXT_SELECTOR_SHAPE),  # present/visible
+    ("wait_for_text", TEXT_SELECTOR_SHAPE),
+    ("wait_for_text_visible", TEXT_SELECTOR_SHAPE, "wait_for_text"),
+    ("is_element_", IF_BY_SELECTOR_SHAPE),  # present/visible
+    ("get_attribute", VAR_SELECTOR_ATTRIBUTE_SHAPE),
+    ("get_text", VAR_SELECTOR_SHAPE),
+    ("get_text", IF_IN_SELECTOR_SHAPE),
+    ("select_option_by_", BY_SELECTOR_TEXT_SHAPE),  # index/value/text
+]
+
+METHOD_CALL_PATTERN = re.compile(r'''self\.(\w+)\(''')
+
+
+class RewriteRule(object):
+    """ A rewrite rule for one method, with the patterns compiled for the
+        selectors of extract/inject, and for the page objects of revert. """
+
+    def __init__(self, order, method, shape, new_method=None):
+        regex, template = shape
+        self.order = order
+        self.method = method
+        self.is_prefix = method.endswith("_")
+        regex = regex.replace("{method}", re.escape(method))
+        self.selector_pattern = re.compile(
+            regex.replace("{selector}", SELECTOR_LITERAL))
+        self.object_pattern = re.compile(
+            regex.replace("{selector}", SELECTOR_OR_OBJECT))
+        self.template = template.replace("{method}", new_method or method)
+
+    def handles(self, method_name):
+        if self.is_prefix:
+            return method_name.startswith(self.method)
+        return method_name == self.method
+
+
+_rewrite_rules = [
+    RewriteRule(order, *rule) for order, rule in enumerate(REWRITE_RULES)]
+_rules_by_method_name = {}  # {method_name: [rule, ...]} (Filled as needed)
+
+
+def get_rewrite_rules(line):
+    """ Returns the rules (in order) for the methods that the line calls. """
+    method_names = METHOD_CALL_PATTERN.findall(line)
+    rules = []
+    for method_name in method_names:
+        if method_name not in _rules_by_method_name:
+            _rules_by_method_name[method_name] = [
+                rule for rule in _rewrite_rules if rule.handles(method_name)]
+        rules.extend(_rules_by_method_name[method_name])
+    if len(method_names) > 1:
+        rules = sorted(set(rules), key=lambda rule: rule.order)
+    return rules
+
+
+def rewrite_line(
+        line, selector_dict=None, object_dict=None, add_comments=False):
+    """ Returns (command, selector, changed_class) if the line matches a
+        rewrite rule, or None if it doesn't. Without dictionaries, the
+        command is the original line. With the selector_dict (inject), a
+        known selector gets replaced with its page object. With the
+        object_dict (revert), a known page object gets replaced with its
+        selector. changed_class is the page_objects.py class that got used,
+        or None if nothing got replaced. """
+    if "self." not in line:
+        return None
+    for rule in get_rewrite_rules(line):
+        if not object_dict:
+            data = rule.selector_pattern.match(line)
+        else:
+            data = rule.object_pattern.match(line)
+        if data:
+            break
+    else:
+        return None
+    fields = data.groupdict()
+    selector = remove_extra_slashes(fields["selector"])
+    fields["selector"] = selector
+    command = rule.template % fields
+    changed_class = None
+    if selector_dict:
+        if add_comments:
+            fields["comments"] = "  # %s" % selector
+        optimized_selector = optimize_selector(selector)
+        if optimized_selector in selector_dict:
+            selector_object = selector_dict[optimized_selector]
+            changed_class = selector_object.split('.')[0]
+            fields["selector"] = selector_object
+            command = rule.template % fields
+    if object_dict:
+        if not add_comments:
+            fields["comments"] = ""
+        object_name = selector
+        if object_name in object_dict:
+            changed_class = object_name.split('.')[0]
+            fields["selector"] = object_dict[object_name]
+            command = rule.template % fields
+    return command, selector, changed_class
+
+
 def process_test_file(
         code_lines, selector_dict=None, object_dict=None, add_comments=False):
 
@@ -226,992 +573,14 @@ def process_test_file(
 
     for line in code_lines:
         line = line.rstrip()
-
-        # Handle self.click(SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.click'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.click'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(3)
-            command = '''%sself.click(%s)%s''' % (
-                whitespace, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.click(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.click(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.js_click(SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.js_click'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.js_click'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(3)
-            command = '''%sself.js_click(%s)%s''' % (
-                whitespace, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.js_click(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.js_click(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.slow_click(SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.slow_click'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.slow_click'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(3)
-            command = '''%sself.slow_click(%s)%s''' % (
-                whitespace, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.slow_click(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.slow_click(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.assert_element(SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.assert_element'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.assert_element'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(3)
-            command = '''%sself.assert_element(%s)%s''' % (
-                whitespace, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.assert_element(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.assert_element(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.assert_element_*(SELECTOR)  *= present/not_visible/absent
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.assert_element_(\S*)'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.assert_element_(\S*)'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            by_type = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(4)
-            command = '''%sself.assert_element_%s(%s)%s''' % (
-                whitespace, by_type, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.assert_element_%s(%s)%s''' % (
-                        whitespace, by_type, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.assert_element_%s(%s)%s''' % (
-                        whitespace, by_type, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.find_element(SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.find_element'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.find_element'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(3)
-            command = '''%sself.find_element(%s)%s''' % (
-                whitespace, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.find_element(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.find_element(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.get_element(SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.get_element'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.get_element'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(3)
-            command = '''%sself.get_element(%s)%s''' % (
-                whitespace, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.get_element(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.get_element(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.wait_for_element(SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.wait_for_element'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.wait_for_element'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(3)
-            command = '''%sself.wait_for_element(%s)%s''' % (
-                whitespace, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.wait_for_element(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.wait_for_element(%s)%s''' % (
-                        whitespace, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.wait_for_element_*(SELECTOR)  * = present/visible
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.wait_for_element_(\S*)'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.wait_for_element_(\S*)'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            by_type = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(4)
-            command = '''%sself.wait_for_element_%s(%s)%s''' % (
-                whitespace, by_type, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.wait_for_element_%s(%s)%s''' % (
-                        whitespace, by_type, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.wait_for_element_%s(%s)%s''' % (
-                        whitespace, by_type, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.update_text(SELECTOR, TEXT)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.update_text'''
-                r'''\((r?['"][\S\s]+['"]),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.update_text'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            text = data.group(3)
-            comments = data.group(4)
-            command = '''%sself.update_text(%s, %s)%s''' % (
-                whitespace, selector, text, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.update_text(%s, %s)%s''' % (
-                        whitespace, selector_object, text, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.update_text(%s, %s)%s''' % (
-                        whitespace, selector_object, text, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.type(SELECTOR, TEXT)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.type'''
-                r'''\((r?['"][\S\s]+['"]),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.type'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            text = data.group(3)
-            comments = data.group(4)
-            command = '''%sself.type(%s, %s)%s''' % (
-                whitespace, selector, text, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.type(%s, %s)%s''' % (
-                        whitespace, selector_object, text, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.type(%s, %s)%s''' % (
-                        whitespace, selector_object, text, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.send_keys(SELECTOR, TEXT)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.send_keys'''
-                r'''\((r?['"][\S\s]+['"]),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.send_keys'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            text = data.group(3)
-            comments = data.group(4)
-            command = '''%sself.send_keys(%s, %s)%s''' % (
-                whitespace, selector, text, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.send_keys(%s, %s)%s''' % (
-                        whitespace, selector_object, text, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.send_keys(%s, %s)%s''' % (
-                        whitespace, selector_object, text, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.set_value(SELECTOR, TEXT)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.set_value'''
-                r'''\((r?['"][\S\s]+['"]),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.set_value'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            selector = '%s' % data.group(2)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            text = data.group(3)
-            comments = data.group(4)
-            command = '''%sself.set_value(%s, %s)%s''' % (
-                whitespace, selector, text, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.set_value(%s, %s)%s''' % (
-                        whitespace, selector_object, text, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.set_value(%s, %s)%s''' % (
-                        whitespace, selector_object, text, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.assert_text(TEXT, SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.assert_text'''
-                r'''\(([\S\s]+),\s?(r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.assert_text'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            text = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(4)
-            command = '''%sself.assert_text(%s, %s)%s''' % (
-                whitespace, text, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.assert_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.assert_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.assert_exact_text(TEXT, SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.assert_exact_text'''
-                r'''\(([\S\s]+),\s?(r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.assert_exact_text'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            text = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(4)
-            command = '''%sself.assert_exact_text(%s, %s)%s''' % (
-                whitespace, text, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.assert_exact_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.assert_exact_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.find_text(TEXT, SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.find_text'''
-                r'''\(([\S\s]+),\s?(r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.find_text'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            text = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(4)
-            command = '''%sself.find_text(%s, %s)%s''' % (
-                whitespace, text, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.find_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.find_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle if/elif self.is_text_*(TEXT, SELECTOR):  * = present/visible
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)(\S*)\sself\.is_text_(\S*)'''
-                r'''\(([\S\s]+),\s?(r?['"][\S\s]+['"])\):([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)(\S*)\sself\.is_text_(\S*)'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\):([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            if_type = data.group(2)
-            by_type = data.group(3)
-            text = data.group(4)
-            selector = '%s' % data.group(5)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(6)
-            command = '''%s%s self.is_text_%s(%s, %s):%s''' % (
-                whitespace, if_type, by_type, text, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%s%s self.is_text_%s(%s, %s):%s''' % (
-                        whitespace, if_type, by_type,
-                        text, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%s%s self.is_text_%s(%s, %s):%s''' % (
-                        whitespace, if_type, by_type,
-                        text, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.wait_for_text(TEXT, SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.wait_for_text'''
-                r'''\(([\S\s]+),\s?(r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.wait_for_text'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            text = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(4)
-            command = '''%sself.wait_for_text(%s, %s)%s''' % (
-                whitespace, text, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.wait_for_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.wait_for_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.wait_for_text_visible(TEXT, SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.wait_for_text_visible'''
-                r'''\(([\S\s]+),\s?(r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.wait_for_text_visible'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            text = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(4)
-            command = '''%sself.wait_for_text(%s, %s)%s''' % (
-                whitespace, text, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.wait_for_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.wait_for_text(%s, %s)%s''' % (
-                        whitespace, text, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle if/elif self.is_element_*(SELECTOR):  * = present/visible
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)(\S*)\sself\.is_element_(\S*)'''
-                r'''\((r?['"][\S\s]+['"])\):([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)(\S*)\sself\.is_element_(\S*)'''
-                r'''\(([\S\s]+)\):([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            if_type = data.group(2)
-            by_type = data.group(3)
-            selector = '%s' % data.group(4)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(5)
-            command = '''%s%s self.is_element_%s(%s):%s''' % (
-                whitespace, if_type, by_type, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%s%s self.is_element_%s(%s):%s''' % (
-                        whitespace, if_type, by_type,
-                        selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%s%s self.is_element_%s(%s):%s''' % (
-                        whitespace, if_type, by_type,
-                        selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle VAR = self.get_attribute(SELECTOR, ATTRIBUTE)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)(\S*)\s?=\s?self\.get_attribute'''
-                r'''\((r?['"][\S\s]+['"]),\s?(['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)(\S*)\s?=\s?self\.get_attribute'''
-                r'''\(([\S\s]+),\s?(['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            var_name = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            attribute = data.group(4)
-            comments = data.group(5)
-            command = '''%s%s = self.get_attribute(%s, %s)%s''' % (
-                whitespace, var_name, selector, attribute, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%s%s = self.get_attribute(%s, %s)%s''' % (
-                        whitespace, var_name,
-                        selector_object, attribute, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%s%s = self.get_attribute(%s, %s)%s''' % (
-                        whitespace, var_name,
-                        selector_object, attribute, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle VAR = self.get_text(SELECTOR)
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)(\S*)\s?=\s?self\.get_text'''
-                r'''\((r?['"][\S\s]+['"])\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)(\S*)\s?=\s?self\.get_text'''
-                r'''\(([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            var_name = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            comments = data.group(4)
-            command = '''%s%s = self.get_text(%s)%s''' % (
-                whitespace, var_name, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%s%s = self.get_text(%s)%s''' % (
-                        whitespace, var_name, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%s%s = self.get_text(%s)%s''' % (
-                        whitespace, var_name, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle if VAR [in|not in] self.get_text(SELECTOR):
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)if\s(\S*\s?\S*)\sin\s?self\.get_text'''
-                r'''\((r?['"][\S\s]+['"])\):([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)if\s(\S*\s?\S*)\sin\s?self\.get_text'''
-                r'''\(([\S\s]+)\):([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            var_prefix = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
+        result = rewrite_line(
+            line, selector_dict=selector_dict, object_dict=object_dict,
+            add_comments=add_comments)
+        if result:
+            command, selector, changed_class = result
             page_selectors.append(selector)
-            comments = data.group(4)
-            command = '''%sif %s in self.get_text(%s):%s''' % (
-                whitespace, var_prefix, selector, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sif %s in self.get_text(%s):%s''' % (
-                        whitespace, var_prefix, selector_object, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sif %s in self.get_text(%s):%s''' % (
-                        whitespace, var_prefix, selector_object, comments)
-            seleniumbase_lines.append(command)
-            continue
-
-        # Handle self.select_option_by_*(SELECTOR, TEXT)  * = index/value/text
-        if not object_dict:
-            data = re.match(
-                r'''^(\s*)self\.select_option_by_(\S*)'''
-                r'''\((r?['"][\S\s]+['"]),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        else:
-            data = re.match(
-                r'''^(\s*)self\.select_option_by_(\S*)'''
-                r'''\(([\S\s]+),\s?([\S\s]+)\)([\S\s]*)'''
-                r'''$''', line)
-        if data:
-            whitespace = data.group(1)
-            by_type = data.group(2)
-            selector = '%s' % data.group(3)
-            selector = remove_extra_slashes(selector)
-            page_selectors.append(selector)
-            text = data.group(4)
-            comments = data.group(5)
-            command = '''%sself.select_option_by_%s(%s, %s)%s''' % (
-                whitespace, by_type, selector, text, comments)
-            if selector_dict:
-                if add_comments:
-                    comments = "  # %s" % selector
-                selector = optimize_selector(selector)
-                if selector in selector_dict.keys():
-                    selector_object = selector_dict[selector]
-                    changed.append(selector_object.split('.')[0])
-                    command = '''%sself.select_option_by_%s(%s, %s)%s''' % (
-                        whitespace, by_type, selector_object, text, comments)
-            if object_dict:
-                if not add_comments:
-                    comments = ""
-                object_name = selector
-                if object_name in object_dict.keys():
-                    selector_object = object_dict[object_name]
-                    changed.append(object_name.split('.')[0])
-                    command = '''%sself.select_option_by_%s(%s, %s)%s''' % (
-                        whitespace, by_type, selector_object, text, comments)
+            if changed_class:
+                changed.append(changed_class)
             seleniumbase_lines.append(command)
             continue
 
@@ -1240,136 +609,135 @@ def revert_objects():
 
 def main(shell_command):
     expected_arg = ("[A SeleniumBase Python file]")
-    num_args = len(sys.argv)
     command_args = sys.argv[2:]
 
     add_comments = False
-    if shell_command == "objectify" or (
-            shell_command == "inject-objects" or (
-                shell_command == "revert-objects")):
-        if len(command_args) >= 2:
-            options = command_args[1:]
-            for option in options:
-                if option == '-c' or option == '--comments':
-                    add_comments = True
-                else:
-                    invalid_run_command(shell_command)
+    paths = []
+    for arg in command_args:
+        if not arg.startswith('-'):
+            paths.append(arg)
+        elif (arg == '-c' or arg == '--comments') and (
+                shell_command != "extract-objects"):
+            add_comments = True
+        else:
+            invalid_run_command(shell_command)
 
     if sys.argv[0].split('/')[-1] == "seleniumbase" or (
             sys.argv[0].split('\\')[-1] == "seleniumbase"):
-        if num_args < 3:
+        if not paths:
             invalid_run_command(shell_command)
-        elif num_args > 3:
-            if shell_command == "extract-objects":
-                invalid_run_command(shell_command)
-            else:
-                pass
-        else:
-            pass
     else:
         invalid_run_command(shell_command)
 
-    seleniumbase_file = command_args[0]
-    if not seleniumbase_file.endswith('.py'):
-        raise Exception("\n\n`%s` is not a Python file!\n\n"
-                        "Expecting: %s\n"
-                        % (seleniumbase_file, expected_arg))
-
-    f = open(seleniumbase_file, 'r')
-    all_code = f.read()
-    f.close()
-    if "def test_" not in all_code:
-        raise Exception("\n\n`%s` is not a valid SeleniumBase unittest file!\n"
-                        "\nExpecting: %s\n"
-                        % (seleniumbase_file, expected_arg))
-    code_lines = all_code.split('\n')
-    seleniumbase_lines, page_selectors, changed = process_test_file(code_lines)
-    var_names, existing_selectors, selector_list_dict = scan_objects_file()
-    new_page_selectors = []
-
-    for selector in page_selectors:
-        selector = optimize_selector(selector)
-        if selector not in existing_selectors:
-            new_page_selectors.append(selector)
-            var_name = get_next_var_name(var_names)
-            var_names.append(var_name)
-            selector_list_dict["Page"].append((var_name, selector))
-            existing_selectors.append(selector)
-
-    # print(new_page_selectors)  # (For debugging)
-    # print(selector_list_dict)  # (For debugging)
-
+    single_file = len(paths) == 1 and (
+        not os.path.isdir(paths[0]) and not glob.has_magic(paths[0]))
+    code_lines_dict = collections.OrderedDict()  # Key: file, Value: lines
+    for seleniumbase_file in get_test_files(paths):
+        if not seleniumbase_file.endswith('.py'):
+            raise Exception("\n\n`%s` is not a Python file!\n\n"
+                            "Expecting: %s\n"
+                            % (seleniumbase_file, expected_arg))
+        f = open(seleniumbase_file, 'r')
+        all_code = f.read()
+        f.close()
+        if "def test_" not in all_code:
+            if not single_file:
+                print('\n>>> ["%s"] was skipped! (No tests found)'
+                      % seleniumbase_file)
+                continue
+            raise Exception(
+                "\n\n`%s` is not a valid SeleniumBase unittest file!\n"
+                "\nExpecting: %s\n" % (seleniumbase_file, expected_arg))
+        code_lines_dict[seleniumbase_file] = all_code.split('\n')
+
+    # Tests import from ".page_objects", so each folder of tests gets its
+    # own "page_objects.py" file (and index), next to those tests.
+    indexes = collections.OrderedDict()  # Key: folder, Value: index
+    for seleniumbase_file in code_lines_dict.keys():
+        folder = os.path.dirname(seleniumbase_file)
+        if folder not in indexes:
+            indexes[folder] = PageObjectIndex.load(folder)
     if shell_command == "extract-objects" or shell_command == "objectify":
-        create_objects_file(selector_list_dict)
+        for seleniumbase_file, code_lines in code_lines_dict.items():
+            index = indexes[os.path.dirname(seleniumbase_file)]
+            seleniumbase_lines, page_selectors, changed = (
+                process_test_file(code_lines))
+            for selector in page_selectors:
+                index.add_selector(selector)
+        for index in indexes.values():
+            # print(index.new_selectors)  # (For debugging)
+            index.save()  # (A single write of "page_objects.py" per folder)
 
     if shell_command == "extract-objects":
         print("")
         return
 
-    selector_dict = {}  # Key: selector, Value: object
-    object_dict = {}  # Key: object, Value: selector
-    for key in selector_list_dict.keys():
-        for pair in selector_list_dict[key]:
-            selector_dict[pair[1]] = "%s.%s" % (str(key), str(pair[0]))
-            object_name = "%s.%s" % (str(key), str(pair[0]))
-            object_dict[object_name] = pair[1]
-
-    if shell_command == "inject-objects" or shell_command == "objectify":
-        seleniumbase_lines, page_selectors, changed = process_test_file(
-            code_lines, selector_dict=selector_dict, add_comments=add_comments)
-        added_classes = []
-        for item in changed:
-            if item not in added_classes:
-                added_classes.append(item)
+    for seleniumbase_file, code_lines in code_lines_dict.items():
+        index = indexes[os.path.dirname(seleniumbase_file)]
+        if shell_command == "inject-objects" or shell_command == "objectify":
+            seleniumbase_lines = inject_objects_into_lines(
+                code_lines, index, add_comments=add_comments)
+        else:
+            seleniumbase_lines = revert_objects_in_lines(
+                code_lines, index, add_comments=add_comments)
+
+        seleniumbase_code = "\n".join(seleniumbase_lines)
+        # print (seleniumbase_code)  # (For debugging)
+
+        # Create SeleniumBase test file
+        base_file_name = seleniumbase_file.split('.py')[0]
+        converted_file_name = base_file_name + ".py"  # Change to make a copy
+        out_file = codecs.open(converted_file_name, "w+")
+        out_file.writelines(seleniumbase_code)
+        out_file.close()
+        print('\n>>> ["%s"] was updated!\n' % converted_file_name)
+
+
+def inject_objects_into_lines(code_lines, index, add_comments=False):
+    seleniumbase_lines, page_selectors, changed = process_test_file(
+        code_lines, selector_dict=index.selector_dict,
+        add_comments=add_comments)
+    added_classes = []
+    for item in changed:
+        if item not in added_classes:
+            added_classes.append(item)
+    for line in seleniumbase_lines:
+        if "from .page_objects import" in line:
+            token = line.split("from .page_objects import ")[1].strip()
+            if token in added_classes:
+                # Don't import page_objects classes if already imported
+                added_classes.remove(token)
+    if added_classes:
+        sb_lines = []
+        fit_in = False
+        for line in seleniumbase_lines:
+            if line.startswith("from") and "import" in line and not fit_in:
+                fit_in = True
+                for add_me in added_classes:
+                    import_line = "from .page_objects import %s" % add_me
+                    sb_lines.append(import_line)
+            sb_lines.append(line)
+        seleniumbase_lines = sb_lines
+    return seleniumbase_lines
+
+
+def revert_objects_in_lines(code_lines, index, add_comments=False):
+    seleniumbase_lines, page_selectors, changed = process_test_file(
+        code_lines, object_dict=index.object_dict, add_comments=add_comments)
+    removed_classes = []
+    for item in changed:
+        if item not in removed_classes:
+            removed_classes.append(item)
+    if removed_classes:
+        sb_lines = []
         for line in seleniumbase_lines:
             if "from .page_objects import" in line:
                 token = line.split("from .page_objects import ")[1].strip()
-                if token in added_classes:
-                    # Don't import page_objects classes if already imported
-                    added_classes.remove(token)
-        if added_classes:
-            sb_lines = []
-            fit_in = False
-            for line in seleniumbase_lines:
-                if line.startswith("from") and "import" in line and not fit_in:
-                    fit_in = True
-                    for add_me in added_classes:
-                        import_line = "from .page_objects import %s" % add_me
-                        sb_lines.append(import_line)
-                sb_lines.append(line)
-            seleniumbase_lines = sb_lines
-
-    if shell_command == "revert-objects":
-        seleniumbase_lines, page_selectors, changed = process_test_file(
-            code_lines, object_dict=object_dict, add_comments=add_comments)
-        removed_classes = []
-        for item in changed:
-            if item not in removed_classes:
-                removed_classes.append(item)
-        if removed_classes:
-            sb_lines = []
-            for line in seleniumbase_lines:
-                if "from .page_objects import" in line:
-                    token = line.split("from .page_objects import ")[1].strip()
-                    if token in removed_classes:
-                        continue
-                sb_lines.append(line)
-            seleniumbase_lines = sb_lines
-
-    seleniumbase_code = ""
-    for line in seleniumbase_lines:
-        seleniumbase_code += line
-        seleniumbase_code += "\n"
-    seleniumbase_code = seleniumbase_code[:-1]
-    # print (seleniumbase_code)  # (For debugging)
-
-    # Create SeleniumBase test file
-    base_file_name = seleniumbase_file.split('.py')[0]
-    converted_file_name = base_file_name + ".py"  # Change end to make a copy
-    out_file = codecs.open(converted_file_name, "w+")
-    out_file.writelines(seleniumbase_code)
-    out_file.close()
-    print('\n>>> ["%s"] was updated!\n' % converted_file_name)
+                if token in removed_classes:
+                    continue
+            sb_lines.append(line)
+        seleniumbase_lines = sb_lines
+    return seleniumbase_lines
 
 
 if __name__ == "__main__":
@@ -1,33 +1,83 @@
 import fnmatch
 import os
+import socket
 import tempfile
-import time
 from threading import Lock
+from seleniumbase.core import timing_helper
 from seleniumbase.virtual_display.easyprocess import EasyProcess
 from seleniumbase.virtual_display import xauth
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # (Windows)
 
 mutex = Lock()
-RANDOMIZE_DISPLAY_NR = False
-if RANDOMIZE_DISPLAY_NR:
-    import random
-    random.seed()
 MIN_DISPLAY_NR = 1000
 USED_DISPLAY_NR_LIST = []
+X_LOCK_DIR = '/tmp'
+X_SOCKET_DIR = '/tmp/.X11-unix'
+# Display numbers get reserved with a lock file per display number, which
+# is locked (with flock) by the process that uses the display. The lock is
+# released when the display stops, or when the process exits, so that
+# parallel processes (such as pytest-xdist workers) never pick the same one.
+RESERVATION_FILE = '.sb-display-%s.lock'
+RESERVED_DISPLAY_FDS = {}  # {display_nr: fd of the locked reservation file}
+START_TIMEOUT = 10  # Seconds to wait for the X server to accept connections
+POLL_INTERVAL = 0.01
+
+
+def reserve_display_nr(display):
+    '''
+    Reserves the display number for this process if it's free.
+
+    :rtype: bool
+    '''
+    if display in USED_DISPLAY_NR_LIST:
+        return False
+    if os.path.exists(os.path.join(X_LOCK_DIR, '.X%s-lock' % display)):
+        return False
+    if fcntl:
+        path = os.path.join(tempfile.gettempdir(), RESERVATION_FILE % display)
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_CREAT, 0o666)
+        except OSError:
+            return False  # (Owned by another user)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (IOError, OSError):
+            os.close(fd)
+            return False  # (Reserved by another process)
+        RESERVED_DISPLAY_FDS[display] = fd
+    USED_DISPLAY_NR_LIST.append(display)
+    return True
+
+
+def release_display_nr(display):
+    mutex.acquire()
+    try:
+        fd = RESERVED_DISPLAY_FDS.pop(display, None)
+        if fd is not None:
+            os.close(fd)  # (Also releases the lock)
+        if display in USED_DISPLAY_NR_LIST:
+            USED_DISPLAY_NR_LIST.remove(display)
+    finally:
+        mutex.release()
 
 
 class AbstractDisplay(EasyProcess):
     '''
     Common parent for Xvfb and Xephyr
     '''
-    def __init__(self, use_xauth=False):
-        mutex.acquire()
-        try:
-            self.display = self.search_for_display()
-            while self.display in USED_DISPLAY_NR_LIST:
-                self.display += 1
-            USED_DISPLAY_NR_LIST.append(self.display)
-        finally:
-            mutex.release()
+    def __init__(self, use_xauth=False, display=None):
+        if display is None:
+            mutex.acquire()
+            try:
+                display = self.search_for_display()
+                while not reserve_display_nr(display):
+                    display += 1
+            finally:
+                mutex.release()
+        self.display = display
         if xauth and not xauth.is_installed():
             raise xauth.NotFoundError()
         self.use_xauth = use_xauth
@@ -44,7 +94,7 @@ class AbstractDisplay(EasyProcess):
         raise NotImplementedError()
 
     def lock_files(self):
-        tmpdir = '/tmp'
+        tmpdir = X_LOCK_DIR
         pattern = '.X*-lock'
         # remove path.py dependency
         names = fnmatch.filter(os.listdir(tmpdir), pattern)
@@ -59,8 +109,6 @@ class AbstractDisplay(EasyProcess):
             display = max(MIN_DISPLAY_NR, max(ls) + 3)
         else:
             display = MIN_DISPLAY_NR
-        if RANDOMIZE_DISPLAY_NR:
-            display += random.randint(0, 100)
         return display
 
     def redirect_display(self, on):
@@ -93,10 +141,52 @@ class AbstractDisplay(EasyProcess):
 
         self.redirect_display(True)
         # wait until X server is active
-        # TODO: better method
-        time.sleep(0.1)
+        self.wait_for_display(START_TIMEOUT)
         return self
 
+    def is_display_ready(self):
+        '''
+        Returns True if the X server accepts connections.
+
+        :rtype: bool
+        '''
+        path = os.path.join(X_SOCKET_DIR, 'X%s' % self.display)
+        if not os.path.exists(path):
+            return False
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+            return True
+        except socket.error:
+            return False
+        finally:
+            sock.close()
+
+    def wait_for_display(self, timeout):
+        '''
+        Waits until the X server accepts connections.
+        Raises an exception if the X server exits or doesn't start in time.
+        '''
+        deadline = timing_helper.Deadline(timeout, 'wait_for_display')
+        while True:
+            if self.is_display_ready():
+                deadline.record()
+                return
+            if not self.is_alive():
+                deadline.record(timed_out=True)
+                self.stop()
+                raise Exception(
+                    'The X server exited before display %s was ready! %s' % (
+                        self.new_display_var, self.stderr))
+            if deadline.expired():
+                break
+            deadline.sleep(POLL_INTERVAL)
+        deadline.record(timed_out=True)
+        self.stop()
+        raise Exception(
+            'Display %s was not ready after %s seconds!' % (
+                self.new_display_var, timeout))
+
     def stop(self):
         '''
         stop display
@@ -107,6 +197,7 @@ class AbstractDisplay(EasyProcess):
         EasyProcess.stop(self)
         if self.use_xauth:
             self._clear_xauth()
+        release_display_nr(self.display)
         return self
 
     def _setup_xauth(self):
@@ -41,7 +41,9 @@ class Display(AbstractDisplay):
             color_depth=color_depth,
             bgcolor=bgcolor,
             **kwargs)
-        AbstractDisplay.__init__(self, use_xauth=use_xauth)
+        # (Use the display number that was already reserved by the backend)
+        AbstractDisplay.__init__(
+            self, use_xauth=use_xauth, display=self._obj.display)
 
     @property
     def display_class(self):